@@ -0,0 +1,97 @@
+import json
+import os
+import pathlib
+
+import pytest
+
+# the application fixture of the test suite
+from tests.conftest import application  # noqa: F401
+
+BASELINE_PATH = pathlib.Path(__file__).parent / "baseline.json"
+DEFAULT_MAX_SLOWDOWN = 2.0
+
+_measured_medians: dict[str, float] = {}
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("baseline")
+    group.addoption(
+        "--update-baseline",
+        action="store_true",
+        help=f"record the measured medians in {BASELINE_PATH.name}",
+    )
+    group.addoption(
+        "--max-slowdown",
+        type=float,
+        default=float(os.environ.get("BENCHMARK_MAX_SLOWDOWN", DEFAULT_MAX_SLOWDOWN)),
+        help="fail benchmarks slower than their baseline median times this factor",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "pending_baseline: skipped, instead of failed, until its baseline is"
+        " recorded",
+    )
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    if config.getoption("--update-baseline"):
+        return
+    baseline = _load_baseline()
+    for item in items:
+        if (
+            item.get_closest_marker("pending_baseline") is not None
+            and item.name not in baseline
+        ):
+            item.add_marker(
+                pytest.mark.skip(
+                    reason=f"no baseline in {BASELINE_PATH.name} yet, this"
+                    " regression is NOT guarded, record it with --update-baseline"
+                )
+            )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item: pytest.Item):
+    result = yield
+
+    benchmark = getattr(item, "funcargs", {}).get("benchmark")
+    if benchmark is None or benchmark.disabled or benchmark.stats is None:
+        return result
+    median = benchmark.stats.stats.median
+    _measured_medians[item.name] = median
+
+    if item.config.getoption("--update-baseline"):
+        return result
+    baseline_median = _load_baseline().get(item.name)
+    if baseline_median is None:
+        # an unchecked benchmark would never catch a regression
+        pytest.fail(
+            f"{item.name} has no baseline in {BASELINE_PATH.name}, record it with"
+            " --update-baseline"
+        )
+    max_slowdown = item.config.getoption("--max-slowdown")
+    if median > baseline_median * max_slowdown:
+        pytest.fail(
+            f"{item.name} regressed: median {median * 1e3:.3f} ms is more than"
+            f" {max_slowdown}x its baseline of {baseline_median * 1e3:.3f} ms"
+        )
+    return result
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    if not session.config.getoption("--update-baseline") or not _measured_medians:
+        return
+    baseline = _load_baseline()
+    baseline.update(_measured_medians)
+    BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def _load_baseline() -> dict[str, float]:
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text())
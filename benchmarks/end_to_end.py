@@ -0,0 +1,152 @@
+"""Time whole balance refreshes in a real headless Chrome, against the fake bank
+site of the test suite, replaying the given network and rendering latencies.
+
+    python -m benchmarks.end_to_end --profiles 4 --concurrency 1 2 4
+
+Every run logs in: the session store is disabled.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import pathlib
+import statistics
+import tempfile
+import time
+
+from bank_automation.containers import ApplicationContainer
+from bank_automation.settings import (
+    BalanceStoreSettings,
+    BankingSettings,
+    BrowserSettings,
+    CaisseDEpargneProfile,
+    CaisseDEpargneSettings,
+    DigitRecognitionSettings,
+    SessionStoreSettings,
+)
+from tests.fake_bank import FakeBankServer, FakeCustomer, FakeLatencies
+
+PASSWORD = "052819"
+CHECKING_ACCOUNT = "04123456789"
+
+
+@dataclasses.dataclass(frozen=True)
+class RunTimings:
+    concurrency: int
+    total_in_seconds: float
+    profile_in_seconds: list[float]
+    failure_count: int
+
+
+def _create_application(
+    server: FakeBankServer,
+    profile_count: int,
+    concurrency: int,
+    data_mode: str,
+    cache_directory: pathlib.Path,
+) -> ApplicationContainer:
+    application = ApplicationContainer()
+    application.logging.container.init_resources()
+
+    application.digit_recognition_settings.override(
+        DigitRecognitionSettings(
+            digit_recognition_cache_directory=str(cache_directory),
+            digit_recognition_template_fallback_to_easyocr=False,
+        )
+    )
+    application.session_store_settings.override(SessionStoreSettings(enabled=False))
+    application.balance_store_settings.override(BalanceStoreSettings(enabled=False))
+    application.browser_settings.override(
+        BrowserSettings(extra_arguments=["--no-sandbox"])
+    )
+    application.banking_settings.override(BankingSettings(max_concurrency=concurrency))
+    application.caisse_d_epargne_config.override(
+        CaisseDEpargneSettings(
+            caisse_d_epargne_profiles=[
+                CaisseDEpargneProfile(
+                    name=f"profile {index}",
+                    account_id=f"customer {index}",
+                    account_password=PASSWORD,
+                    checking_account=CHECKING_ACCOUNT,
+                )
+                for index in range(profile_count)
+            ],
+            # only the fake site's latencies are measured
+            caisse_d_epargne_login_rate_limit_per_minute=10_000.0,
+            caisse_d_epargne_data_mode=data_mode,
+            caisse_d_epargne_base_url=server.base_url,
+            caisse_d_epargne_api_base_url=server.base_url,
+        )
+    )
+    return application
+
+
+async def _run(application: ApplicationContainer, concurrency: int) -> RunTimings:
+    banking_service = application.banking_service()
+
+    start = time.perf_counter()
+    profile_in_seconds: list[float] = []
+    failure_count = 0
+    async for result in banking_service.stream_profile_balances():
+        profile_in_seconds.append(time.perf_counter() - start)
+        if result.error is not None:
+            failure_count += 1
+    return RunTimings(
+        concurrency=concurrency,
+        total_in_seconds=time.perf_counter() - start,
+        profile_in_seconds=profile_in_seconds,
+        failure_count=failure_count,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--data-mode", choices=["browser", "http"], default="browser")
+    parser.add_argument("--page-latency", type=float, default=0.2)
+    parser.add_argument("--api-latency", type=float, default=0.1)
+    parser.add_argument("--render-latency", type=float, default=0.3)
+    parser.add_argument("--mfa", action="store_true", help="customers require MFA")
+    args = parser.parse_args()
+
+    server = FakeBankServer(
+        customers={
+            f"customer {index}": FakeCustomer(PASSWORD, requires_mfa=args.mfa)
+            for index in range(args.profiles)
+        },
+        latencies=FakeLatencies(
+            page_in_seconds=args.page_latency,
+            api_in_seconds=args.api_latency,
+            render_in_seconds=args.render_latency,
+        ),
+    )
+    server.start()
+    try:
+        with tempfile.TemporaryDirectory() as cache_directory:
+            print("concurrency  run  total (s)  profile median (s)  max (s)  failures")
+            for concurrency in args.concurrency:
+                for run_index in range(args.runs):
+                    application = _create_application(
+                        server,
+                        args.profiles,
+                        concurrency,
+                        args.data_mode,
+                        pathlib.Path(cache_directory),
+                    )
+                    timings = asyncio.run(_run(application, concurrency))
+                    print(
+                        f"{timings.concurrency:>11}  {run_index:>3}"
+                        f"  {timings.total_in_seconds:>9.2f}"
+                        f"  {statistics.median(timings.profile_in_seconds):>18.2f}"
+                        f"  {max(timings.profile_in_seconds):>7.2f}"
+                        f"  {timings.failure_count:>8}"
+                    )
+        print(f"logins: {server.login_count}, requests: {server.request_count}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
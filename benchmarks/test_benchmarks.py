@@ -0,0 +1,202 @@
+import asyncio
+import base64
+import pathlib
+import random
+import subprocess
+import sys
+import unittest.mock
+
+import pytest
+
+from bank_automation.containers import ApplicationContainer
+from bank_automation.services.digit_recognition_service import DigitRecognitionService
+from bank_automation.settings import DigitRecognitionSettings
+
+IMAGES_DIRECTORY = pathlib.Path(__file__).parent.parent / "tests" / "images"
+
+
+def _load_base64_images() -> list[str]:
+    return [
+        base64.b64encode(
+            (IMAGES_DIRECTORY / f"digit_{digit}.png").read_bytes()
+        ).decode()
+        for digit in range(10)
+    ]
+
+
+def _create_uncached_service(
+    application: ApplicationContainer, engine_provider
+) -> DigitRecognitionService:
+    # without cache, every call runs the engine
+    return DigitRecognitionService(
+        engine=engine_provider(),
+        config=application.digit_recognition_settings(),
+    )
+
+
+class TestDigitRecognitionBenchmarks:
+    @staticmethod
+    def test_recognize_digit_cold_template_engine(
+        benchmark, application: ApplicationContainer
+    ):
+        base64_image = _load_base64_images()[7]
+
+        def recognize_with_new_engine():
+            application.template_matching_digit_recognition_engine.reset()
+            service = _create_uncached_service(
+                application, application.template_matching_digit_recognition_engine
+            )
+            return service.recognize_digit_from_base64(base64_image)
+
+        assert benchmark(recognize_with_new_engine) == 7
+
+    @staticmethod
+    def test_recognize_digit_warm_template_engine(
+        benchmark, application: ApplicationContainer
+    ):
+        base64_image = _load_base64_images()[7]
+        service = _create_uncached_service(
+            application, application.template_matching_digit_recognition_engine
+        )
+
+        assert benchmark(service.recognize_digit_from_base64, base64_image) == 7
+
+    @staticmethod
+    def test_recognize_digit_warm_cache(benchmark, application: ApplicationContainer):
+        base64_image = _load_base64_images()[7]
+        service = application.digit_recognition_service()
+        service.recognize_digit_from_base64(base64_image)
+
+        assert benchmark(service.recognize_digit_from_base64, base64_image) == 7
+
+    # easyocr's models could not be downloaded where the baselines were recorded
+    @staticmethod
+    @pytest.mark.pending_baseline
+    def test_recognize_digit_cold_easyocr_reader(
+        benchmark, application: ApplicationContainer
+    ):
+        pytest.importorskip("easyocr")
+        base64_image = _load_base64_images()[7]
+
+        def recognize_with_new_reader():
+            application.digit_recognition_reader.reset()
+            application.easyocr_digit_recognition_engine.reset()
+            service = _create_uncached_service(
+                application, application.easyocr_digit_recognition_engine
+            )
+            return service.recognize_digit_from_base64(base64_image)
+
+        assert benchmark.pedantic(recognize_with_new_reader, rounds=3) == 7
+
+    @staticmethod
+    @pytest.mark.pending_baseline
+    def test_recognize_digit_warm_easyocr_reader(
+        benchmark, application: ApplicationContainer
+    ):
+        pytest.importorskip("easyocr")
+        base64_image = _load_base64_images()[7]
+        service = _create_uncached_service(
+            application, application.easyocr_digit_recognition_engine
+        )
+
+        assert benchmark(service.recognize_digit_from_base64, base64_image) == 7
+
+    @staticmethod
+    def test_remove_bytes_after_iend_chunk(
+        benchmark, application: ApplicationContainer
+    ):
+        service = application.digit_recognition_service()
+        image = (IMAGES_DIRECTORY / "digit_3.png").read_bytes()
+        padded_image = image + b"\x00" * 4096
+
+        fixed_image = benchmark(service._remove_bytes_after_iend_chunk, padded_image)
+
+        assert fixed_image.obj is padded_image
+        assert (
+            fixed_image[-len(service.config.iend_chunk) :] == service.config.iend_chunk
+        )
+
+
+class TestAdapterBenchmarks:
+    @staticmethod
+    def test_sort_buttons_of_shuffled_keypad(
+        benchmark, application: ApplicationContainer
+    ):
+        application.digit_recognition_service.override(
+            _create_uncached_service(
+                application, application.template_matching_digit_recognition_engine
+            )
+        )
+        adapter = application.caisse_d_epargne_adapter()
+        background_images = {
+            unittest.mock.sentinel.__getattr__(f"button_{digit}"): (
+                f'url("data:image/png;base64,{base64_image}")'
+            )
+            for digit, base64_image in enumerate(_load_base64_images())
+        }
+        buttons = list(background_images)
+        random.Random(0).shuffle(buttons)
+
+        browser_service = unittest.mock.Mock()
+        browser_service.get_css_property = unittest.mock.AsyncMock(
+            side_effect=lambda button, name: background_images[button]
+        )
+        adapter._browser_service = browser_service
+
+        password_buttons = benchmark(
+            lambda: asyncio.run(adapter._find_password_buttons(buttons, set(range(10))))
+        )
+
+        assert password_buttons == dict(enumerate(background_images))
+
+    @staticmethod
+    def test_get_balance_from_raw_parts_throughput(
+        benchmark, application: ApplicationContainer
+    ):
+        adapter = application.caisse_d_epargne_adapter()
+        raw_parts = [
+            [f"{sign} {whole} ", f",{cents:02d} €"]
+            for sign, whole, cents in zip(
+                ["+", "-"] * 500, range(0, 100_000, 100), range(1000)
+            )
+            for cents in [cents % 100]
+        ]
+
+        def parse_all():
+            return [adapter._get_balance_from_raw_parts(parts) for parts in raw_parts]
+
+        balances = benchmark(parse_all)
+
+        assert len(balances) == 1000
+        assert balances[1] == -100.01
+
+
+class TestStartupBenchmarks:
+    @staticmethod
+    def test_container_import(benchmark):
+        def import_container():
+            subprocess.run(
+                [sys.executable, "-c", "import bank_automation.containers"],
+                check=True,
+            )
+
+        benchmark.pedantic(import_container, rounds=5)
+
+    @staticmethod
+    def test_container_resolution(
+        benchmark, application: ApplicationContainer, tmp_path: pathlib.Path
+    ):
+        # the background warm-up would load the OCR models on every resolution
+        application.digit_recognition_settings.override(
+            DigitRecognitionSettings(
+                digit_recognition_cache_directory=str(tmp_path / "digit_recognition"),
+                digit_recognition_warm_up=False,
+            )
+        )
+
+        def resolve():
+            application.reset_singletons()
+            application.digit_recognition_service()
+            application.caisse_d_epargne_adapter()
+
+        benchmark(resolve)
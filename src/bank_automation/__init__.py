@@ -1,3 +1,5 @@
+import dataclasses
+import datetime
 from typing import Literal
 
 
@@ -9,3 +11,20 @@ CurrencyType = Literal["€"]
 
 
 GetAccountBalanceResponse = dict[str, float]
+
+
+@dataclasses.dataclass(frozen=True)
+class AccountBalance:
+    account_id: str
+    balance: float
+    currency: CurrencyType
+
+
+@dataclasses.dataclass(frozen=True)
+class Transaction:
+    account_id: str
+    transaction_id: str
+    date: datetime.date
+    label: str
+    amount: float
+    currency: CurrencyType
@@ -1,37 +1,143 @@
 #!/usr/bin/env python
 
+import argparse
 import logging
 import asyncio
+import signal
 
 from dependency_injector.wiring import Provide, inject
 
 from .containers import ApplicationContainer
+from .infra.balance_api_server import BalanceApiServer
+from .infra.balance_store import BalanceStore
+from .infra.transaction_sinks import create_transaction_sink
 from .services.banking_service import BankingService
+from .services.refresh_daemon import RefreshDaemon
+from .services.transaction_export_service import TransactionExportService
+from .settings import BalanceApiSettings, CaisseDEpargneSettings
 
 
 @inject
 async def main(
     banking_service: BankingService = Provide[ApplicationContainer.banking_service],
+    caisse_d_epargne_config: CaisseDEpargneSettings = Provide[
+        ApplicationContainer.caisse_d_epargne_config
+    ],
+    balance_store: BalanceStore | None = Provide[ApplicationContainer.balance_store],
 ):
     logger = module_logger.getChild(main.__name__)
-    balances = await banking_service.get_all_account_balances()
-    logger.info(f"balances: {balances}")
+    if len(caisse_d_epargne_config.profiles) == 0:
+        try:
+            balances = await banking_service.get_all_account_balances()
+        finally:
+            # the default profile's adapter is a singleton, shutting down the
+            # resources would only quit its browser, not its HTTP client
+            await banking_service.caisse_d_epargne_adapter.aclose()
+        logger.info(f"balances: {balances}")
+    else:
+        async for result in banking_service.stream_profile_balances():
+            if result.error is not None:
+                logger.error(
+                    f"profile '{result.profile_name}' failed: {result.error!r}"
+                )
+            else:
+                logger.info(
+                    f"profile '{result.profile_name}' balances: {result.balances}"
+                )
+
+    if balance_store is not None:
+        await asyncio.to_thread(balance_store.compact)
+
+
+@inject
+async def serve(
+    refresh_daemon: RefreshDaemon = Provide[ApplicationContainer.refresh_daemon],
+    balance_api_config: BalanceApiSettings = Provide[
+        ApplicationContainer.balance_api_settings
+    ],
+    balance_api_server: BalanceApiServer = Provide[
+        ApplicationContainer.balance_api_server
+    ],
+):
+    logger = module_logger.getChild(serve.__name__)
+
+    stop_event = asyncio.Event()
+    event_loop = asyncio.get_running_loop()
+    for stop_signal in (signal.SIGINT, signal.SIGTERM):
+        event_loop.add_signal_handler(stop_signal, stop_event.set)
+
+    if balance_api_config.enabled:
+        await balance_api_server.start()
+    logger.info("serving, stop with SIGINT or SIGTERM")
+    try:
+        await refresh_daemon.run(stop_event)
+    finally:
+        await balance_api_server.close()
+
+
+@inject
+async def export(
+    account_id: str,
+    output_path: str,
+    transaction_export_service: TransactionExportService = Provide[
+        ApplicationContainer.transaction_export_service
+    ],
+):
+    logger = module_logger.getChild(export.__name__)
+
+    with create_transaction_sink(output_path) as sink:
+        transaction_count = await transaction_export_service.export(account_id, sink)
+    logger.info(f"wrote {transaction_count} transactions to {output_path}")
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="bank_automation")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["run", "serve", "export"],
+        default="run",
+        help=(
+            "'run' fetches the balances once, 'serve' keeps refreshing them, "
+            "'export' writes an account's transactions to a file"
+        ),
+    )
+    parser.add_argument("--account", help="account number to export")
+    parser.add_argument(
+        "--output", help="file to export to, Parquet if it ends with .parquet"
+    )
+    arguments = parser.parse_args()
+    if arguments.command == "export" and (
+        arguments.account is None or arguments.output is None
+    ):
+        parser.error("export requires --account and --output")
+    return arguments
 
 
 if __name__ == "__main__":
+    arguments = parse_arguments()
+
     application = ApplicationContainer()
     application.wire(modules=[__name__])
 
     application.logging.container.init_resources()
     module_logger = logging.getLogger(__name__)
 
+    # loads the OCR models in the background, while the browser starts
+    application.digit_recognition_warm_up()
+
     # adapter_mock = unittest.mock.Mock(CaisseDEpargneAdapter)
     # adapter_mock.configure_mock(login=lambda: print("MOCKED LOGIN"))
     # with application.caisse_d_epargne_adapter.override(adapter_mock):
     #     main()
     event_loop = asyncio.get_event_loop()
     try:
-        event_loop.run_until_complete(main())
+        if arguments.command == "serve":
+            event_loop.run_until_complete(serve())
+        elif arguments.command == "export":
+            event_loop.run_until_complete(export(arguments.account, arguments.output))
+        else:
+            event_loop.run_until_complete(main())
     except Exception as e:
         module_logger.error(f"Error running main function: {str(e)}")
         raise e
@@ -1,16 +1,56 @@
+import asyncio
 import dataclasses
+import datetime
+import functools
 import logging
 import re
-import time
-
+import urllib.parse
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    TypeVar,
+    cast,
+)
+
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 
-from bank_automation import Currency, CurrencyType
-from bank_automation.errors.banking_errors import PasswordOcrError, PasswordParseError
-from bank_automation.infra.browser_service import BrowserService
-from bank_automation.services.digit_recognition_service import DigitRecognitionService
-from bank_automation.settings import CaisseDEpargneSettings
+from bank_automation import AccountBalance, Currency, CurrencyType, Transaction
+from bank_automation.errors.banking_errors import PasswordParseError
+from bank_automation.errors.browser_errors import WaitTimeoutError
+from bank_automation.errors.http_errors import HttpUnauthorizedError
+from bank_automation.infra.browser_service import BrowserService, ExtractionField
+from bank_automation.infra.session_store import BrowserSession, EncryptedSessionStore
+from bank_automation.infra.tracing import Tracer
+from bank_automation.services.keypad_resolver import KeypadResolver
+from bank_automation.settings import CaisseDEpargneProfile, CaisseDEpargneSettings
+
+if TYPE_CHECKING:
+    from bank_automation.infra.http_client import HttpClient
+
+
+# paths of the web site, relative to the configured base url
+CONSENT_PATH = "/banque-a-distance/acceder-compte/"
+LOGIN_PATH = "/se-connecter/sso?service=dei"
+
+ACCOUNT_TILE_SELECTOR = "compte-contract-tile"
+ACCOUNT_TILE_FIELDS = {
+    "id": ExtractionField(selector="p[data-e2e=account-label]+p"),
+    "balance_parts": ExtractionField(
+        selector="compte-ui-balance[data-e2e=compte-balance-contract] .balance span",
+        multiple=True,
+    ),
+}
+
+# currency codes of the JSON API -> currency suffixes of the web pages
+CURRENCY_SUFFIXES: dict[str, CurrencyType] = {"EUR": Currency.EURO}
+
+_T = TypeVar("_T")
 
 
 @dataclasses.dataclass
@@ -27,51 +67,128 @@ class CaisseDEpargneAdapter:
     def __init__(
         self,
         config: CaisseDEpargneSettings,
-        digit_recognition_service: DigitRecognitionService,
-        browser_service: BrowserService,
+        keypad_resolver: KeypadResolver,
+        browser_service_provider: Callable[[], BrowserService],
+        session_store: EncryptedSessionStore | None = None,
+        http_client_provider: "Callable[[], HttpClient] | None" = None,
+        tracer: Tracer | None = None,
     ) -> None:
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.tracer = tracer if tracer is not None else Tracer()
+
+        self.session_store = session_store
+
+        self.keypad_resolver = keypad_resolver
+        assert self.keypad_resolver is not None
 
-        self.digit_recognition_service = digit_recognition_service
-        assert self.digit_recognition_service is not None
+        # the browser only starts when needed: in HTTP mode, a saved session
+        # is enough to read the balances
+        self.browser_service_provider = browser_service_provider
+        assert self.browser_service_provider is not None
+        self._browser_service: BrowserService | None = None
 
-        self.browser_service = browser_service
-        assert self.browser_service is not None
+        self.http_client_provider = http_client_provider
+        self._http_client: "HttpClient | None" = None
 
         self.config = config
         assert self.config is not None
 
         self.logger.debug(f"config: {config}")
-        assert config.account_id is not None
-        assert isinstance(config.account_id, str)
-        assert len(config.account_id) > 0
 
-        assert config.account_password is not None
-        assert isinstance(config.account_password, str)
-        assert len(config.account_password) > 0
+    @property
+    def browser_service(self) -> BrowserService:
+        """Browser session of this adapter, started on first use.
 
-    async def get_checking_account_balance(self) -> float:
-        account_id = self.config.checking_account
+        Starting a browser blocks for a few seconds, call `_start_browser_service`
+        from coroutines.
+        """
+        if self._browser_service is None:
+            self._browser_service = self.browser_service_provider()
+        return self._browser_service
+
+    @property
+    def http_client(self) -> "HttpClient":
+        if self.http_client_provider is None:
+            raise ValueError("HTTP data mode requires an HTTP client provider")
+        if self._http_client is None:
+            self._http_client = self.http_client_provider()
+        return self._http_client
+
+    def close(self) -> None:
+        """Release the browser session used by this adapter, if it was started."""
+        if self._browser_service is not None:
+            self._browser_service.close()
+
+    async def aclose(self) -> None:
+        """Release the HTTP connections and the browser session of this adapter."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        await asyncio.to_thread(self.close)
+
+    async def get_checking_account_balance(
+        self, profile: CaisseDEpargneProfile | None = None
+    ) -> float:
+        if profile is None:
+            profile = self.config.get_default_profile()
+        account_id = profile.checking_account
+        if account_id is None:
+            raise ValueError(f"profile '{profile.name}' has no checking account")
         balances = await self.get_account_balance(
             {
                 account_id: CaisseDEpargneGetAccountBalanceAccountOptions(
                     currency=Currency.EURO
                 ),
-            }
+            },
+            profile=profile,
         )
         balance = balances[account_id]
         if not isinstance(balance, float):
             raise ValueError(f"Expected float, got {balance}")
         return balance
 
+    async def get_account_balances(
+        self, profile: CaisseDEpargneProfile | None = None
+    ) -> list[AccountBalance]:
+        """Get the balance of each account of the profile, from a single login.
+
+        If the profile sets `all_accounts`, every account found on the dashboard
+        is returned, the declared ones first.
+
+        Args:
+            profile: credentials and accounts, defaults to the configured
+                default profile
+
+        Raises:
+            CaisseDEpargneAccountNotFoundError: a declared account was not found
+        """
+        if profile is None:
+            profile = self.config.get_default_profile()
+        accounts = {
+            account.id: CaisseDEpargneGetAccountBalanceAccountOptions(
+                currency=account.currency
+            )
+            for account in profile.get_accounts()
+        }
+        account_balances = await self._get_account_balances(
+            accounts, profile, all_accounts=profile.all_accounts
+        )
+        return [account_balances[account_id] for account_id in accounts] + [
+            account_balance
+            for account_id, account_balance in account_balances.items()
+            if account_id not in accounts
+        ]
+
     async def get_account_balance(
         self,
         accounts: dict[str, CaisseDEpargneGetAccountBalanceAccountOptions],
+        profile: CaisseDEpargneProfile | None = None,
     ) -> dict[str, float]:
         """Get account balance for each of the given accounts
 
         Args:
             account_ids: map of account ID to its expected currency suffix
+            profile: credentials to log in with, defaults to the configured
+                default profile
 
         Returns:
             map of account ID to its account balance
@@ -80,106 +197,478 @@ class CaisseDEpargneAdapter:
             PasswordParseError:
             NoSuchElementException:
         """
-        # accounts = request.accounts
+        if profile is None:
+            profile = self.config.get_default_profile()
+        account_balances = await self._get_account_balances(accounts, profile)
+        return {
+            account_id: account_balance.balance
+            for account_id, account_balance in account_balances.items()
+        }
+
+    async def stream_transactions(
+        self, account_id: str, profile: CaisseDEpargneProfile | None = None
+    ) -> AsyncIterator[Transaction]:
+        """Yield the transactions of the account, newest first, page by page from
+        the JSON API of the web app, whatever the data mode.
+
+        The next page is requested as soon as the current one is received, so
+        that it downloads while the current page is parsed and consumed. At
+        most two pages are held in memory.
+
+        The paging contract of the endpoint and the format of its transactions
+        are assumed, and only checked against the fake bank, never against the
+        real API.
 
-        logger = self.logger.getChild(self.get_account_balance.__name__)
-        logger.debug(f"starting login flow for account ids: {accounts}")
+        Args:
+            account_id: account number, as on the account tiles
+            profile: credentials to log in with, defaults to the configured
+                default profile
 
-        self.browser_service.get(
-            "https://www.caisse-epargne.fr/banque-a-distance/acceder-compte/"
-        )
-        no_consent = self.browser_service.find_element_by_id(id="no_consent_btn")
-        no_consent.click()
-        self.browser_service.get(
-            "https://www.caisse-epargne.fr/se-connecter/sso?service=dei"
+        Raises:
+            HttpUnauthorizedError: the session expired during the export
+        """
+        logger = self.logger.getChild(self.stream_transactions.__name__)
+        if profile is None:
+            profile = self.config.get_default_profile()
+
+        # the cookies of the first page's session are kept for the next pages
+        page = await self._call_api(
+            profile,
+            functools.partial(self._fetch_transaction_page, account_id, None),
         )
-        identifier_input = self.browser_service.find_element_by_id(
-            id="input-identifier"
+        page_count = 1
+        while True:
+            next_page_key = page.get("nextPageKey")
+            next_page = (
+                asyncio.create_task(
+                    self._fetch_transaction_page(account_id, next_page_key)
+                )
+                if next_page_key is not None
+                else None
+            )
+            try:
+                for transaction in self._get_transactions_from_json(account_id, page):
+                    yield transaction
+            except BaseException:
+                # the consumer stopped early, or the page could not be parsed
+                if next_page is not None:
+                    next_page.cancel()
+                raise
+            if next_page is None:
+                logger.debug(f"read {page_count} pages of account {account_id}")
+                return
+            page = await next_page
+            page_count += 1
+
+    async def _get_account_balances(
+        self,
+        accounts: dict[str, CaisseDEpargneGetAccountBalanceAccountOptions],
+        profile: CaisseDEpargneProfile,
+        all_accounts: bool = False,
+    ) -> dict[str, AccountBalance]:
+        """
+        Args:
+            accounts: accounts which must be found
+            all_accounts: also return the balances of the other accounts found
+
+        Raises:
+            CaisseDEpargneAccountNotFoundError:
+        """
+        logger = self.logger.getChild(self._get_account_balances.__name__)
+        logger.debug(
+            f"fetching profile '{profile.name}' account ids: {accounts}"
+            f"{' and every other account' if all_accounts else ''}"
         )
-        identifier_input.send_keys(self.config.account_id)
-        identifier_input.send_keys("\n")
 
-        time.sleep(2)  # TODO: remove sleep
+        # no filter: every account found is parsed
+        filtered_accounts = None if all_accounts else accounts
+        with self.tracer.span(
+            "fetch", profile=profile.name, data_mode=self.config.data_mode
+        ):
+            if self.config.data_mode == "http":
+                account_balances = await self._get_account_balances_over_http(
+                    filtered_accounts, profile
+                )
+            else:
+                account_balances = await self._get_account_balances_from_browser(
+                    filtered_accounts, profile
+                )
 
-        logger.debug("sort password buttons")
-        buttons = self.browser_service.find_elements_by_css_selector(
-            selector="button.keyboard-button"
-        )
-        ordered_buttons = self._sort_buttons(buttons)
+        for expected_key, options in accounts.items():
+            if expected_key not in account_balances:
+                raise CaisseDEpargneAccountNotFoundError(expected_key)
+            assert account_balances[expected_key].currency == options.currency
 
-        logger.debug("input configured password using sorted numeric buttons")
-        remaining_password = self.config.account_password
+        return account_balances
 
-        while remaining_password != "":
-            try:
-                next_char = int(remaining_password[0])
-            except ValueError:
-                raise PasswordParseError()
-            if next_char < 0 or next_char > 9:
-                raise PasswordParseError()
-
-            button = ordered_buttons[next_char]
-            button.click()
-            remaining_password = remaining_password[1:]
-
-        logger.debug("submit password")
-        password_submit_button = self.browser_service.find_element_by_id(
-            id="p-password-btn-submit"
+    async def _get_account_balances_from_browser(
+        self,
+        accounts: dict[str, CaisseDEpargneGetAccountBalanceAccountOptions] | None,
+        profile: CaisseDEpargneProfile,
+    ) -> dict[str, AccountBalance]:
+        logger = self.logger.getChild(self._get_account_balances_from_browser.__name__)
+
+        await self._start_browser_service()
+        with self.tracer.span("session_restore") as session_restore_attributes:
+            is_session_restored = await self._restore_session(profile)
+            session_restore_attributes["restored"] = is_session_restored
+        if not is_session_restored:
+            await self._login_and_save_session(profile)
+
+        with self.tracer.span("extraction"):
+            account_tiles = await self.browser_service.extract_all(
+                root_selector=ACCOUNT_TILE_SELECTOR, fields=ACCOUNT_TILE_FIELDS
+            )
+            logger.debug(f"found account tiles: {account_tiles}")
+
+            return self._get_account_balances_from_tiles(accounts, account_tiles)
+
+    async def _get_account_balances_over_http(
+        self,
+        accounts: dict[str, CaisseDEpargneGetAccountBalanceAccountOptions] | None,
+        profile: CaisseDEpargneProfile,
+    ) -> dict[str, AccountBalance]:
+        """Read the balances from the JSON API of the web app."""
+        return await self._call_api(
+            profile, functools.partial(self._fetch_account_balances, accounts)
         )
-        password_submit_button.click()
 
-        time.sleep(2)  # TODO: remove sleep
+    async def _call_api(
+        self,
+        profile: CaisseDEpargneProfile,
+        call: Callable[[list[dict[str, Any]]], Awaitable[_T]],
+    ) -> _T:
+        """Call the JSON API of the web app with the cookies of the saved session
+        if it is still accepted, or else of a new login.
 
-        logger.debug(f"URL: {self.browser_service.get_current_url()}")
+        Args:
+            call: calls the API with the given cookies, raises
+                `HttpUnauthorizedError` if they are not accepted
+        """
+        logger = self.logger.getChild(self._call_api.__name__)
 
-        await self.browser_service.wait_for_element_to_disappear(
-            by=By.ID, value="m-identifier-cloudcard-btn-fallback"
+        session = (
+            self.session_store.load(profile.name)
+            if self.session_store is not None
+            else None
         )
+        if session is not None:
+            try:
+                return await call(session.cookies)
+            except HttpUnauthorizedError as e:
+                logger.info(f"saved session of profile '{profile.name}': {e}")
+                assert self.session_store is not None
+                self.session_store.delete(profile.name)
+
+        await self._start_browser_service()
+        await self._login_and_save_session(profile)
+        cookies = await self.browser_service.get_all_cookies()
+        return await call(cookies)
+
+    async def _fetch_account_balances(
+        self,
+        accounts: dict[str, CaisseDEpargneGetAccountBalanceAccountOptions] | None,
+        cookies: list[dict[str, Any]],
+    ) -> dict[str, AccountBalance]:
+        """
+        Raises:
+            HttpUnauthorizedError:
+        """
+        with self.tracer.span("extraction"):
+            self.http_client.set_cookies(cookies)
+            payload = await self.http_client.get_json(
+                urllib.parse.urljoin(
+                    self.config.api_base_url, self.config.accounts_api_path
+                )
+            )
+            return self._get_account_balances_from_json(accounts, payload)
+
+    async def _fetch_transaction_page(
+        self,
+        account_id: str,
+        page_key: str | None,
+        cookies: list[dict[str, Any]] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Args:
+            page_key: key of the page, as returned with the previous page, the
+                first page if None
+            cookies: replace the client's cookies first
+
+        Raises:
+            HttpUnauthorizedError:
+        """
+        with self.tracer.span("transaction_page", first=page_key is None):
+            if cookies is not None:
+                self.http_client.set_cookies(cookies)
+            parameters = {
+                "accountNumber": account_id,
+                "pageSize": str(self.config.transactions_page_size),
+            }
+            if page_key is not None:
+                parameters["pageKey"] = page_key
+            return await self.http_client.get_json(
+                urllib.parse.urljoin(
+                    self.config.api_base_url, self.config.transactions_api_path
+                )
+                + "?"
+                + urllib.parse.urlencode(parameters)
+            )
+
+    async def _start_browser_service(self) -> BrowserService:
+        if self._browser_service is not None:
+            return self._browser_service
+        with self.tracer.span("browser_start"):
+            return await asyncio.to_thread(lambda: self.browser_service)
 
-        logger.info("Could not find MFA dialog button, continuing")
+    async def _login_and_save_session(self, profile: CaisseDEpargneProfile) -> None:
+        with self.tracer.span("login"):
+            await self._login(profile)
 
-        account_tiles = await self.browser_service.wait_for_elements(
-            by=By.CSS_SELECTOR,
-            value="compte-contract-tile",
+        with self.tracer.span("tiles_wait"):
+            await self.browser_service.wait_for_elements(
+                by=By.CSS_SELECTOR,
+                value=ACCOUNT_TILE_SELECTOR,
+            )
+        await self._save_session(profile)
+
+    async def _login(self, profile: CaisseDEpargneProfile) -> None:
+        """Log in with the profile's credentials, waiting for MFA approval if the
+        bank asks for it.
+
+        Raises:
+            PasswordParseError:
+            NoSuchElementException:
+        """
+        logger = self.logger.getChild(self._login.__name__)
+        logger.debug(f"starting login flow for profile '{profile.name}'")
+
+        with self.tracer.span("consent"):
+            await self.browser_service.get(
+                urllib.parse.urljoin(self.config.base_url, CONSENT_PATH)
+            )
+            no_consent = await self.browser_service.find_element_by_id(
+                id="no_consent_btn"
+            )
+            await self.browser_service.click(no_consent)
+
+        with self.tracer.span("identifier"):
+            await self.browser_service.get(
+                urllib.parse.urljoin(self.config.base_url, LOGIN_PATH)
+            )
+            identifier_input = await self.browser_service.find_element_by_id(
+                id="input-identifier"
+            )
+            await self.browser_service.send_keys(identifier_input, profile.account_id)
+            await self.browser_service.send_keys(identifier_input, "\n")
+
+        password_digits = self._parse_password(profile.account_password)
+
+        logger.debug("find password buttons")
+        with self.tracer.span("keypad_fetch"):
+            buttons = await self.browser_service.wait_for_elements(
+                by=By.CSS_SELECTOR,
+                value="button.keyboard-button",
+            )
+        password_buttons = await self._find_password_buttons(
+            buttons, set(password_digits)
         )
 
-        logger.debug(f"found account labels: {account_tiles}")
+        logger.debug("input configured password using the found buttons")
+        with self.tracer.span("password_entry"):
+            for digit in password_digits:
+                await self.browser_service.click(password_buttons[digit])
 
-        account_balances = {}
+            logger.debug("submit password")
+            password_submit_button = await self.browser_service.find_element_by_id(
+                id="p-password-btn-submit"
+            )
+            await self.browser_service.click(password_submit_button)
 
-        for account_tile in account_tiles:
-            account_tile_id_p = account_tile.find_element(
+        # the bank either asks for MFA approval or shows the accounts right away
+        with self.tracer.span("mfa_wait") as mfa_wait_attributes:
+            mfa_locator = (By.ID, "m-identifier-cloudcard-btn-fallback")
+            matched_locator = await self.browser_service.wait_for_any_element(
+                [mfa_locator, (By.CSS_SELECTOR, ACCOUNT_TILE_SELECTOR)]
+            )
+
+            logger.debug(f"URL: {await self.browser_service.get_current_url()}")
+
+            mfa_wait_attributes["mfa_required"] = matched_locator == mfa_locator
+            if matched_locator == mfa_locator:
+                logger.error("Found MFA dialog, waiting for human MFA approval...")
+                await self.browser_service.wait_for_element_to_disappear(*mfa_locator)
+            else:
+                logger.info("Could not find MFA dialog button, continuing")
+
+    async def _restore_session(self, profile: CaisseDEpargneProfile) -> bool:
+        """Try to reuse the profile's saved session instead of logging in.
+
+        Returns:
+            whether the session was accepted and the account tiles are shown
+        """
+        logger = self.logger.getChild(self._restore_session.__name__)
+
+        if self.session_store is None:
+            return False
+        session = self.session_store.load(profile.name)
+        if session is None:
+            return False
+
+        logger.info(f"restoring saved session of profile '{profile.name}'")
+        script_identifier: str | None = None
+        try:
+            await self.browser_service.set_cookies(session.cookies)
+            script_identifier = await self.browser_service.inject_local_storage(
+                origin=self._get_origin(session.url), items=session.local_storage
+            )
+            await self.browser_service.get(session.url)
+            await self.browser_service.wait_for_elements(
                 by=By.CSS_SELECTOR,
-                value="p[data-e2e=account-label]+p",
+                value=ACCOUNT_TILE_SELECTOR,
+                timeout_in_seconds=3.0,
             )
-            account_tile_id = account_tile_id_p.text.strip()
-            if account_tile_id in accounts.keys():
-                logger.debug(
-                    f"found account tile for account with id: {account_tile_id}"
-                )
-                balance_spans = account_tile.find_elements(
-                    by=By.CSS_SELECTOR,
-                    value="compte-ui-balance[data-e2e=compte-balance-contract] .balance span",
-                )
-                expected_currency_suffix = accounts[account_tile_id].currency
-                assert len(balance_spans) == 2
-                assert balance_spans[1].text.strip()[-1] == expected_currency_suffix
+            return True
+        except (WaitTimeoutError, WebDriverException) as e:
+            # e.g. an invalid cookie or URL, a fresh login replaces the session
+            logger.info(f"saved session of profile '{profile.name}' was rejected: {e}")
+            self.session_store.delete(profile.name)
+            return False
+        finally:
+            if script_identifier is not None:
+                await self.browser_service.remove_injected_script(script_identifier)
+
+    async def _save_session(self, profile: CaisseDEpargneProfile) -> None:
+        if self.session_store is None:
+            return
+
+        self.session_store.save(
+            profile.name,
+            BrowserSession(
+                url=await self.browser_service.get_current_url(),
+                cookies=await self.browser_service.get_all_cookies(),
+                local_storage=await self.browser_service.get_local_storage(),
+            ),
+        )
 
-                balance = self._get_balance_from_raw_parts(
-                    [span.text for span in balance_spans]
-                )
-                logger.debug(
-                    f"account balance for account ID {account_tile_id} is: {balance}"
+    def _get_account_balances_from_tiles(
+        self,
+        accounts: dict[str, CaisseDEpargneGetAccountBalanceAccountOptions] | None,
+        account_tiles: list[dict[str, Any]],
+    ) -> dict[str, AccountBalance]:
+        """
+        Args:
+            accounts: accounts to parse, every account if None
+        """
+        logger = self.logger.getChild(self._get_account_balances_from_tiles.__name__)
+
+        account_balances: dict[str, AccountBalance] = {}
+        for account_tile in account_tiles:
+            account_tile_id = (account_tile["id"] or "").strip()
+            if account_tile_id == "" or (
+                accounts is not None and account_tile_id not in accounts
+            ):
+                continue
+            logger.debug(f"found account tile for account with id: {account_tile_id}")
+
+            balance_span_contents: list[str] = account_tile["balance_parts"]
+            currency_suffix = "".join(balance_span_contents).strip()[-1:]
+            if accounts is not None:
+                currency = accounts[account_tile_id].currency
+                assert len(balance_span_contents) == 2
+                assert currency_suffix == currency
+            elif (
+                len(balance_span_contents) != 2
+                or currency_suffix not in CURRENCY_SUFFIXES.values()
+            ):
+                # e.g. a loan or an account in an unsupported currency
+                logger.warning(
+                    f"skipping account tile {account_tile_id}: unexpected balance "
+                    f"{balance_span_contents}"
                 )
+                continue
+            else:
+                currency = cast(CurrencyType, currency_suffix)
 
-                account_balances[account_tile_id] = balance
+            balance = self._get_balance_from_raw_parts(balance_span_contents)
+            logger.debug(
+                f"account balance for account ID {account_tile_id} is: {balance}"
+            )
 
-        for expected_key in accounts.keys():
-            if expected_key not in account_balances:
-                raise CaisseDEpargneAccountNotFoundError(expected_key)
+            account_balances[account_tile_id] = AccountBalance(
+                account_id=account_tile_id, balance=balance, currency=currency
+            )
+
+        return account_balances
+
+    def _get_account_balances_from_json(
+        self,
+        accounts: dict[str, CaisseDEpargneGetAccountBalanceAccountOptions] | None,
+        payload: dict[str, Any],
+    ) -> dict[str, AccountBalance]:
+        """Read the balances of the accounts endpoint's response.
+
+        Its format is assumed, and only checked against a hand-written response,
+        never against the real API.
+
+        Args:
+            accounts: accounts to parse, every account if None
+        """
+        logger = self.logger.getChild(self._get_account_balances_from_json.__name__)
+
+        account_balances: dict[str, AccountBalance] = {}
+        for item in payload["items"]:
+            account_id = str(item["identification"]["accountNumber"]).strip()
+            if accounts is not None and account_id not in accounts:
+                continue
+
+            balance = item["balance"]
+            currency = CURRENCY_SUFFIXES.get(balance["currencyCode"])
+            if accounts is not None:
+                assert currency == accounts[account_id].currency
+            if currency is None:
+                logger.warning(
+                    f"skipping account {account_id}: unsupported currency "
+                    f"{balance['currencyCode']}"
+                )
+                continue
+            account_balances[account_id] = AccountBalance(
+                account_id=account_id,
+                balance=float(balance["value"]),
+                currency=currency,
+            )
+            logger.debug(
+                f"account balance for account ID {account_id} is: "
+                f"{account_balances[account_id].balance}"
+            )
 
         return account_balances
 
+    def _get_transactions_from_json(
+        self, account_id: str, payload: dict[str, Any]
+    ) -> Iterator[Transaction]:
+        """Parse the transactions of a page lazily, one at a time."""
+        for item in payload["items"]:
+            amount = item["amount"]
+            currency = CURRENCY_SUFFIXES.get(amount["currencyCode"])
+            if currency is None:
+                raise ValueError(
+                    f"unsupported currency of transaction {item['id']}: "
+                    f"{amount['currencyCode']}"
+                )
+            yield Transaction(
+                account_id=account_id,
+                transaction_id=str(item["id"]),
+                date=datetime.date.fromisoformat(item["bookingDate"]),
+                label=item["label"].strip(),
+                amount=float(amount["value"]),
+                currency=currency,
+            )
+
+    def _get_origin(self, url: str) -> str:
+        parsed_url = urllib.parse.urlsplit(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
     def _get_base64_from_background_image(self, background_image: str) -> str:
         matched = re.search(r'url\("data:image/png;base64,(.*)"\)', background_image)
         if matched:
@@ -188,27 +677,38 @@ class CaisseDEpargneAdapter:
             f"could not get base64 from background image value: {background_image}"
         )
 
-    def _get_button_value(self, background_image: str) -> int | None:
-        image_base64 = self._get_base64_from_background_image(background_image)
-        button_value = self.digit_recognition_service.recognize_digit_from_base64(
-            image_base64
-        )
-        return button_value
-
-    def _sort_buttons(self, buttons: list[WebElement]) -> list[WebElement]:
-        button_values: list[tuple[int, WebElement]] = []
+    def _parse_password(self, password: str) -> list[int]:
+        """
+        Raises:
+            PasswordParseError: the password is not made of digits only
+        """
+        if not password.isascii() or not password.isdigit():
+            raise PasswordParseError()
+        return [int(char) for char in password]
 
-        for button in buttons:
-            background_image = button.value_of_css_property("background-image")
-            button_value = self._get_button_value(background_image)
-            if button_value is None:
-                raise PasswordOcrError(background_image)
-            button_values.append((button_value, button))
+    async def _find_password_buttons(
+        self, buttons: list[WebElement], password_digits: set[int]
+    ) -> dict[int, WebElement]:
+        """
+        Returns:
+            map of each digit of the password to its keypad button
 
-        ordered_buttons = [
-            button for _, button in sorted(button_values, key=lambda x: x[0])
-        ]
-        return ordered_buttons
+        Raises:
+            PasswordDigitNotFoundError:
+        """
+        with self.tracer.span("keypad_images", button_count=len(buttons)):
+            background_images = [
+                await self.browser_service.get_css_property(button, "background-image")
+                for button in buttons
+            ]
+        button_indices = await self.keypad_resolver.resolve(
+            [
+                self._get_base64_from_background_image(background_image)
+                for background_image in background_images
+            ],
+            password_digits,
+        )
+        return {digit: buttons[index] for digit, index in button_indices.items()}
 
     def _get_balance_from_raw_parts(self, balance_span_contents: list[str]) -> float:
         logger = self.logger.getChild(self._get_balance_from_raw_parts.__name__)
@@ -1,27 +1,104 @@
+import functools
+import importlib
 import logging
-from typing import Generator
+from typing import TYPE_CHECKING, Any, Callable, Generator
 from dependency_injector import containers, providers
-import selenium.webdriver
-import easyocr
-from selenium.webdriver.chrome.webdriver import WebDriver
 
-from bank_automation.adapters.caisse_d_epargne_adapter import (
-    CaisseDEpargneAdapter,
-)
-from bank_automation.services.banking_service import BankingService
-from bank_automation.infra.browser_service import BrowserService
-from bank_automation.services.digit_recognition_service import DigitRecognitionService
 from bank_automation.settings import (
+    BalanceApiSettings,
+    BalanceStoreSettings,
+    BankingSettings,
+    BrowserSettings,
     CaisseDEpargneSettings,
+    DaemonSettings,
     DigitRecognitionSettings,
+    HttpClientSettings,
     LoggingSettings,
+    MetricsSettings,
+    SessionStoreSettings,
+    TransactionExportSettings,
 )
 
+if TYPE_CHECKING:
+    import easyocr
+    from bank_automation.infra.balance_store import BalanceStore
+    from bank_automation.infra.process_pool_digit_recognition_engine import (
+        ProcessPoolDigitRecognitionEngine,
+    )
+    from bank_automation.infra.session_store import EncryptedSessionStore
+    from bank_automation.infra.tracing import MetricsRegistry, Tracer
+    from bank_automation.services.digit_recognition_service import (
+        DigitRecognitionService,
+    )
+    from bank_automation.services.digit_recognition_warm_up import (
+        DigitRecognitionWarmUp,
+    )
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+    from selenium.webdriver.chrome.webdriver import WebDriver
+
+
+def lazy_import(qualified_name: str) -> Callable[..., Any]:
+    """Return a factory calling the given `module.attribute` callable, importing
+    its module on first call only.
+
+    Importing this module must stay cheap: easyocr pulls torch, selenium pulls
+    every browser driver, and neither is needed until a provider using them is
+    resolved.
+    """
+    module_name, attribute_name = qualified_name.rsplit(".", 1)
+
+    def create(*args: Any, **kwargs: Any) -> Any:
+        provides = getattr(importlib.import_module(module_name), attribute_name)
+        return provides(*args, **kwargs)
+
+    create.__qualname__ = create.__name__ = attribute_name
+    return create
 
-def init_web_driver() -> Generator[WebDriver, None, None]:
+
+def create_chrome_options(config: BrowserSettings) -> "ChromeOptions":
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+
+    options = ChromeOptions()
+    options.page_load_strategy = config.page_load_strategy
+    if config.headless:
+        options.add_argument("--headless=new")
+    if config.disable_gpu:
+        options.add_argument("--disable-gpu")
+    if config.disable_extensions:
+        options.add_argument("--disable-extensions")
+    options.add_argument(f"--window-size={config.window_size}")
+    # background work which is useless to a single scripted visit
+    options.add_argument("--disable-background-networking")
+    options.add_argument("--disable-component-update")
+    options.add_argument("--disable-default-apps")
+    options.add_argument("--disable-sync")
+    options.add_argument("--no-first-run")
+    options.add_argument("--mute-audio")
+    for argument in config.extra_arguments:
+        options.add_argument(argument)
+    if config.block_images:
+        options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
+    return options
+
+
+def create_web_driver(config: BrowserSettings) -> "WebDriver":
+    import selenium.webdriver
+
+    web_driver = selenium.webdriver.Chrome(options=create_chrome_options(config))
+    if len(config.blocked_url_patterns) > 0:
+        web_driver.execute_cdp_cmd("Network.enable", {})
+        web_driver.execute_cdp_cmd(
+            "Network.setBlockedURLs", {"urls": config.blocked_url_patterns}
+        )
+    return web_driver
+
+
+def init_web_driver(config: BrowserSettings) -> Generator["WebDriver", None, None]:
     logger = logging.getLogger(init_web_driver.__name__)
     logger.info("Initializing Chrome web driver")
-    with selenium.webdriver.Chrome() as web_driver:
+    with create_web_driver(config) as web_driver:
         logger.info("Created Chrome web driver")
         yield web_driver
         logger.info("Destroying Chrome web driver")
@@ -29,6 +106,94 @@ def init_web_driver() -> Generator[WebDriver, None, None]:
     logger.info("Destroyed Chrome web driver")
 
 
+def create_easyocr_reader(languages: list[str]) -> "easyocr.Reader":
+    import easyocr
+
+    logger = logging.getLogger(create_easyocr_reader.__name__)
+    logger.info(f"Loading easyocr models for languages: {languages}")
+    return easyocr.Reader(languages)
+
+
+def init_process_pool_digit_recognition_engine(
+    config: DigitRecognitionSettings,
+) -> Generator["ProcessPoolDigitRecognitionEngine", None, None]:
+    from bank_automation.infra.process_pool_digit_recognition_engine import (
+        ProcessPoolDigitRecognitionEngine,
+        create_easyocr_engine,
+    )
+
+    engine = ProcessPoolDigitRecognitionEngine(
+        functools.partial(create_easyocr_engine, config), config
+    )
+    try:
+        yield engine
+    finally:
+        engine.close()
+
+
+def create_digit_recognition_warm_up(
+    service_provider: Callable[[], "DigitRecognitionService"],
+    config: DigitRecognitionSettings,
+) -> "DigitRecognitionWarmUp":
+    from bank_automation.services.digit_recognition_warm_up import (
+        DigitRecognitionWarmUp,
+    )
+
+    warm_up = DigitRecognitionWarmUp(service_provider, config)
+    if config.warm_up:
+        warm_up.start()
+    return warm_up
+
+
+def create_session_store(
+    config: SessionStoreSettings,
+) -> "EncryptedSessionStore | None":
+    if not config.enabled:
+        return None
+
+    from bank_automation.infra.session_store import EncryptedSessionStore
+
+    return EncryptedSessionStore(config)
+
+
+def create_balance_store(config: BalanceStoreSettings) -> "BalanceStore | None":
+    if not config.enabled:
+        return None
+
+    from bank_automation.infra.balance_store import BalanceStore
+
+    return BalanceStore(config)
+
+
+def create_metrics_registry(config: MetricsSettings) -> "MetricsRegistry":
+    from bank_automation.infra.tracing import MetricsRegistry
+
+    return MetricsRegistry(tuple(config.histogram_buckets))
+
+
+def init_tracer(
+    config: MetricsSettings, registry: "MetricsRegistry"
+) -> Generator["Tracer", None, None]:
+    from bank_automation.infra.tracing import (
+        JsonTraceSpanExporter,
+        MetricsSpanExporter,
+        SpanExporter,
+        Tracer,
+    )
+
+    exporters: list[SpanExporter] = [
+        MetricsSpanExporter(registry, prometheus_path=config.prometheus_path)
+    ]
+    if config.trace_path is not None:
+        exporters.append(JsonTraceSpanExporter(config.trace_path))
+    tracer = Tracer(registry, exporters)
+    try:
+        yield tracer
+    finally:
+        # writes the trace and metrics files
+        tracer.close()
+
+
 class LoggingContainer(containers.DeclarativeContainer):
     config = providers.Singleton(LoggingSettings)
 
@@ -64,25 +229,166 @@ class ApplicationContainer(containers.DeclarativeContainer):
 
     digit_recognition_settings = providers.Singleton(DigitRecognitionSettings)
     digit_recognition_reader = providers.Singleton(
-        easyocr.Reader, digit_recognition_settings().languages
+        create_easyocr_reader, digit_recognition_settings.provided.languages
     )
-    digit_recognition_service = providers.Singleton(
-        DigitRecognitionService,
+    easyocr_digit_recognition_engine = providers.Singleton(
+        lazy_import(
+            "bank_automation.infra.easyocr_digit_recognition_engine"
+            ".EasyOcrDigitRecognitionEngine"
+        ),
         reader=digit_recognition_reader,
         config=digit_recognition_settings,
     )
+    # shared by every login, the models are loaded once per worker process
+    process_pool_digit_recognition_engine = providers.Resource(
+        init_process_pool_digit_recognition_engine, digit_recognition_settings
+    )
+    ocr_digit_recognition_engine = providers.Selector(
+        digit_recognition_settings.provided.easyocr_backend,
+        in_process=easyocr_digit_recognition_engine,
+        process_pool=process_pool_digit_recognition_engine,
+    )
+    template_matching_digit_recognition_engine = providers.Singleton(
+        lazy_import(
+            "bank_automation.infra.template_matching_digit_recognition_engine"
+            ".TemplateMatchingDigitRecognitionEngine"
+        ),
+        config=digit_recognition_settings,
+        # only load easyocr if a template match is not confident enough
+        fallback_engine_provider=ocr_digit_recognition_engine.provider,
+    )
+    digit_recognition_engine = providers.Selector(
+        digit_recognition_settings.provided.engine,
+        template=template_matching_digit_recognition_engine,
+        easyocr=ocr_digit_recognition_engine,
+    )
+    digit_recognition_cache = providers.Singleton(
+        lazy_import(
+            "bank_automation.infra.digit_recognition_cache.DigitRecognitionCache"
+        ),
+        config=digit_recognition_settings,
+    )
+    digit_recognition_service = providers.Singleton(
+        lazy_import(
+            "bank_automation.services.digit_recognition_service.DigitRecognitionService"
+        ),
+        engine=digit_recognition_engine,
+        config=digit_recognition_settings,
+        cache=digit_recognition_cache,
+    )
+    # started when resolved, the models load while the browser navigates
+    digit_recognition_warm_up = providers.Singleton(
+        create_digit_recognition_warm_up,
+        digit_recognition_service.provider,
+        digit_recognition_settings,
+    )
+
+    metrics_settings = providers.Singleton(MetricsSettings)
+    metrics_registry = providers.Singleton(create_metrics_registry, metrics_settings)
+    tracer = providers.Resource(init_tracer, metrics_settings, metrics_registry)
+
+    keypad_resolver = providers.Singleton(
+        lazy_import("bank_automation.services.keypad_resolver.KeypadResolver"),
+        digit_recognition_warm_up=digit_recognition_warm_up,
+        config=digit_recognition_settings,
+        tracer=tracer,
+    )
+
+    browser_settings = providers.Singleton(BrowserSettings)
+    web_driver = providers.Resource(init_web_driver, browser_settings)
+    browser_service = providers.Singleton(
+        lazy_import("bank_automation.infra.browser_service.BrowserService"),
+        web_driver=web_driver,
+        config=browser_settings,
+        tracer=tracer,
+    )
 
-    web_driver = providers.Resource(init_web_driver)
-    browser_service = providers.Singleton(BrowserService, web_driver=web_driver)
+    # one new browser session per call, for concurrent profiles
+    web_driver_factory = providers.Factory(create_web_driver, browser_settings)
+    browser_service_factory = providers.Factory(
+        lazy_import("bank_automation.infra.browser_service.BrowserService"),
+        web_driver=web_driver_factory,
+        config=browser_settings,
+        tracer=tracer,
+    )
+
+    session_store_settings = providers.Singleton(SessionStoreSettings)
+    session_store = providers.Singleton(create_session_store, session_store_settings)
+
+    # one client per adapter: each holds the cookies of its profile
+    http_client_settings = providers.Singleton(HttpClientSettings)
+    http_client_factory = providers.Factory(
+        lazy_import("bank_automation.infra.http_client.HttpClient"),
+        config=http_client_settings,
+    )
 
     caisse_d_epargne_config = providers.Singleton(CaisseDEpargneSettings)
     caisse_d_epargne_adapter = providers.Singleton(
-        CaisseDEpargneAdapter,
+        lazy_import(
+            "bank_automation.adapters.caisse_d_epargne_adapter.CaisseDEpargneAdapter"
+        ),
         config=caisse_d_epargne_config,
-        digit_recognition_service=digit_recognition_service,
-        browser_service=browser_service,
+        keypad_resolver=keypad_resolver,
+        browser_service_provider=browser_service.provider,
+        session_store=session_store,
+        http_client_provider=http_client_factory.provider,
+        tracer=tracer,
     )
+    caisse_d_epargne_adapter_factory = providers.Factory(
+        lazy_import(
+            "bank_automation.adapters.caisse_d_epargne_adapter.CaisseDEpargneAdapter"
+        ),
+        config=caisse_d_epargne_config,
+        keypad_resolver=keypad_resolver,
+        browser_service_provider=browser_service_factory.provider,
+        session_store=session_store,
+        http_client_provider=http_client_factory.provider,
+        tracer=tracer,
+    )
+
+    balance_store_settings = providers.Singleton(BalanceStoreSettings)
+    balance_store = providers.Singleton(create_balance_store, balance_store_settings)
 
+    banking_settings = providers.Singleton(BankingSettings)
     banking_service = providers.Singleton(
-        BankingService, caisse_d_epargne_adapter=caisse_d_epargne_adapter
+        lazy_import("bank_automation.services.banking_service.BankingService"),
+        caisse_d_epargne_adapter=caisse_d_epargne_adapter,
+        caisse_d_epargne_adapter_factory=caisse_d_epargne_adapter_factory.provider,
+        caisse_d_epargne_config=caisse_d_epargne_config,
+        config=banking_settings,
+        balance_store=balance_store,
+    )
+
+    transaction_export_settings = providers.Singleton(TransactionExportSettings)
+    transaction_export_service = providers.Singleton(
+        lazy_import(
+            "bank_automation.services.transaction_export_service.TransactionExportService"
+        ),
+        caisse_d_epargne_adapter_factory=caisse_d_epargne_adapter_factory.provider,
+        config=transaction_export_settings,
+    )
+
+    daemon_settings = providers.Singleton(DaemonSettings)
+    refresh_daemon = providers.Singleton(
+        lazy_import("bank_automation.services.refresh_daemon.RefreshDaemon"),
+        banking_service=banking_service,
+        config=daemon_settings,
+        balance_store=balance_store,
+    )
+
+    balance_api_settings = providers.Singleton(BalanceApiSettings)
+    balance_query_service = providers.Singleton(
+        lazy_import(
+            "bank_automation.services.balance_query_service.BalanceQueryService"
+        ),
+        banking_service=banking_service,
+        caisse_d_epargne_config=caisse_d_epargne_config,
+        config=balance_api_settings,
+        balance_store=balance_store,
+    )
+    balance_api_server = providers.Singleton(
+        lazy_import("bank_automation.infra.balance_api_server.BalanceApiServer"),
+        balance_query_service=balance_query_service,
+        config=balance_api_settings,
+        metrics_registry=metrics_registry,
     )
@@ -8,3 +8,13 @@ class PasswordOcrError(ValueError):
         super().__init__(
             f"Could not recognize password button image digit with OCR from the following value: {cssBackgroundImage}"
         )
+
+
+class PasswordDigitNotFoundError(ValueError):
+    def __init__(self, digits: list[int]) -> None:
+        super().__init__(f"Could not find the keypad buttons of digits: {digits}")
+
+
+class ProfileNotFoundError(ValueError):
+    def __init__(self, profile_name: str) -> None:
+        super().__init__(f"Profile not found: {profile_name}")
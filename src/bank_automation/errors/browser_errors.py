@@ -1,3 +1,5 @@
-class MaxRetriesExceededError(ValueError):
-    def __init__(self, try_count: int) -> None:
-        super().__init__(f"max retries exceeded: {try_count}")
+class WaitTimeoutError(ValueError):
+    def __init__(self, timeout_in_seconds: float, locators: list) -> None:
+        super().__init__(
+            f"timed out after {timeout_in_seconds}s waiting for elements: {locators}"
+        )
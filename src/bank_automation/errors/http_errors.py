@@ -0,0 +1,3 @@
+class HttpUnauthorizedError(ValueError):
+    def __init__(self, url: str, status_code: int) -> None:
+        super().__init__(f"request to {url} was not authorized: HTTP {status_code}")
@@ -0,0 +1,158 @@
+import asyncio
+import dataclasses
+import http
+import json
+import urllib.parse
+from typing import Any
+
+from bank_automation.errors.banking_errors import ProfileNotFoundError
+from bank_automation.infra.tracing import MetricsRegistry
+from bank_automation.services.balance_query_service import BalanceQueryService
+from bank_automation.services.base_service import BaseService
+from bank_automation.settings import BalanceApiSettings
+
+_MAX_HEADER_COUNT = 100
+
+
+class BalanceApiServer(BaseService):
+    """Minimal HTTP/1.1 JSON API over `BalanceQueryService`, for local clients.
+
+    Routes:
+        GET /balances: balances of the default profile
+        GET /balances/<profile name>: balances of the profile
+        GET /profiles: names of the configured profiles
+        GET /metrics: metrics registry, in the Prometheus text format
+    """
+
+    def __init__(
+        self,
+        balance_query_service: BalanceQueryService,
+        config: BalanceApiSettings,
+        metrics_registry: MetricsRegistry | None = None,
+    ) -> None:
+        super().__init__()
+        self.balance_query_service = balance_query_service
+        self.config = config
+        self.metrics_registry = metrics_registry
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(
+            self._handle_connection, host=self.config.host, port=self.config.port
+        )
+        self.logger.getChild(self.start.__name__).info(
+            f"listening on http://{self.get_address()}"
+        )
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.balance_query_service.close()
+
+    def get_address(self) -> str:
+        """Return the bound host:port, the configured port may be 0."""
+        assert self._server is not None
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"{host}:{port}"
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        logger = self.logger.getChild(self._handle_connection.__name__)
+        try:
+            # connections are kept alive until the client closes them
+            while True:
+                request_line = await reader.readline()
+                if request_line == b"":
+                    break
+                headers = await self._read_headers(reader)
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+
+                status, body = await self._route(method, target)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, body, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError as e:
+            logger.debug(f"malformed request: {e!r}")
+            self._write_response(
+                writer, http.HTTPStatus.BAD_REQUEST, {"error": "bad request"}, False
+            )
+        finally:
+            writer.close()
+
+    async def _read_headers(self, reader: asyncio.StreamReader) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        for _ in range(_MAX_HEADER_COUNT):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        raise ValueError("too many headers")
+
+    async def _route(self, method: str, target: str) -> tuple[http.HTTPStatus, Any]:
+        logger = self.logger.getChild(self._route.__name__)
+
+        if method != "GET":
+            return http.HTTPStatus.METHOD_NOT_ALLOWED, {"error": "method not allowed"}
+
+        path_parts = [
+            urllib.parse.unquote(part)
+            for part in urllib.parse.urlsplit(target).path.split("/")
+            if part != ""
+        ]
+        if path_parts == ["profiles"]:
+            return http.HTTPStatus.OK, self.balance_query_service.get_profile_names()
+        if path_parts == ["metrics"] and self.metrics_registry is not None:
+            # plain text, unlike the other routes
+            return http.HTTPStatus.OK, self.metrics_registry.to_prometheus_text()
+        if len(path_parts) not in (1, 2) or path_parts[0] != "balances":
+            return http.HTTPStatus.NOT_FOUND, {"error": "not found"}
+
+        profile_name = path_parts[1] if len(path_parts) == 2 else None
+        try:
+            cached = await self.balance_query_service.get_balances(profile_name)
+        except ProfileNotFoundError as e:
+            return http.HTTPStatus.NOT_FOUND, {"error": str(e)}
+        except Exception as e:
+            logger.error(f"could not get balances of profile {profile_name}: {e!r}")
+            return http.HTTPStatus.BAD_GATEWAY, {"error": "could not fetch balances"}
+
+        return http.HTTPStatus.OK, {
+            "profile_name": cached.profile_name,
+            "accounts": [
+                dataclasses.asdict(account_balance)
+                for account_balance in cached.balances.accounts
+            ],
+            "fetched_at": cached.fetched_at,
+            "age_in_seconds": cached.get_age_in_seconds(),
+        }
+
+    def _write_response(
+        self,
+        writer: asyncio.StreamWriter,
+        status: http.HTTPStatus,
+        body: Any,
+        keep_alive: bool,
+    ) -> None:
+        if isinstance(body, str):
+            content = body.encode()
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            content = json.dumps(body).encode()
+            content_type = "application/json"
+        writer.write(
+            (
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(content)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                "\r\n"
+            ).encode("latin-1")
+            + content
+        )
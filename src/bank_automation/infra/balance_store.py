@@ -0,0 +1,168 @@
+import dataclasses
+import os
+import sqlite3
+import threading
+import time
+
+from bank_automation.services.base_service import BaseService
+from bank_automation.settings import BalanceStoreSettings
+
+# The primary key doubles as the index of latest-value and time-range queries.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS balance_snapshots (
+    profile_name TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    balance REAL NOT NULL,
+    PRIMARY KEY (profile_name, account_id, timestamp)
+) WITHOUT ROWID
+"""
+
+
+@dataclasses.dataclass(frozen=True)
+class BalanceSnapshot:
+    profile_name: str
+    account_id: str
+    balance: float
+    timestamp: float = dataclasses.field(default_factory=time.time)
+
+
+class BalanceStore(BaseService):
+    """Time series of account balances, in a SQLite table keyed by profile,
+    account and timestamp.
+
+    A snapshot replaces any previous one with the same key, and `compact`
+    deletes the old snapshots it thins out. Each batch of snapshots is written
+    in a single transaction.
+
+    Every call of this store shares one connection behind a lock. The database
+    runs in WAL mode, so that other processes reading it do not block the
+    writer. Calls block on disk I/O: run them in a thread from coroutines.
+    """
+
+    def __init__(self, config: BalanceStoreSettings) -> None:
+        super().__init__()
+        self.config = config
+
+        directory = os.path.dirname(config.path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(config.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            # durable at checkpoints only, a crash may lose the latest batch
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(_SCHEMA)
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def append(self, snapshots: list[BalanceSnapshot]) -> None:
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO balance_snapshots"
+                " (profile_name, account_id, timestamp, balance) VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        snapshot.profile_name,
+                        snapshot.account_id,
+                        snapshot.timestamp,
+                        snapshot.balance,
+                    )
+                    for snapshot in snapshots
+                ],
+            )
+
+    def get_latest(self, profile_name: str, account_id: str) -> BalanceSnapshot | None:
+        rows = self._query(
+            "SELECT profile_name, account_id, balance, timestamp FROM balance_snapshots"
+            " WHERE profile_name = ? AND account_id = ?"
+            " ORDER BY timestamp DESC LIMIT 1",
+            (profile_name, account_id),
+        )
+        return rows[0] if len(rows) > 0 else None
+
+    def get_latest_of_every_account(
+        self, profile_name: str | None = None
+    ) -> list[BalanceSnapshot]:
+        """Return the latest snapshot of each account, of every profile or of the
+        given one."""
+        # SQLite returns the bare columns of the row holding the MAX()
+        query = (
+            "SELECT profile_name, account_id, balance, MAX(timestamp)"
+            " FROM balance_snapshots"
+        )
+        parameters: tuple = ()
+        if profile_name is not None:
+            query += " WHERE profile_name = ?"
+            parameters = (profile_name,)
+        query += " GROUP BY profile_name, account_id ORDER BY profile_name, account_id"
+        return self._query(query, parameters)
+
+    def get_range(
+        self,
+        profile_name: str,
+        account_id: str,
+        start_timestamp: float,
+        end_timestamp: float,
+    ) -> list[BalanceSnapshot]:
+        """Return the snapshots of the account taken in [start, end), oldest first."""
+        return self._query(
+            "SELECT profile_name, account_id, balance, timestamp FROM balance_snapshots"
+            " WHERE profile_name = ? AND account_id = ?"
+            " AND timestamp >= ? AND timestamp < ?"
+            " ORDER BY timestamp",
+            (profile_name, account_id, start_timestamp, end_timestamp),
+        )
+
+    def compact(self, now: float | None = None) -> int:
+        """Keep only the latest snapshot of each account per compaction interval,
+        among the snapshots older than the compaction age.
+
+        Returns:
+            the number of deleted snapshots
+        """
+        logger = self.logger.getChild(self.compact.__name__)
+
+        if now is None:
+            now = time.time()
+        cutoff_timestamp = now - self.config.compaction_age_in_seconds
+        interval = self.config.compaction_interval_in_seconds
+
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM balance_snapshots AS snapshot"
+                " WHERE snapshot.timestamp < :cutoff AND EXISTS ("
+                "  SELECT 1 FROM balance_snapshots AS newer"
+                "  WHERE newer.profile_name = snapshot.profile_name"
+                "  AND newer.account_id = snapshot.account_id"
+                "  AND newer.timestamp > snapshot.timestamp"
+                "  AND newer.timestamp < :cutoff"
+                "  AND CAST(newer.timestamp / :interval AS INTEGER)"
+                "   = CAST(snapshot.timestamp / :interval AS INTEGER)"
+                " )",
+                {"cutoff": cutoff_timestamp, "interval": interval},
+            )
+            deleted_count = cursor.rowcount
+        logger.info(f"deleted {deleted_count} snapshots")
+
+        if deleted_count > 0:
+            with self._lock:
+                self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted_count
+
+    def _query(self, query: str, parameters: tuple) -> list[BalanceSnapshot]:
+        with self._lock:
+            rows = self._connection.execute(query, parameters).fetchall()
+        return [
+            BalanceSnapshot(
+                profile_name=profile_name,
+                account_id=account_id,
+                balance=balance,
+                timestamp=timestamp,
+            )
+            for profile_name, account_id, balance, timestamp in rows
+        ]
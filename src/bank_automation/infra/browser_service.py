@@ -1,98 +1,481 @@
 import asyncio
-from typing import Callable
+import collections
+import concurrent.futures
+import dataclasses
+import functools
+import json
+from typing import Any, Callable, TypeVar
 
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoSuchElementException,
+    TimeoutException,
+)
 from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.common.by import By, ByType
 from selenium.webdriver.remote.webelement import WebElement
 
-from bank_automation.errors.browser_errors import MaxRetriesExceededError
+from bank_automation.errors.browser_errors import WaitTimeoutError
+from bank_automation.infra.tracing import Tracer
 from bank_automation.services.base_service import BaseService
+from bank_automation.settings import BrowserSettings
+
+T = TypeVar("T")
+
+WEBDRIVER_CALLS_METRIC = "bank_automation_webdriver_calls_total"
+WAIT_ATTEMPTS_METRIC = "bank_automation_wait_attempts_total"
+
+# stats of the last pages loaded, the session may live as long as the daemon
+PAGE_STATS_HISTORY_SIZE = 32
+
+_CDP_COOKIE_PARAM_KEYS = {
+    "name",
+    "value",
+    "domain",
+    "path",
+    "secure",
+    "httpOnly",
+    "sameSite",
+    "expires",
+}
+
+_WAIT_SCRIPT_LOCATOR_STRATEGIES = {
+    By.ID,
+    By.CSS_SELECTOR,
+    By.CLASS_NAME,
+    By.NAME,
+    By.TAG_NAME,
+    By.XPATH,
+}
+_WAIT_SCRIPT_RETRY_DELAY_IN_SECONDS = 0.05
+# errors of a pending script whose document was navigated away from, lowercase
+_NAVIGATION_ERROR_MESSAGES = (
+    "document unloaded",
+    "execution context was destroyed",
+    "inspected target navigated or closed",
+)
+
+# Resolves with [locator index, elements] as soon as an element matches one of
+# the locators (or with [-1, []] once none matches, when waiting for absence),
+# and with null on timeout. Checks run on DOM mutations instead of polling.
+_WAIT_SCRIPT = """
+const [locators, shouldBePresent, timeoutInMilliseconds, done] = arguments;
+
+const find = ({ by, value }) => {
+  switch (by) {
+    case "id": {
+      const element = document.getElementById(value);
+      return element === null ? [] : [element];
+    }
+    case "css selector":
+      return Array.from(document.querySelectorAll(value));
+    case "class name":
+      return Array.from(document.getElementsByClassName(value));
+    case "name":
+      return Array.from(document.getElementsByName(value));
+    case "tag name":
+      return Array.from(document.getElementsByTagName(value));
+    case "xpath": {
+      const snapshot = document.evaluate(
+        value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+      );
+      return Array.from(
+        { length: snapshot.snapshotLength }, (_, index) => snapshot.snapshotItem(index)
+      );
+    }
+  }
+  throw new Error(`unsupported locator strategy: ${by}`);
+};
+
+const check = () => {
+  if (!shouldBePresent) {
+    return locators.every((locator) => find(locator).length === 0) ? [-1, []] : null;
+  }
+  for (let index = 0; index < locators.length; index++) {
+    const elements = find(locators[index]);
+    if (elements.length > 0) {
+      return [index, elements];
+    }
+  }
+  return null;
+};
+
+const initialResult = check();
+if (initialResult !== null) {
+  done(initialResult);
+  return;
+}
+
+let timer = null;
+const observer = new MutationObserver(() => {
+  const result = check();
+  if (result !== null) {
+    observer.disconnect();
+    clearTimeout(timer);
+    done(result);
+  }
+});
+observer.observe(document, {
+  childList: true, subtree: true, attributes: true, characterData: true,
+});
+timer = setTimeout(() => {
+  observer.disconnect();
+  done(null);
+}, timeoutInMilliseconds);
+"""
+
+# Maps every element matching the root selector to an object holding the text
+# of its fields, so that a whole list is read in a single round-trip.
+_EXTRACT_SCRIPT = """
+const [rootSelector, fields] = arguments;
+
+return Array.from(document.querySelectorAll(rootSelector), (root) =>
+  Object.fromEntries(
+    Object.entries(fields).map(([name, { selector, multiple }]) => {
+      if (multiple) {
+        return [
+          name,
+          Array.from(root.querySelectorAll(selector), (element) => element.innerText),
+        ];
+      }
+      const element = root.querySelector(selector);
+      return [name, element === null ? null : element.innerText];
+    })
+  )
+);
+"""
+
+# Sums up the Resource Timing entries of the current document. Sizes of
+# cross-origin resources without Timing-Allow-Origin are reported as 0.
+_PAGE_STATS_SCRIPT = """
+const [navigation] = performance.getEntriesByType("navigation");
+const entries = performance.getEntriesByType("resource");
+if (navigation !== undefined) {
+  entries.push(navigation);
+}
+const positiveOrNull = (value) => (value > 0 ? value : null);
+
+return {
+  url: window.location.href,
+  request_count: entries.length,
+  transferred_bytes: entries.reduce((total, entry) => total + entry.transferSize, 0),
+  decoded_bytes: entries.reduce((total, entry) => total + entry.decodedBodySize, 0),
+  dom_content_loaded_in_ms: positiveOrNull(navigation?.domContentLoadedEventEnd),
+  load_in_ms: positiveOrNull(navigation?.loadEventEnd),
+  js_heap_used_bytes: performance.memory?.usedJSHeapSize ?? null,
+};
+"""
+
+
+@dataclasses.dataclass(frozen=True)
+class PageStats:
+    url: str
+    request_count: int
+    transferred_bytes: int
+    decoded_bytes: int
+    dom_content_loaded_in_ms: float | None
+    load_in_ms: float | None
+    js_heap_used_bytes: int | None
+
+
+@dataclasses.dataclass(frozen=True)
+class ExtractionField:
+    """Field of `BrowserService.extract_all`, read from the descendants of each
+    root element matching the CSS selector.
+
+    Its value is the text of the first match (or None), or the texts of every
+    match if `multiple` is set.
+    """
+
+    selector: str
+    multiple: bool = False
 
 
 class BrowserService(BaseService):
-    def __init__(self, web_driver: WebDriver) -> None:
+    """Asynchronous facade over a WebDriver session.
+
+    Every WebDriver call blocks on an HTTP round-trip to the driver, so they all
+    run on a single worker thread dedicated to this session: the event loop
+    stays free and the session's calls keep their order. Each call is counted
+    by the tracer, by method.
+    """
+
+    def __init__(
+        self,
+        web_driver: WebDriver,
+        config: BrowserSettings,
+        tracer: Tracer | None = None,
+    ) -> None:
         self.web_driver = web_driver
+        self.config = config
+        self.tracer = tracer if tracer is not None else Tracer()
         self.web_driver.implicitly_wait(0.5)
+        self.page_stats: collections.deque[PageStats] = collections.deque(
+            maxlen=PAGE_STATS_HISTORY_SIZE
+        )
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=self.__class__.__name__
+        )
         super().__init__()
 
-    def get(self, url: str):
-        self.web_driver.get(url)
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.web_driver.quit()
 
-    def find_element_by_id_optional(self, id: str) -> WebElement | None:
-        return self._find_element_optional(by=By.ID, value=id)
+    async def get(self, url: str):
+        await self._run(self.web_driver.get, url)
 
-    def find_element_by_id(self, id: str) -> WebElement:
-        return self._find_element(by=By.ID, value=id)
+        if self.config.collect_page_stats:
+            page_stats = await self.get_page_stats()
+            self.logger.getChild(self.get.__name__).info(
+                f"loaded {page_stats.url}: {page_stats.request_count} requests,"
+                f" {page_stats.transferred_bytes} bytes transferred,"
+                f" DOM ready in {page_stats.dom_content_loaded_in_ms} ms,"
+                f" JS heap {page_stats.js_heap_used_bytes} bytes"
+            )
+            self.page_stats.append(page_stats)
 
-    def find_elements_by_css_selector(self, selector: str) -> list[WebElement]:
-        return self._find_elements(by=By.CSS_SELECTOR, value=selector)
+    async def get_page_stats(self) -> PageStats:
+        """Return the network and timing stats of the current document, as
+        measured by the page itself."""
+        result = await self._run(self.web_driver.execute_script, _PAGE_STATS_SCRIPT)
+        return PageStats(**result)
 
-    def get_current_url(self) -> str:
-        return self.web_driver.current_url
+    async def find_element_by_id_optional(self, id: str) -> WebElement | None:
+        return await self._run(self._find_element_optional, By.ID, id)
+
+    async def find_element_by_id(self, id: str) -> WebElement:
+        return await self._run(self._find_element, By.ID, id)
+
+    async def find_elements_by_css_selector(self, selector: str) -> list[WebElement]:
+        return await self._run(self._find_elements, By.CSS_SELECTOR, selector)
+
+    async def find_child_element(
+        self, element: WebElement, by: ByType, value: str
+    ) -> WebElement:
+        return await self._run(element.find_element, by, value)
+
+    async def find_child_elements(
+        self, element: WebElement, by: ByType, value: str
+    ) -> list[WebElement]:
+        return await self._run(element.find_elements, by, value)
+
+    async def click(self, element: WebElement) -> None:
+        await self._run(element.click)
+
+    async def send_keys(self, element: WebElement, text: str) -> None:
+        await self._run(element.send_keys, text)
+
+    async def get_text(self, element: WebElement) -> str:
+        return await self._run(self._get_text, element)
+
+    async def get_css_property(self, element: WebElement, name: str) -> str:
+        return await self._run(element.value_of_css_property, name)
+
+    async def get_current_url(self) -> str:
+        return await self._run(self._get_current_url)
+
+    async def get_all_cookies(self) -> list[dict[str, Any]]:
+        """Return the cookies of every domain, HTTP-only ones included."""
+        result = await self._run(
+            self.web_driver.execute_cdp_cmd, "Network.getAllCookies", {}
+        )
+        return result["cookies"]
+
+    async def set_cookies(self, cookies: list[dict[str, Any]]) -> None:
+        """Set cookies as returned by `get_all_cookies`, whatever the current page."""
+        cookie_params = [
+            {
+                key: value
+                for key, value in cookie.items()
+                if key in _CDP_COOKIE_PARAM_KEYS
+                # session cookies have an expiry of -1
+                and not (key == "expires" and value < 0)
+            }
+            for cookie in cookies
+        ]
+        await self._run(
+            self.web_driver.execute_cdp_cmd,
+            "Network.setCookies",
+            {"cookies": cookie_params},
+        )
+
+    async def get_local_storage(self) -> dict[str, str]:
+        return await self._run(
+            self.web_driver.execute_script,
+            "return Object.fromEntries(Object.entries(window.localStorage));",
+        )
+
+    async def inject_local_storage(self, origin: str, items: dict[str, str]) -> str:
+        """Fill the local storage of the origin before any of its scripts run, on
+        every following page load until `remove_injected_script` is called.
+
+        Returns:
+            the identifier of the injected script
+        """
+        script = (
+            f"if (window.location.origin === {json.dumps(origin)}) {{"
+            f" for (const [key, value] of Object.entries({json.dumps(items)}))"
+            " window.localStorage.setItem(key, value); }"
+        )
+        result = await self._run(
+            self.web_driver.execute_cdp_cmd,
+            "Page.addScriptToEvaluateOnNewDocument",
+            {"source": script},
+        )
+        return result["identifier"]
+
+    async def remove_injected_script(self, identifier: str) -> None:
+        await self._run(
+            self.web_driver.execute_cdp_cmd,
+            "Page.removeScriptToEvaluateOnNewDocument",
+            {"identifier": identifier},
+        )
+
+    async def extract_all(
+        self, root_selector: str, fields: dict[str, ExtractionField]
+    ) -> list[dict[str, Any]]:
+        """Read the text of the fields of every element matching the root CSS
+        selector, in a single script execution.
+
+        Returns:
+            one dict of field name to field value per root element, in document
+            order
+        """
+        script_fields = {
+            name: dataclasses.asdict(field) for name, field in fields.items()
+        }
+        return await self._run(
+            self.web_driver.execute_script,
+            _EXTRACT_SCRIPT,
+            root_selector,
+            script_fields,
+        )
 
     async def wait_for_element_to_disappear(
         self,
         by: ByType,
         value: str,
-        max_try_count: int = 30,
-        sleep_delay_in_seconds: float = 2.0,
+        timeout_in_seconds: float = 60.0,
     ):
-        logger = self.logger.getChild(self.wait_for_element_to_disappear.__name__)
-
-        def stop_condition() -> bool:
-            element = self._find_element_optional(by=by, value=value)
-            if element is None:
-                return True
-            logger.error("Found MFA dialog, waiting for human MFA approval...")
-            return False
-
-        return await self._wait_for(
-            is_stop_condition_reached=stop_condition,
-            max_try_count=max_try_count,
-            sleep_delay_in_seconds=sleep_delay_in_seconds,
+        await self._wait_for_dom(
+            locators=[(by, value)],
+            should_be_present=False,
+            timeout_in_seconds=timeout_in_seconds,
         )
 
     async def wait_for_elements(
         self,
         by: ByType,
         value: str,
-        max_try_count: int = 5,
-        sleep_delay_in_seconds: float = 1.0,
+        timeout_in_seconds: float = 5.0,
     ) -> list[WebElement]:
-        logger = self.logger.getChild(self.wait_for_elements.__name__)
-        elements: list[WebElement] = []
-
-        def stop_condition():
-            nonlocal elements
-            elements = self._find_elements(by=by, value=value)
-            if len(elements) > 0:
-                return True
-            logger.error(f"No elements found (by='{by}', value='{value}')")
-            return False
-
-        await self._wait_for(
-            is_stop_condition_reached=stop_condition,
-            max_try_count=max_try_count,
-            sleep_delay_in_seconds=sleep_delay_in_seconds,
+        _, elements = await self._wait_for_dom(
+            locators=[(by, value)],
+            should_be_present=True,
+            timeout_in_seconds=timeout_in_seconds,
         )
-
         return elements
 
-    async def _wait_for(
+    async def wait_for_any_element(
         self,
-        is_stop_condition_reached: Callable[[], bool],
-        max_try_count: int = 30,
-        sleep_delay_in_seconds: float = 2.0,
-    ):
-        logger = self.logger.getChild(self._wait_for.__name__)
+        locators: list[tuple[ByType, str]],
+        timeout_in_seconds: float = 10.0,
+    ) -> tuple[ByType, str]:
+        """Wait until an element matching one of the locators is present.
+
+        Returns:
+            the first locator matching an element
+        """
+        matched_index, _ = await self._wait_for_dom(
+            locators=locators,
+            should_be_present=True,
+            timeout_in_seconds=timeout_in_seconds,
+        )
+        return locators[matched_index]
+
+    async def _wait_for_dom(
+        self,
+        locators: list[tuple[ByType, str]],
+        should_be_present: bool,
+        timeout_in_seconds: float,
+    ) -> tuple[int, list[WebElement]]:
+        """Wait in the page until an element matches one of the locators, or until
+        none does, resolving on the first DOM mutation that satisfies it.
+
+        Returns:
+            the index of the matched locator and its matching elements, or
+            (-1, []) when waiting for the elements to be absent
+
+        Raises:
+            WaitTimeoutError:
+        """
+        logger = self.logger.getChild(self._wait_for_dom.__name__)
+
+        for by, _ in locators:
+            if by not in _WAIT_SCRIPT_LOCATOR_STRATEGIES:
+                raise ValueError(f"unsupported locator strategy: {by}")
+        script_locators = [{"by": by, "value": value} for by, value in locators]
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_in_seconds
+        while True:
+            remaining_time = deadline - loop.time()
+            if remaining_time <= 0:
+                raise WaitTimeoutError(timeout_in_seconds, locators)
+            try:
+                result = await self._run(
+                    self._execute_wait_script,
+                    script_locators,
+                    should_be_present,
+                    remaining_time,
+                )
+            except (JavascriptException, TimeoutException) as e:
+                # navigating away from the page discards the pending script,
+                # any other script error is a bug
+                if isinstance(e, JavascriptException) and not _is_navigation_error(e):
+                    raise
+                logger.debug(f"wait interrupted, retrying: {e.msg}")
+                self.tracer.increment(WAIT_ATTEMPTS_METRIC, {"outcome": "interrupted"})
+                await asyncio.sleep(_WAIT_SCRIPT_RETRY_DELAY_IN_SECONDS)
+                continue
+
+            if result is None:
+                self.tracer.increment(WAIT_ATTEMPTS_METRIC, {"outcome": "timeout"})
+                raise WaitTimeoutError(timeout_in_seconds, locators)
+            self.tracer.increment(WAIT_ATTEMPTS_METRIC, {"outcome": "matched"})
+            matched_index, elements = result
+            return matched_index, elements
+
+    def _execute_wait_script(
+        self,
+        script_locators: list[dict[str, str]],
+        should_be_present: bool,
+        timeout_in_seconds: float,
+    ) -> list | None:
+        self.web_driver.set_script_timeout(timeout_in_seconds + 1)
+        return self.web_driver.execute_async_script(
+            _WAIT_SCRIPT,
+            script_locators,
+            should_be_present,
+            int(timeout_in_seconds * 1000),
+        )
+
+    async def _run(self, function: Callable[..., T], *args: Any) -> T:
+        self.tracer.increment(
+            WEBDRIVER_CALLS_METRIC,
+            {"method": getattr(function, "__name__", type(function).__name__)},
+        )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(function, *args)
+        )
 
-        for try_index in range(max_try_count):
-            if is_stop_condition_reached():
-                return
-            await asyncio.sleep(sleep_delay_in_seconds)
-            logger.info(f"Waiting... ({try_index + 1}/{max_try_count})")
-        raise MaxRetriesExceededError(try_count=max_try_count)
+    def _get_text(self, element: WebElement) -> str:
+        return element.text
+
+    def _get_current_url(self) -> str:
+        return self.web_driver.current_url
 
     def _find_element(self, by: ByType, value: str | None) -> WebElement:
         return self.web_driver.find_element(by=by, value=value)
@@ -111,3 +494,8 @@ class BrowserService(BaseService):
         value: str | None,
     ) -> list[WebElement]:
         return self.web_driver.find_elements(by=by, value=value)
+
+
+def _is_navigation_error(exception: JavascriptException) -> bool:
+    message = (exception.msg or "").lower()
+    return any(marker in message for marker in _NAVIGATION_ERROR_MESSAGES)
@@ -0,0 +1,143 @@
+import collections
+import dataclasses
+import hashlib
+import os
+import threading
+import time
+
+from bank_automation.services.base_service import BaseService
+from bank_automation.settings import DigitRecognitionSettings
+
+
+@dataclasses.dataclass
+class DigitRecognitionCacheStats:
+    hit_count: int
+    miss_count: int
+    memory_entry_count: int
+    disk_entry_count: int
+
+
+class DigitRecognitionCache(BaseService):
+    """Content-addressed cache of recognized digits.
+
+    Entries are keyed by the SHA-256 of the (truncated) PNG bytes. Lookups go
+    through an in-memory LRU layer first, then through an on-disk store that
+    survives process restarts. Both layers are bounded by entry count, the
+    least recently used entries being evicted first.
+    """
+
+    def __init__(self, config: DigitRecognitionSettings) -> None:
+        super().__init__()
+        self.config = config
+
+        self.hit_count = 0
+        self.miss_count = 0
+
+        self._memory: collections.OrderedDict[str, int] = collections.OrderedDict()
+        # concurrent logins recognize their keypads from worker threads
+        self._lock = threading.Lock()
+
+        self._directory = config.cache_directory
+        self._disk_entry_count = 0
+        self._last_access_time_ns = 0
+        if self._directory is not None:
+            os.makedirs(self._directory, exist_ok=True)
+            self._disk_entry_count = len(os.listdir(self._directory))
+
+    @staticmethod
+    def key_for(image_bytes: bytes | memoryview) -> str:
+        return hashlib.sha256(image_bytes).hexdigest()
+
+    def get(self, key: str) -> int | None:
+        with self._lock:
+            return self._get(key)
+
+    def set(self, key: str, digit: int) -> None:
+        with self._lock:
+            self._store_in_memory(key, digit)
+            self._write_to_disk(key, digit)
+
+    def _get(self, key: str) -> int | None:
+        digit = self._memory.get(key)
+        if digit is not None:
+            self._memory.move_to_end(key)
+            self.hit_count += 1
+            return digit
+
+        digit = self._read_from_disk(key)
+        if digit is not None:
+            self._store_in_memory(key, digit)
+            self.hit_count += 1
+            return digit
+
+        self.miss_count += 1
+        return None
+
+    def stats(self) -> DigitRecognitionCacheStats:
+        return DigitRecognitionCacheStats(
+            hit_count=self.hit_count,
+            miss_count=self.miss_count,
+            memory_entry_count=len(self._memory),
+            disk_entry_count=self._disk_entry_count,
+        )
+
+    def _store_in_memory(self, key: str, digit: int) -> None:
+        self._memory[key] = digit
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.config.cache_memory_max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_from_disk(self, key: str) -> int | None:
+        if self._directory is None:
+            return None
+
+        path = os.path.join(self._directory, key)
+        try:
+            with open(path, "r", encoding="ascii") as file:
+                content = file.read().strip()
+        except FileNotFoundError:
+            return None
+
+        if not content.isdigit():
+            self.logger.warning(f"ignoring corrupted cache entry: {path}")
+            return None
+        self._touch(path)
+        return int(content)
+
+    def _write_to_disk(self, key: str, digit: int) -> None:
+        if self._directory is None:
+            return
+
+        path = os.path.join(self._directory, key)
+        is_new_entry = not os.path.exists(path)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="ascii") as file:
+            file.write(str(digit))
+        os.replace(temporary_path, path)
+        self._touch(path)
+
+        if is_new_entry:
+            self._disk_entry_count += 1
+        if self._disk_entry_count > self.config.cache_disk_max_entries:
+            self._evict_from_disk()
+
+    def _touch(self, path: str) -> None:
+        # file system timestamps are coarse, force them to be strictly increasing
+        # so that eviction is least-recently-used
+        access_time_ns = max(time.time_ns(), self._last_access_time_ns + 1)
+        os.utime(path, ns=(access_time_ns, access_time_ns))
+        self._last_access_time_ns = access_time_ns
+
+    def _evict_from_disk(self) -> None:
+        logger = self.logger.getChild(self._evict_from_disk.__name__)
+        assert self._directory is not None
+
+        paths = [
+            os.path.join(self._directory, name) for name in os.listdir(self._directory)
+        ]
+        paths.sort(key=lambda path: os.stat(path).st_mtime_ns)
+        excess_count = len(paths) - self.config.cache_disk_max_entries
+        for path in paths[: max(excess_count, 0)]:
+            os.remove(path)
+        self._disk_entry_count = min(len(paths), self.config.cache_disk_max_entries)
+        logger.debug(f"evicted {max(excess_count, 0)} entries")
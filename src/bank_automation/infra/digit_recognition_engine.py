@@ -0,0 +1,67 @@
+import abc
+import asyncio
+
+import numpy as np
+
+DIGIT_COUNT = 10
+
+# a dark vertical stroke on a light background, which looks like a 1
+_WARM_UP_IMAGE = np.full((32, 32), 255, dtype=np.uint8)
+_WARM_UP_IMAGE[6:26, 14:18] = 0
+
+
+class DigitRecognitionEngine(abc.ABC):
+    @abc.abstractmethod
+    def recognize_batch_with_confidence(
+        self, images: list[np.ndarray]
+    ) -> list[tuple[int | None, float]]:
+        """Recognize one digit per image, along with the engine's confidence.
+
+        Args:
+            images: 2D uint8 grayscale images, as decoded by
+                `decode_png_to_grayscale`
+
+        Returns:
+            the top candidate digit of each image and its confidence, in the
+            same order, or (None, 0.0) when no digit could be recognized
+        """
+
+    def recognize_batch(self, images: list[np.ndarray]) -> list[int | None]:
+        """Recognize one digit per image.
+
+        Returns:
+            the recognized digit of each image, in the same order, or None when
+            no digit could be recognized
+        """
+        return [digit for digit, _ in self.recognize_batch_with_confidence(images)]
+
+    def score_batch(self, images: list[np.ndarray]) -> np.ndarray:
+        """Score every digit for each image.
+
+        Engines which only report their top candidate score the other digits 0.
+
+        Returns:
+            a float32 array of shape (len(images), 10), the confidence of each
+            digit for each image
+        """
+        return self._to_scores(self.recognize_batch_with_confidence(images))
+
+    async def score_batch_async(self, images: list[np.ndarray]) -> np.ndarray:
+        """Score every digit for each image, as `score_batch`, without blocking
+        the event loop.
+
+        Runs `score_batch` in a thread, unless the engine can await its
+        results.
+        """
+        return await asyncio.to_thread(self.score_batch, images)
+
+    def warm_up(self) -> None:
+        """Load the models and run a first inference on a synthetic image."""
+        self.recognize_batch_with_confidence([_WARM_UP_IMAGE])
+
+    def _to_scores(self, results: list[tuple[int | None, float]]) -> np.ndarray:
+        scores = np.zeros((len(results), DIGIT_COUNT), dtype=np.float32)
+        for index, (digit, confidence) in enumerate(results):
+            if digit is not None:
+                scores[index, digit] = confidence
+        return scores
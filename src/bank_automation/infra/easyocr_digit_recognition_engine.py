@@ -0,0 +1,142 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from bank_automation.infra.digit_recognition_engine import DigitRecognitionEngine
+from bank_automation.services.base_service import BaseService
+from bank_automation.settings import DigitRecognitionSettings
+
+if TYPE_CHECKING:
+    import easyocr
+
+_ALLOWLIST = "0123456789"
+
+
+class EasyOcrDigitRecognitionEngine(DigitRecognitionEngine, BaseService):
+    def __init__(
+        self, reader: "easyocr.Reader", config: DigitRecognitionSettings
+    ) -> None:
+        self.reader = reader
+        self.config = config
+        super().__init__()
+
+    def recognize_batch_with_confidence(
+        self, images: list[np.ndarray]
+    ) -> list[tuple[int | None, float]]:
+        if len(images) == 0:
+            return []
+        if self.config.easyocr_skip_detection:
+            return self._recognize_without_detection(images)
+        return self._detect_and_recognize(images)
+
+    def _recognize_without_detection(
+        self, images: list[np.ndarray]
+    ) -> list[tuple[int | None, float]]:
+        """Run only the recognizer, once for the whole batch.
+
+        Each keypad button holds one centered digit, so the CRAFT text detector,
+        most of easyocr's CPU cost, is skipped: the images are laid side by side
+        and every image is handed to the recognizer as one region of its own.
+        """
+        logger = self.logger.getChild(self._recognize_without_detection.__name__)
+
+        logger.debug("recognizing a batch of %d images", len(images))
+        height = max(image.shape[0] for image in images)
+        x_offsets: list[int] = []
+        regions: list[list[int]] = []
+        width = 0
+        for image in images:
+            x_offsets.append(width)
+            regions.append([width, width + image.shape[1], 0, image.shape[0]])
+            width += image.shape[1]
+
+        # padded with white, only the regions are read
+        strip = np.full((height, width), 255, dtype=np.uint8)
+        for x_offset, image in zip(x_offsets, images):
+            strip[: image.shape[0], x_offset : x_offset + image.shape[1]] = image
+
+        recognized = self.reader.recognize(
+            strip,
+            horizontal_list=regions,
+            free_list=[],
+            batch_size=len(images),
+            detail=1,
+            allowlist=_ALLOWLIST,
+        )
+
+        # results are matched to images by the left edge of their region
+        index_by_x_offset = {
+            x_offset: index for index, x_offset in enumerate(x_offsets)
+        }
+        results: list[tuple[int | None, float]] = [(None, 0.0)] * len(images)
+        recognized_indices: set[int] = set()
+        for box, text, confidence in recognized:
+            index = index_by_x_offset.get(int(box[0][0]))
+            if index is None:
+                logger.warning(f"ignoring a result outside of every image: {box}")
+                continue
+            logger.debug("image %d: text=%r, confidence=%.3f", index, text, confidence)
+            results[index] = self._get_digit_from_text(text, float(confidence))
+            recognized_indices.add(index)
+
+        unrecognized_indices = sorted(set(range(len(images))) - recognized_indices)
+        if len(unrecognized_indices) > 0:
+            logger.warning(f"no result for images {unrecognized_indices}")
+        return results
+
+    def _detect_and_recognize(
+        self, images: list[np.ndarray]
+    ) -> list[tuple[int | None, float]]:
+        logger = self.logger.getChild(self._detect_and_recognize.__name__)
+
+        logger.debug(f"running OCR on a batch of {len(images)} images")
+        n_width, n_height = self._get_batch_image_size(images)
+        # grayscale arrays are used as is, easyocr would otherwise decode PNG
+        # bytes again and convert them to grayscale itself
+        candidates_per_image = self.reader.readtext_batched(
+            images,
+            n_width=n_width,
+            n_height=n_height,
+            batch_size=len(images),
+            detail=1,
+            allowlist=_ALLOWLIST,
+            text_threshold=self.config.text_threshold,
+            low_text=self.config.low_text,
+        )
+
+        results: list[tuple[int | None, float]] = []
+        for candidates in candidates_per_image:
+            logger.debug(f"candidates {candidates}")
+            results.append(self._get_digit_from_candidates(candidates))
+        return results
+
+    def _get_digit_from_candidates(self, candidates: list) -> tuple[int | None, float]:
+        if len(candidates) == 0:
+            return None, 0.0
+
+        first_candidate = candidates[0]
+        if type(first_candidate) is tuple or type(first_candidate) is list:
+            _, text, confidence = first_candidate
+        else:
+            error_message = f"Unexpected type: {type(first_candidate)}"
+            raise ValueError(error_message)
+
+        return self._get_digit_from_text(text, float(confidence))
+
+    def _get_digit_from_text(
+        self, text: str, confidence: float
+    ) -> tuple[int | None, float]:
+        # a single button holds a single digit, anything else is a misread
+        if len(text) != 1 or text not in _ALLOWLIST:
+            return None, 0.0
+        return int(text), confidence
+
+    def _get_batch_image_size(
+        self, images: list[np.ndarray]
+    ) -> tuple[int | None, int | None]:
+        """easyocr can only batch images of the same size, return the size every
+        image should be resized to, or (None, None) if they already match."""
+        sizes = {(image.shape[1], image.shape[0]) for image in images}
+        if len(sizes) == 1:
+            return None, None
+        return max(width for width, _ in sizes), max(height for _, height in sizes)
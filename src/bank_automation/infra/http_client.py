@@ -0,0 +1,59 @@
+from typing import Any
+
+import httpx
+
+from bank_automation.errors.http_errors import HttpUnauthorizedError
+from bank_automation.services.base_service import BaseService
+from bank_automation.settings import HttpClientSettings
+
+
+class HttpClient(BaseService):
+    """Pooled asynchronous HTTP client, authenticated with the cookies of a
+    browser session.
+
+    Connections are kept alive between requests, so polling the same API does
+    not pay for a new TLS handshake every time.
+    """
+
+    def __init__(self, config: HttpClientSettings) -> None:
+        super().__init__()
+        self.config = config
+        self._client = httpx.AsyncClient(
+            headers={"Accept": "application/json"},
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+            ),
+            timeout=config.timeout_in_seconds,
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def set_cookies(self, cookies: list[dict[str, Any]]) -> None:
+        """Replace the client's cookies with cookies as returned by
+        `BrowserService.get_all_cookies`."""
+        self._client.cookies.clear()
+        for cookie in cookies:
+            self._client.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+            )
+
+    async def get_json(self, url: str) -> Any:
+        """
+        Raises:
+            HttpUnauthorizedError: the session is not, or no longer, authenticated
+            httpx.HTTPStatusError: any other error status
+        """
+        logger = self.logger.getChild(self.get_json.__name__)
+
+        response = await self._client.get(url)
+        logger.debug(f"GET {url}: HTTP {response.status_code}")
+        # expired sessions are redirected to the login page
+        if response.status_code in (401, 403) or response.is_redirect:
+            raise HttpUnauthorizedError(url, response.status_code)
+        response.raise_for_status()
+        return response.json()
@@ -0,0 +1,34 @@
+import numpy as np
+
+_MIN_CONTRAST = 32
+
+
+def binarize(image: np.ndarray) -> np.ndarray:
+    """Threshold the grayscale image halfway between its darkest and lightest
+    pixels, into black ink on a white background.
+
+    Anti-aliased or low contrast glyphs are sharpened, blank images are
+    returned as is.
+    """
+    low, high = int(image.min()), int(image.max())
+    if high - low < _MIN_CONTRAST:
+        return image
+
+    ink = image < (low + high) / 2
+    if ink.mean() > 0.5:
+        # light digit on a dark background
+        ink = ~ink
+    return np.where(ink, 0, 255).astype(np.uint8)
+
+
+def pad_and_upscale(image: np.ndarray, margin: int = 4, factor: int = 2) -> np.ndarray:
+    """Pad the grayscale image with its background color, then upscale it with
+    nearest neighbour sampling.
+
+    Glyphs touching the image borders or only a few pixels high are read more
+    reliably by OCR engines trained on text lines.
+    """
+    border = np.concatenate([image[0], image[-1], image[:, 0], image[:, -1]])
+    background = int(np.median(border))
+    padded = np.pad(image, margin, mode="constant", constant_values=background)
+    return padded.repeat(factor, axis=0).repeat(factor, axis=1)
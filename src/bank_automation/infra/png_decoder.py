@@ -0,0 +1,166 @@
+import struct
+import zlib
+
+import numpy as np
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# PNG color type -> number of channels, for 8-bit images
+_CHANNEL_COUNTS = {0: 1, 2: 3, 4: 2, 6: 4}
+
+_FILTER_NONE = 0
+_FILTER_SUB = 1
+_FILTER_UP = 2
+_FILTER_AVERAGE = 3
+_FILTER_PAETH = 4
+
+
+class UnsupportedPngError(ValueError):
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"Unsupported PNG image: {reason}")
+
+
+def decode_png_to_grayscale(png_bytes: bytes | memoryview) -> np.ndarray:
+    """Decode a non-interlaced 8-bit PNG image into a 2D uint8 grayscale array.
+
+    Transparent pixels are composited over a white background. Chunks are read
+    through a memoryview and inflated straight into a buffer of the final size,
+    so that the only copies are the inflated scanlines and the output array.
+
+    Raises:
+        UnsupportedPngError: the image is not a PNG, is interlaced or does not
+            use 8-bit channels
+    """
+    view = memoryview(png_bytes)
+    if view[: len(PNG_SIGNATURE)] != PNG_SIGNATURE:
+        raise UnsupportedPngError("missing PNG signature")
+
+    header: tuple[int, ...] | None = None
+    idat_chunks: list[memoryview] = []
+    offset = len(PNG_SIGNATURE)
+    while offset + 8 <= len(view):
+        (length,) = struct.unpack_from(">I", view, offset)
+        chunk_type = view[offset + 4 : offset + 8]
+        data = view[offset + 8 : offset + 8 + length]
+        offset += 12 + length
+
+        if chunk_type == b"IHDR":
+            header = struct.unpack(">IIBBBBB", data)
+        elif chunk_type == b"IDAT":
+            idat_chunks.append(data)
+        elif chunk_type == b"IEND":
+            break
+
+    if header is None:
+        raise UnsupportedPngError("missing IHDR chunk")
+    width, height, bit_depth, color_type, _, _, interlace_method = header
+    if bit_depth != 8 or color_type not in _CHANNEL_COUNTS:
+        raise UnsupportedPngError(f"bit depth {bit_depth}, color type {color_type}")
+    if interlace_method != 0:
+        raise UnsupportedPngError("interlaced image")
+
+    channel_count = _CHANNEL_COUNTS[color_type]
+    stride = width * channel_count
+    raw_size = height * (stride + 1)
+    raw = np.frombuffer(_inflate(idat_chunks, raw_size), dtype=np.uint8)
+    raw = raw[:raw_size].reshape(height, stride + 1)
+
+    pixels = _unfilter(raw[:, 1:], raw[:, 0], channel_count)
+    pixels = pixels.reshape(height, width, channel_count)
+    if channel_count == 1:
+        # already grayscale, no need for a floating point round-trip
+        return pixels[:, :, 0]
+
+    # the float temporaries are updated in place, the image is the only input
+    # that is ever copied
+    if channel_count >= 3:
+        grayscale = pixels[:, :, :3] @ np.array([0.299, 0.587, 0.114], np.float32)
+    else:
+        grayscale = pixels[:, :, 0].astype(np.float32)
+    if channel_count in (2, 4):
+        alpha = pixels[:, :, -1].astype(np.float32)
+        alpha /= 255
+        # composite over white: 255 + (gray - 255) * alpha
+        grayscale -= 255
+        grayscale *= alpha
+        grayscale += 255
+
+    np.rint(grayscale, out=grayscale)
+    np.clip(grayscale, 0, 255, out=grayscale)
+    return grayscale.astype(np.uint8)
+
+
+def _inflate(chunks: list[memoryview], size: int) -> bytes:
+    """Inflate the concatenated chunks. The usual single chunk is inflated into
+    an output buffer allocated once, at the expected size."""
+    if len(chunks) == 1:
+        return zlib.decompress(chunks[0], bufsize=max(size, 1))
+
+    decompressor = zlib.decompressobj()
+    parts = [decompressor.decompress(chunk) for chunk in chunks]
+    parts.append(decompressor.flush())
+    return b"".join(parts)
+
+
+def _unfilter(
+    filtered: np.ndarray, filter_types: np.ndarray, bytes_per_pixel: int
+) -> np.ndarray:
+    height, stride = filtered.shape
+    rows = np.zeros((height, stride), dtype=np.uint8)
+    previous_row = np.zeros(stride, dtype=np.uint8)
+
+    for y in range(height):
+        filter_type = filter_types[y]
+        row = filtered[y]
+        if filter_type == _FILTER_NONE:
+            rows[y] = row
+        elif filter_type == _FILTER_SUB:
+            rows[y] = _unfilter_sub(row, bytes_per_pixel)
+        elif filter_type == _FILTER_UP:
+            rows[y] = row + previous_row
+        elif filter_type in (_FILTER_AVERAGE, _FILTER_PAETH):
+            rows[y] = _unfilter_sequential(
+                row, previous_row, filter_type, bytes_per_pixel
+            )
+        else:
+            raise UnsupportedPngError(f"filter type {filter_type}")
+        previous_row = rows[y]
+
+    return rows
+
+
+def _unfilter_sub(row: np.ndarray, bytes_per_pixel: int) -> np.ndarray:
+    # each byte adds the reconstructed byte of the previous pixel: a running sum
+    # per channel, modulo 256
+    channels = row.reshape(-1, bytes_per_pixel).astype(np.uint32)
+    return (np.cumsum(channels, axis=0) % 256).astype(np.uint8).reshape(-1)
+
+
+def _unfilter_sequential(
+    row: np.ndarray,
+    previous_row: np.ndarray,
+    filter_type: int,
+    bytes_per_pixel: int,
+) -> np.ndarray:
+    output = [0] * len(row)
+    for x, value in enumerate(row.tolist()):
+        left = output[x - bytes_per_pixel] if x >= bytes_per_pixel else 0
+        up = int(previous_row[x])
+        if filter_type == _FILTER_AVERAGE:
+            predictor = (left + up) // 2
+        else:
+            up_left = (
+                int(previous_row[x - bytes_per_pixel]) if x >= bytes_per_pixel else 0
+            )
+            estimate = left + up - up_left
+            distance_left = abs(estimate - left)
+            distance_up = abs(estimate - up)
+            distance_up_left = abs(estimate - up_left)
+            if distance_left <= distance_up and distance_left <= distance_up_left:
+                predictor = left
+            elif distance_up <= distance_up_left:
+                predictor = up
+            else:
+                predictor = up_left
+        output[x] = (value + predictor) % 256
+    return np.array(output, dtype=np.uint8)
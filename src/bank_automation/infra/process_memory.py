@@ -0,0 +1,50 @@
+import os
+
+
+def get_process_tree_rss_bytes(pid: int | None = None) -> int | None:
+    """Return the resident memory of the process and of all its descendants, such
+    as the browsers started by WebDriver.
+
+    Returns:
+        the memory in bytes, or None where /proc is not available
+    """
+    if pid is None:
+        pid = os.getpid()
+    if not os.path.isdir(f"/proc/{pid}"):
+        return None
+
+    total_rss_bytes = 0
+    pending_pids = [pid]
+    while len(pending_pids) > 0:
+        current_pid = pending_pids.pop()
+        rss_bytes = _get_rss_bytes(current_pid)
+        if rss_bytes is None:
+            # the process exited meanwhile
+            continue
+        total_rss_bytes += rss_bytes
+        pending_pids.extend(_get_child_pids(current_pid))
+    return total_rss_bytes
+
+
+def _get_rss_bytes(pid: int) -> int | None:
+    try:
+        with open(f"/proc/{pid}/statm") as file:
+            resident_pages = int(file.read().split()[1])
+    except (FileNotFoundError, ProcessLookupError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _get_child_pids(pid: int) -> list[int]:
+    child_pids: list[int] = []
+    try:
+        thread_ids = os.listdir(f"/proc/{pid}/task")
+    except FileNotFoundError:
+        return child_pids
+    for thread_id in thread_ids:
+        try:
+            with open(f"/proc/{pid}/task/{thread_id}/children") as file:
+                child_pids.extend(int(child_pid) for child_pid in file.read().split())
+        except FileNotFoundError:
+            continue
+    return child_pids
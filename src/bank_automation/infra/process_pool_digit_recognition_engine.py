@@ -0,0 +1,218 @@
+import asyncio
+import concurrent.futures
+import dataclasses
+import functools
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+from typing import Callable
+
+import numpy as np
+
+from bank_automation.infra.digit_recognition_engine import DigitRecognitionEngine
+from bank_automation.services.base_service import BaseService
+from bank_automation.settings import DigitRecognitionSettings
+
+# engine of the current worker process, created once by `_initialize_worker`
+_worker_engine: DigitRecognitionEngine | None = None
+
+_STOP = object()
+
+
+def create_easyocr_engine(config: DigitRecognitionSettings) -> DigitRecognitionEngine:
+    """Load the easyocr models, in a worker process."""
+    import easyocr
+
+    from bank_automation.infra.easyocr_digit_recognition_engine import (
+        EasyOcrDigitRecognitionEngine,
+    )
+
+    return EasyOcrDigitRecognitionEngine(easyocr.Reader(config.languages), config)
+
+
+def _initialize_worker(
+    engine_factory: Callable[[], DigitRecognitionEngine], torch_thread_count: int
+) -> None:
+    global _worker_engine
+
+    # read by torch's thread pools when it is first imported
+    for variable_name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable_name] = str(torch_thread_count)
+    _worker_engine = engine_factory()
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(torch_thread_count)
+
+
+def _recognize_in_worker(
+    images: list[np.ndarray],
+) -> list[tuple[int | None, float]]:
+    assert _worker_engine is not None
+    return _worker_engine.recognize_batch_with_confidence(images)
+
+
+def _warm_up_in_worker() -> None:
+    assert _worker_engine is not None
+    _worker_engine.warm_up()
+
+
+@dataclasses.dataclass
+class _Request:
+    images: list[np.ndarray]
+    future: concurrent.futures.Future
+
+
+class ProcessPoolDigitRecognitionEngine(DigitRecognitionEngine, BaseService):
+    """Run an engine in a pool of worker processes, each creating it once.
+
+    Requests are queued. Whenever a worker is idle, every queued request is
+    merged into a single batch of up to `easyocr_max_batch_size` images, so
+    that concurrent logins share the workers' models and cores instead of
+    loading their own or contending on one interpreter.
+    """
+
+    def __init__(
+        self,
+        engine_factory: Callable[[], DigitRecognitionEngine],
+        config: DigitRecognitionSettings,
+    ) -> None:
+        super().__init__()
+        self.config = config
+
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=config.easyocr_worker_count,
+            # forking a process which already runs threads is unsafe
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_worker,
+            initargs=(engine_factory, config.easyocr_torch_threads_per_worker),
+        )
+        self.batch_count = 0
+        self._is_closed = False
+        self._requests: queue.SimpleQueue = queue.SimpleQueue()
+        self._idle_workers = threading.Semaphore(config.easyocr_worker_count)
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, name=f"{self.__class__.__name__}", daemon=True
+        )
+        self._dispatcher.start()
+
+    def submit(self, images: list[np.ndarray]) -> concurrent.futures.Future:
+        """Queue the images for recognition.
+
+        Returns:
+            a future of the recognized digits and their confidence, as returned
+            by `recognize_batch_with_confidence`
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        if self._is_closed:
+            future.set_exception(RuntimeError("engine is closed"))
+        elif len(images) == 0:
+            future.set_result([])
+        else:
+            self._requests.put(_Request(images, future))
+        return future
+
+    async def score_batch_async(self, images: list[np.ndarray]) -> np.ndarray:
+        """Score the images without holding a thread while they are queued and
+        recognized."""
+        return self._to_scores(await asyncio.wrap_future(self.submit(images)))
+
+    def recognize_batch_with_confidence(
+        self, images: list[np.ndarray]
+    ) -> list[tuple[int | None, float]]:
+        return self.submit(images).result()
+
+    def warm_up(self) -> None:
+        """Start every worker, each loading the models and running a first
+        inference."""
+        # submitted directly, the dispatcher would merge them into one batch
+        futures = [
+            self._executor.submit(_warm_up_in_worker)
+            for _ in range(self.config.easyocr_worker_count)
+        ]
+        for future in futures:
+            future.result()
+
+    def close(self) -> None:
+        """Fail the queued requests and stop the workers."""
+        if self._is_closed:
+            return
+        self._is_closed = True
+        self._requests.put(_STOP)
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _dispatch(self) -> None:
+        next_request = None
+        while True:
+            request = next_request if next_request is not None else self._requests.get()
+            next_request = None
+            if request is _STOP:
+                self._fail_queued_requests()
+                return
+
+            # requests keep queuing up while every worker is busy
+            self._idle_workers.acquire()
+            batch = [request]
+            image_count = len(request.images)
+            while image_count < self.config.easyocr_max_batch_size:
+                try:
+                    queued_request = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if (
+                    queued_request is _STOP
+                    or image_count + len(queued_request.images)
+                    > self.config.easyocr_max_batch_size
+                ):
+                    next_request = queued_request
+                    break
+                batch.append(queued_request)
+                image_count += len(queued_request.images)
+
+            self._submit_batch(batch)
+
+    def _submit_batch(self, batch: list[_Request]) -> None:
+        self.logger.getChild(self._submit_batch.__name__).debug(
+            "submitting %d requests as one batch", len(batch)
+        )
+        images = [image for request in batch for image in request.images]
+        self.batch_count += 1
+        try:
+            future = self._executor.submit(_recognize_in_worker, images)
+        except RuntimeError as e:
+            # the pool is broken or shut down
+            self._idle_workers.release()
+            for request in batch:
+                request.future.set_exception(e)
+            return
+        future.add_done_callback(functools.partial(self._on_batch_done, batch))
+
+    def _on_batch_done(
+        self, batch: list[_Request], future: concurrent.futures.Future
+    ) -> None:
+        self._idle_workers.release()
+
+        exception = future.exception() if not future.cancelled() else None
+        if future.cancelled() or exception is not None:
+            for request in batch:
+                request.future.set_exception(
+                    exception or concurrent.futures.CancelledError()
+                )
+            return
+
+        results = future.result()
+        offset = 0
+        for request in batch:
+            request.future.set_result(results[offset : offset + len(request.images)])
+            offset += len(request.images)
+
+    def _fail_queued_requests(self) -> None:
+        while True:
+            try:
+                request = self._requests.get_nowait()
+            except queue.Empty:
+                return
+            if request is not _STOP:
+                request.future.set_exception(RuntimeError("engine is closed"))
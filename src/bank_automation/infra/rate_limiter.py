@@ -0,0 +1,28 @@
+import asyncio
+
+from bank_automation.services.base_service import BaseService
+
+
+class RateLimiter(BaseService):
+    """Space out acquisitions so that at most `rate_per_minute` happen per minute."""
+
+    def __init__(self, rate_per_minute: float) -> None:
+        super().__init__()
+        assert rate_per_minute > 0
+        self.interval_in_seconds = 60.0 / rate_per_minute
+        self._next_acquisition_time: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        logger = self.logger.getChild(self.acquire.__name__)
+
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            if self._next_acquisition_time is not None:
+                delay = self._next_acquisition_time - now
+                if delay > 0:
+                    logger.debug(f"rate limited, waiting {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    now = loop.time()
+            self._next_acquisition_time = now + self.interval_in_seconds
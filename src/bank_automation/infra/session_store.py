@@ -0,0 +1,100 @@
+import dataclasses
+import hashlib
+import json
+import os
+import time
+from typing import Any
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from bank_automation.services.base_service import BaseService
+from bank_automation.settings import SessionStoreSettings
+
+
+@dataclasses.dataclass
+class BrowserSession:
+    url: str
+    cookies: list[dict[str, Any]]
+    local_storage: dict[str, str]
+    saved_at: float = dataclasses.field(default_factory=time.time)
+
+
+class EncryptedSessionStore(BaseService):
+    """Persist authenticated browser sessions, one encrypted file per profile.
+
+    Sessions are encrypted with Fernet. If no key is configured, one is generated
+    once and kept in the store directory, readable by the current user only.
+    """
+
+    KEY_FILE_NAME = ".key"
+
+    def __init__(self, config: SessionStoreSettings) -> None:
+        super().__init__()
+        self.config = config
+
+        os.makedirs(config.directory, mode=0o700, exist_ok=True)
+        self._fernet = Fernet(self._get_or_create_key())
+
+    def load(self, profile_name: str) -> BrowserSession | None:
+        """Return the saved session of the profile, or None if there is none, it
+        expired or it could not be decrypted."""
+        logger = self.logger.getChild(self.load.__name__)
+
+        path = self._get_path(profile_name)
+        try:
+            with open(path, "rb") as file:
+                token = file.read()
+        except FileNotFoundError:
+            return None
+
+        try:
+            content = self._fernet.decrypt(
+                token, ttl=max(int(self.config.max_age_in_seconds), 1)
+            )
+        except InvalidToken:
+            logger.info(f"discarding expired or unreadable session: {profile_name}")
+            self.delete(profile_name)
+            return None
+
+        return BrowserSession(**json.loads(content))
+
+    def save(self, profile_name: str, session: BrowserSession) -> None:
+        path = self._get_path(profile_name)
+        token = self._fernet.encrypt(json.dumps(dataclasses.asdict(session)).encode())
+        self._write_private_file(path, token)
+
+    def delete(self, profile_name: str) -> None:
+        try:
+            os.remove(self._get_path(profile_name))
+        except FileNotFoundError:
+            pass
+
+    def _get_path(self, profile_name: str) -> str:
+        # profile names are user input, do not use them as file names
+        file_name = hashlib.sha256(profile_name.encode()).hexdigest()
+        return os.path.join(self.config.directory, file_name)
+
+    def _get_or_create_key(self) -> bytes:
+        if self.config.encryption_key is not None:
+            return self.config.encryption_key.encode()
+
+        path = os.path.join(self.config.directory, self.KEY_FILE_NAME)
+        try:
+            with open(path, "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            pass
+
+        self.logger.info(f"generating session encryption key: {path}")
+        key = Fernet.generate_key()
+        self._write_private_file(path, key)
+        return key
+
+    def _write_private_file(self, path: str, content: bytes) -> None:
+        temporary_path = f"{path}.tmp"
+        file_descriptor = os.open(
+            temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+        )
+        with os.fdopen(file_descriptor, "wb") as file:
+            file.write(content)
+        os.replace(temporary_path, path)
@@ -0,0 +1,226 @@
+import asyncio
+import os
+import re
+from typing import Callable
+
+import numpy as np
+
+from bank_automation.infra.digit_recognition_engine import (
+    DIGIT_COUNT,
+    DigitRecognitionEngine,
+)
+from bank_automation.infra.png_decoder import decode_png_to_grayscale
+from bank_automation.services.base_service import BaseService
+from bank_automation.settings import DigitRecognitionSettings
+
+DEFAULT_TEMPLATE_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "resources", "digit_templates"
+)
+
+# reference glyph files are named digit_<label>.png or digit_<label>_<anything>.png
+_TEMPLATE_FILE_NAME_PATTERN = re.compile(r"^digit_(\d)(_.*)?\.png$")
+
+_GLYPH_SIZE = 16
+_SUPERSAMPLING = 4
+_MIN_CONTRAST = 32
+
+
+class TemplateMatchingDigitRecognitionEngine(DigitRecognitionEngine, BaseService):
+    """Recognize digits by comparing binarized glyphs against reference glyphs.
+
+    Each image is decoded to grayscale, binarized, cropped to its ink bounding
+    box and resampled to a fixed-size glyph, which is then correlated against
+    every reference glyph. Matches scoring below the configured minimum
+    confidence are handed over to the fallback engine, if any.
+    """
+
+    def __init__(
+        self,
+        config: DigitRecognitionSettings,
+        fallback_engine_provider: Callable[[], DigitRecognitionEngine] | None = None,
+    ) -> None:
+        super().__init__()
+        self.config = config
+        self.fallback_engine_provider = fallback_engine_provider
+
+        template_directory = config.template_directory or DEFAULT_TEMPLATE_DIRECTORY
+        self._template_labels, self._templates = self._load_templates(
+            template_directory
+        )
+
+    def recognize_batch_with_confidence(
+        self, images: list[np.ndarray]
+    ) -> list[tuple[int | None, float]]:
+        logger = self.logger.getChild(self.recognize_batch_with_confidence.__name__)
+
+        results: list[tuple[int | None, float]] = []
+        low_confidence_indices: list[int] = []
+        for index, image in enumerate(images):
+            digit, confidence = self.match(image)
+            logger.debug(f"image {index}: digit={digit}, confidence={confidence:.3f}")
+            if confidence < self.config.template_min_confidence:
+                low_confidence_indices.append(index)
+            results.append((digit, confidence))
+
+        if (
+            len(low_confidence_indices) > 0
+            and self.fallback_engine_provider is not None
+            and self.config.template_fallback_to_easyocr
+        ):
+            logger.info(
+                f"falling back for {len(low_confidence_indices)} low confidence images"
+            )
+            fallback_results = (
+                self.fallback_engine_provider().recognize_batch_with_confidence(
+                    [images[index] for index in low_confidence_indices]
+                )
+            )
+            for index, result in zip(low_confidence_indices, fallback_results):
+                results[index] = result
+
+        return results
+
+    def score_batch(self, images: list[np.ndarray]) -> np.ndarray:
+        """Score each digit by the correlation of its best matching reference
+        glyph, negative correlations scoring 0, so that scores are in [0, 1] as
+        those of the other engines.
+
+        Images whose best match is below the minimum confidence are scored by
+        the fallback engine instead, if any.
+        """
+        scores = self._match_batch(images)
+        fallback_indices = self._get_fallback_indices(scores)
+        if len(fallback_indices) > 0:
+            assert self.fallback_engine_provider is not None
+            scores[fallback_indices] = self.fallback_engine_provider().score_batch(
+                [images[index] for index in fallback_indices]
+            )
+        return scores
+
+    async def score_batch_async(self, images: list[np.ndarray]) -> np.ndarray:
+        """Score the images as `score_batch`, awaiting the fallback engine's own
+        `score_batch_async`."""
+        scores = await asyncio.to_thread(self._match_batch, images)
+        fallback_indices = self._get_fallback_indices(scores)
+        if len(fallback_indices) > 0:
+            assert self.fallback_engine_provider is not None
+            # the first call may load the fallback's models
+            fallback_engine = await asyncio.to_thread(self.fallback_engine_provider)
+            scores[fallback_indices] = await fallback_engine.score_batch_async(
+                [images[index] for index in fallback_indices]
+            )
+        return scores
+
+    def warm_up(self) -> None:
+        # the reference glyphs are already loaded, only the fallback loads
+        # models, which it otherwise only does once a match is not confident
+        if (
+            self.fallback_engine_provider is not None
+            and self.config.template_fallback_to_easyocr
+            and self.config.warm_up_template_fallback
+        ):
+            self.fallback_engine_provider().warm_up()
+
+    def match(self, image: np.ndarray) -> tuple[int | None, float]:
+        """Return the best matching digit of the grayscale image and its
+        correlation score, in [-1, 1]."""
+        glyph = self._get_glyph(image)
+        if glyph is None:
+            return None, 0.0
+
+        scores = self._templates @ glyph
+        best_index = int(np.argmax(scores))
+        return self._template_labels[best_index], float(scores[best_index])
+
+    def _match_batch(self, images: list[np.ndarray]) -> np.ndarray:
+        scores = np.zeros((len(images), DIGIT_COUNT), dtype=np.float32)
+        for index, image in enumerate(images):
+            glyph = self._get_glyph(image)
+            if glyph is None:
+                continue
+            # several reference glyphs may share a label, the best one counts
+            np.maximum.at(scores[index], self._template_labels, self._templates @ glyph)
+        # rounding may take an exact match slightly above 1
+        return np.minimum(scores, 1.0, out=scores)
+
+    def _get_fallback_indices(self, scores: np.ndarray) -> list[int]:
+        """Return the indices of the images to score with the fallback engine,
+        none if there is no fallback."""
+        if (
+            self.fallback_engine_provider is None
+            or not self.config.template_fallback_to_easyocr
+        ):
+            return []
+        low_confidence_indices = [
+            index
+            for index in range(len(scores))
+            if scores[index].max() < self.config.template_min_confidence
+        ]
+        if len(low_confidence_indices) > 0:
+            self.logger.getChild(self._get_fallback_indices.__name__).info(
+                f"falling back for {len(low_confidence_indices)} low confidence images"
+            )
+        return low_confidence_indices
+
+    def _load_templates(self, directory: str) -> tuple[list[int], np.ndarray]:
+        logger = self.logger.getChild(self._load_templates.__name__)
+
+        labels: list[int] = []
+        glyphs: list[np.ndarray] = []
+        for file_name in sorted(os.listdir(directory)):
+            matched = _TEMPLATE_FILE_NAME_PATTERN.match(file_name)
+            if not matched:
+                continue
+            with open(os.path.join(directory, file_name), "rb") as file:
+                glyph = self._get_glyph(decode_png_to_grayscale(file.read()))
+            if glyph is None:
+                raise ValueError(f"blank reference glyph: {file_name}")
+            labels.append(int(matched.group(1)))
+            glyphs.append(glyph)
+
+        missing_labels = set(range(10)) - set(labels)
+        if len(missing_labels) > 0:
+            raise ValueError(
+                f"missing reference glyphs in {directory}: {sorted(missing_labels)}"
+            )
+        logger.debug(f"loaded {len(glyphs)} reference glyphs from {directory}")
+
+        return labels, np.stack(glyphs)
+
+    def _get_glyph(self, grayscale: np.ndarray) -> np.ndarray | None:
+        """Return the zero-mean, unit-norm feature vector of the image's glyph, or
+        None if the image is blank."""
+        low, high = int(grayscale.min()), int(grayscale.max())
+        if high - low < _MIN_CONTRAST:
+            return None
+
+        ink = grayscale < (low + high) / 2
+        if ink.mean() > 0.5:
+            # light digit on a dark background
+            ink = ~ink
+
+        rows = np.flatnonzero(ink.any(axis=1))
+        columns = np.flatnonzero(ink.any(axis=0))
+        ink = ink[rows[0] : rows[-1] + 1, columns[0] : columns[-1] + 1]
+
+        # pad to a square so that narrow digits keep their aspect ratio
+        height, width = ink.shape
+        side = max(height, width)
+        square = np.zeros((side, side), dtype=np.float32)
+        top, left = (side - height) // 2, (side - width) // 2
+        square[top : top + height, left : left + width] = ink
+
+        sample_count = _GLYPH_SIZE * _SUPERSAMPLING
+        indices = ((np.arange(sample_count) + 0.5) * side / sample_count).astype(int)
+        glyph = (
+            square[np.ix_(indices, indices)]
+            .reshape(_GLYPH_SIZE, _SUPERSAMPLING, _GLYPH_SIZE, _SUPERSAMPLING)
+            .mean(axis=(1, 3))
+            .reshape(-1)
+        )
+
+        glyph -= glyph.mean()
+        norm = np.linalg.norm(glyph)
+        if norm == 0:
+            return None
+        return glyph / norm
@@ -0,0 +1,305 @@
+import abc
+import bisect
+import collections
+import contextlib
+import contextvars
+import dataclasses
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Any, Iterator
+
+from bank_automation.services.base_service import BaseService
+
+SPAN_DURATION_METRIC = "bank_automation_span_duration_seconds"
+
+DEFAULT_HISTOGRAM_BUCKETS = (
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+def _to_labels(labels: dict[str, str] | None) -> _Labels:
+    return tuple(sorted((labels or {}).items()))
+
+
+@dataclasses.dataclass(frozen=True)
+class Span:
+    name: str
+    span_id: int
+    parent_id: int | None
+    # id of the outermost span, e.g. one balance fetch
+    root_id: int
+    start_time: float
+    duration_in_seconds: float
+    attributes: dict[str, Any]
+
+
+@dataclasses.dataclass
+class Histogram:
+    buckets: tuple[float, ...]
+    # cumulative counts are computed on export, these are per bucket
+    bucket_counts: list[int]
+    sum: float = 0.0
+    count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """In-process counters and histograms, labelled, dumped in the Prometheus
+    text exposition format."""
+
+    def __init__(
+        self, histogram_buckets: tuple[float, ...] = DEFAULT_HISTOGRAM_BUCKETS
+    ) -> None:
+        self.histogram_buckets = tuple(sorted(histogram_buckets))
+        self._counters: dict[str, dict[_Labels, float]] = collections.defaultdict(dict)
+        self._histograms: dict[str, dict[_Labels, Histogram]] = collections.defaultdict(
+            dict
+        )
+        self._lock = threading.Lock()
+
+    def increment(
+        self, name: str, labels: dict[str, str] | None = None, amount: float = 1.0
+    ) -> None:
+        key = _to_labels(labels)
+        with self._lock:
+            counter = self._counters[name]
+            counter[key] = counter.get(key, 0.0) + amount
+
+    def observe(
+        self, name: str, value: float, labels: dict[str, str] | None = None
+    ) -> None:
+        key = _to_labels(labels)
+        with self._lock:
+            histogram = self._histograms[name].get(key)
+            if histogram is None:
+                histogram = self._histograms[name][key] = Histogram(
+                    buckets=self.histogram_buckets,
+                    bucket_counts=[0] * (len(self.histogram_buckets) + 1),
+                )
+            histogram.observe(value)
+
+    def get_counter_value(
+        self, name: str, labels: dict[str, str] | None = None
+    ) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_to_labels(labels), 0.0)
+
+    def get_histogram(
+        self, name: str, labels: dict[str, str] | None = None
+    ) -> Histogram | None:
+        with self._lock:
+            return self._histograms.get(name, {}).get(_to_labels(labels))
+
+    def to_prometheus_text(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name, counter in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(counter.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+            for name, histograms in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(histograms.items()):
+                    bounds = [f"{bound:g}" for bound in histogram.buckets] + ["+Inf"]
+                    for bound, cumulative_count in zip(
+                        bounds, itertools.accumulate(histogram.bucket_counts)
+                    ):
+                        bucket_labels = labels + (("le", bound),)
+                        lines.append(
+                            f"{name}_bucket{_format_labels(bucket_labels)}"
+                            f" {cumulative_count}"
+                        )
+                    lines.append(
+                        f"{name}_sum{_format_labels(labels)} {histogram.sum:g}"
+                    )
+                    lines.append(
+                        f"{name}_count{_format_labels(labels)} {histogram.count}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: _Labels) -> str:
+    if len(labels) == 0:
+        return ""
+    formatted = ",".join(
+        f'{name}="{_escape_label_value(value)}"' for name, value in labels
+    )
+    return f"{{{formatted}}}"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class SpanExporter(abc.ABC):
+    @abc.abstractmethod
+    def export(self, span: Span) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class MetricsSpanExporter(SpanExporter):
+    """Record span durations in the registry's histograms, by span name, and
+    dump the registry as Prometheus text on close."""
+
+    def __init__(
+        self, registry: MetricsRegistry, prometheus_path: str | None = None
+    ) -> None:
+        self.registry = registry
+        self.prometheus_path = prometheus_path
+
+    def export(self, span: Span) -> None:
+        self.registry.observe(
+            SPAN_DURATION_METRIC, span.duration_in_seconds, {"span": span.name}
+        )
+
+    def close(self) -> None:
+        if self.prometheus_path is None:
+            return
+        _write_text(self.prometheus_path, self.registry.to_prometheus_text())
+
+
+class JsonTraceSpanExporter(SpanExporter):
+    """Write the spans to a JSON trace file on close, in the Trace Event format
+    read by chrome://tracing and Perfetto, one track per outermost span.
+
+    Only the latest `max_span_count` spans are kept.
+    """
+
+    def __init__(self, path: str, max_span_count: int = 100_000) -> None:
+        self.path = path
+        self._spans: collections.deque[Span] = collections.deque(maxlen=max_span_count)
+
+    def export(self, span: Span) -> None:
+        self._spans.append(span)
+
+    def close(self) -> None:
+        pid = os.getpid()
+        trace_events = [
+            {
+                "name": span.name,
+                "ph": "X",
+                "ts": span.start_time * 1_000_000,
+                "dur": span.duration_in_seconds * 1_000_000,
+                "pid": pid,
+                "tid": span.root_id,
+                "args": {
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    **span.attributes,
+                },
+            }
+            for span in self._spans
+        ]
+        _write_text(
+            self.path,
+            json.dumps(
+                {"traceEvents": trace_events, "displayTimeUnit": "ms"}, default=str
+            ),
+        )
+
+
+def _write_text(path: str, text: str) -> None:
+    directory = os.path.dirname(path)
+    if directory != "":
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
+
+
+class Tracer(BaseService):
+    """Time nested phases as spans, handed to the exporters once they end, and
+    count events in the metrics registry.
+
+    The current span is tracked per asyncio task, so that concurrent fetches
+    each get their own tree of spans.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry | None = None,
+        exporters: list[SpanExporter] | None = None,
+    ) -> None:
+        super().__init__()
+        self.registry = registry if registry is not None else MetricsRegistry()
+        self.exporters = exporters if exporters is not None else []
+        self._span_ids = itertools.count(1)
+        # (span id, root span id) of the current span
+        self._current_span: contextvars.ContextVar[tuple[int, int] | None] = (
+            contextvars.ContextVar(f"current_span_{id(self)}", default=None)
+        )
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[dict[str, Any]]:
+        """Time the enclosed block as a span, child of the current span.
+
+        Yields:
+            the span's attributes, which the block may add to
+        """
+        span_id = next(self._span_ids)
+        parent = self._current_span.get()
+        parent_id, root_id = parent if parent is not None else (None, span_id)
+        token = self._current_span.set((span_id, root_id))
+
+        start_time = time.time()
+        start = time.perf_counter()
+        try:
+            yield attributes
+        except BaseException as e:
+            attributes["error"] = type(e).__name__
+            raise
+        finally:
+            duration_in_seconds = time.perf_counter() - start
+            self._current_span.reset(token)
+            self._export(
+                Span(
+                    name=name,
+                    span_id=span_id,
+                    parent_id=parent_id,
+                    root_id=root_id,
+                    start_time=start_time,
+                    duration_in_seconds=duration_in_seconds,
+                    attributes=attributes,
+                )
+            )
+
+    def increment(
+        self, name: str, labels: dict[str, str] | None = None, amount: float = 1.0
+    ) -> None:
+        self.registry.increment(name, labels, amount)
+
+    def close(self) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.close()
+            except OSError as e:
+                self.logger.getChild(self.close.__name__).error(
+                    f"could not close span exporter {exporter!r}: {e!r}"
+                )
+
+    def _export(self, span: Span) -> None:
+        for exporter in self.exporters:
+            exporter.export(span)
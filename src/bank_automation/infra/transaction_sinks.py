@@ -0,0 +1,114 @@
+import abc
+import csv
+import dataclasses
+import pathlib
+from typing import TYPE_CHECKING
+
+from bank_automation import Transaction
+
+if TYPE_CHECKING:
+    import pyarrow
+
+TRANSACTION_FIELDS = [field.name for field in dataclasses.fields(Transaction)]
+
+
+class TransactionSink(abc.ABC):
+    """Destination of an export, written one bounded batch at a time."""
+
+    @abc.abstractmethod
+    def write_batch(self, transactions: list[Transaction]) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "TransactionSink":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class CsvTransactionSink(TransactionSink):
+    """Append the transactions to a CSV file, after a header row, dates in ISO
+    format."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(TRANSACTION_FIELDS)
+
+    def write_batch(self, transactions: list[Transaction]) -> None:
+        self._writer.writerows(
+            (
+                transaction.account_id,
+                transaction.transaction_id,
+                transaction.date.isoformat(),
+                transaction.label,
+                transaction.amount,
+                transaction.currency,
+            )
+            for transaction in transactions
+        )
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetTransactionSink(TransactionSink):
+    """Write the transactions to a Parquet file, one row group per batch.
+
+    Requires pyarrow, from the `parquet` extra, which is only imported by this
+    sink.
+    """
+
+    def __init__(self, path: str) -> None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError(
+                "exporting to Parquet requires pyarrow, install the 'parquet'"
+                " extra: poetry install --extras parquet"
+            ) from e
+
+        self.path = path
+        self._schema = pyarrow.schema(
+            [
+                ("account_id", pyarrow.string()),
+                ("transaction_id", pyarrow.string()),
+                ("date", pyarrow.date32()),
+                ("label", pyarrow.string()),
+                ("amount", pyarrow.float64()),
+                ("currency", pyarrow.string()),
+            ]
+        )
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+
+    def write_batch(self, transactions: list[Transaction]) -> None:
+        if len(transactions) == 0:
+            return
+        self._writer.write_table(self._to_table(transactions))
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def _to_table(self, transactions: list[Transaction]) -> "pyarrow.Table":
+        import pyarrow
+
+        return pyarrow.Table.from_pydict(
+            {
+                name: [getattr(transaction, name) for transaction in transactions]
+                for name in TRANSACTION_FIELDS
+            },
+            schema=self._schema,
+        )
+
+
+def create_transaction_sink(path: str) -> TransactionSink:
+    """Create the sink matching the file extension: Parquet for .parquet files,
+    CSV otherwise."""
+    if pathlib.Path(path).suffix.lower() == ".parquet":
+        return ParquetTransactionSink(path)
+    return CsvTransactionSink(path)
@@ -0,0 +1,196 @@
+import asyncio
+import dataclasses
+import functools
+import time
+
+from bank_automation import AccountBalance, Currency
+from bank_automation.errors.banking_errors import ProfileNotFoundError
+from bank_automation.infra.balance_store import BalanceStore
+from bank_automation.services.banking_service import (
+    BankingService,
+    GetAccountBalanceResult,
+)
+from bank_automation.services.base_service import BaseService
+from bank_automation.settings import (
+    BalanceApiSettings,
+    CaisseDEpargneProfile,
+    CaisseDEpargneSettings,
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class CachedBalances:
+    profile_name: str
+    balances: GetAccountBalanceResult
+    fetched_at: float
+
+    def get_age_in_seconds(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class BalanceQueryService(BaseService):
+    """Answer balance queries from a per-profile cache, fetching each profile at
+    most once at a time.
+
+    Cached balances are fresh for `ttl_in_seconds`. Up to `stale_ttl_in_seconds`
+    they are still returned right away, while a background fetch refreshes
+    them. Concurrent queries missing the cache all wait for the same fetch.
+    """
+
+    def __init__(
+        self,
+        banking_service: BankingService,
+        caisse_d_epargne_config: CaisseDEpargneSettings,
+        config: BalanceApiSettings,
+        balance_store: BalanceStore | None = None,
+    ) -> None:
+        super().__init__()
+        self.banking_service = banking_service
+        self.caisse_d_epargne_config = caisse_d_epargne_config
+        self.config = config
+        self.balance_store = balance_store
+        self._cache: dict[str, CachedBalances] = {}
+        self._fetch_tasks: dict[str, asyncio.Task[CachedBalances]] = {}
+
+    def get_profile_names(self) -> list[str]:
+        return [profile.name for profile in self.caisse_d_epargne_config.get_profiles()]
+
+    async def get_balances(self, profile_name: str | None = None) -> CachedBalances:
+        """
+        Args:
+            profile_name: defaults to the configured default profile
+
+        Raises:
+            ProfileNotFoundError:
+            Exception: the error of the fetch, if nothing could be returned
+                from the cache
+        """
+        logger = self.logger.getChild(self.get_balances.__name__)
+
+        profile = self._get_profile(profile_name)
+        cached = self._cache.get(profile.name)
+        if cached is None or cached.get_age_in_seconds() >= self.config.ttl_in_seconds:
+            # the daemon may have stored newer balances meanwhile
+            stored = await self._load_from_balance_store(profile)
+            if stored is not None and (
+                cached is None or stored.fetched_at > cached.fetched_at
+            ):
+                cached = self._cache[profile.name] = stored
+
+        if cached is not None:
+            age_in_seconds = cached.get_age_in_seconds()
+            if age_in_seconds < self.config.ttl_in_seconds:
+                return cached
+            if age_in_seconds < self.config.stale_ttl_in_seconds:
+                logger.debug(
+                    f"serving stale balances of profile '{profile.name}',"
+                    f" {age_in_seconds:.0f}s old"
+                )
+                self._start_fetch(profile)
+                return cached
+
+        return await asyncio.shield(self._start_fetch(profile))
+
+    async def close(self) -> None:
+        """Cancel the fetches in flight."""
+        for task in self._fetch_tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._fetch_tasks.values(), return_exceptions=True)
+
+    def _get_profile(self, profile_name: str | None) -> CaisseDEpargneProfile:
+        if profile_name is None:
+            return self.caisse_d_epargne_config.get_default_profile()
+        for profile in self.caisse_d_epargne_config.get_profiles():
+            if profile.name == profile_name:
+                return profile
+        raise ProfileNotFoundError(profile_name)
+
+    def _start_fetch(self, profile: CaisseDEpargneProfile) -> asyncio.Task:
+        """Return the fetch in flight for the profile, starting one if needed."""
+        task = self._fetch_tasks.get(profile.name)
+        if task is None:
+            task = asyncio.create_task(self._fetch(profile))
+            self._fetch_tasks[profile.name] = task
+            task.add_done_callback(functools.partial(self._on_fetch_done, profile.name))
+        return task
+
+    def _on_fetch_done(self, profile_name: str, task: asyncio.Task) -> None:
+        del self._fetch_tasks[profile_name]
+        # stale queries do not wait for their fetch, retrieve its error here so
+        # that it is not reported as never retrieved
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.getChild(self._on_fetch_done.__name__).debug(
+                f"fetch of profile '{profile_name}' failed: {task.exception()!r}"
+            )
+
+    async def _fetch(self, profile: CaisseDEpargneProfile) -> CachedBalances:
+        logger = self.logger.getChild(self._fetch.__name__)
+        logger.info(f"fetching balances of profile '{profile.name}'")
+
+        [result] = [
+            result
+            async for result in self.banking_service.stream_profile_balances(
+                [profile], keep_adapters_open=True
+            )
+        ]
+        if result.error is not None:
+            raise result.error
+        assert result.balances is not None
+
+        cached = CachedBalances(
+            profile_name=profile.name,
+            balances=result.balances,
+            fetched_at=time.time(),
+        )
+        self._cache[profile.name] = cached
+        return cached
+
+    async def _load_from_balance_store(
+        self, profile: CaisseDEpargneProfile
+    ) -> CachedBalances | None:
+        """Return the latest stored balances, e.g. those stored by the daemon or
+        by a previous run.
+
+        None unless every declared account of the profile was stored.
+        """
+        if self.balance_store is None:
+            return None
+
+        snapshots = {
+            snapshot.account_id: snapshot
+            for snapshot in await asyncio.to_thread(
+                self.balance_store.get_latest_of_every_account, profile.name
+            )
+        }
+        currencies = {
+            account.id: account.currency for account in profile.get_accounts()
+        }
+        if not currencies.keys() <= snapshots.keys():
+            return None
+        account_ids = list(currencies) + (
+            [account_id for account_id in snapshots if account_id not in currencies]
+            if profile.all_accounts
+            else []
+        )
+        if len(account_ids) == 0:
+            return None
+
+        return CachedBalances(
+            profile_name=profile.name,
+            balances=GetAccountBalanceResult(
+                accounts=[
+                    AccountBalance(
+                        account_id=account_id,
+                        balance=snapshots[account_id].balance,
+                        # the store only holds balances, in the only currency
+                        # the bank's pages use
+                        currency=currencies.get(account_id, Currency.EURO),
+                    )
+                    for account_id in account_ids
+                ]
+            ),
+            # as old as the oldest balance
+            fetched_at=min(
+                snapshots[account_id].timestamp for account_id in account_ids
+            ),
+        )
@@ -1,26 +1,210 @@
+import asyncio
 import dataclasses
-from bank_automation.adapters.caisse_d_epargne_adapter import CaisseDEpargneAdapter
+import functools
+import sqlite3
+from typing import TYPE_CHECKING, AsyncIterator, Callable
+
+from bank_automation import AccountBalance
+from bank_automation.infra.balance_store import BalanceSnapshot, BalanceStore
+from bank_automation.infra.rate_limiter import RateLimiter
 from bank_automation.services.base_service import BaseService
+from bank_automation.settings import (
+    BankingSettings,
+    CaisseDEpargneProfile,
+    CaisseDEpargneSettings,
+)
 
+if TYPE_CHECKING:
+    from bank_automation.adapters.caisse_d_epargne_adapter import CaisseDEpargneAdapter
 
-@dataclasses.dataclass
+
+@dataclasses.dataclass(frozen=True)
 class GetAccountBalanceResult:
-    checking: float
+    """Balances of a profile's accounts, fetched in one login, the declared
+    accounts first."""
+
+    accounts: list[AccountBalance]
+
+    def get(self, account_id: str) -> AccountBalance:
+        """
+        Raises:
+            KeyError: the account was not fetched
+        """
+        for account_balance in self.accounts:
+            if account_balance.account_id == account_id:
+                return account_balance
+        raise KeyError(account_id)
+
+
+@dataclasses.dataclass
+class ProfileBalanceResult:
+    profile_name: str
+    balances: GetAccountBalanceResult | None
+    error: Exception | None = None
 
 
 class BankingService(BaseService):
     def __init__(
         self,
-        caisse_d_epargne_adapter: CaisseDEpargneAdapter,
+        caisse_d_epargne_adapter: "CaisseDEpargneAdapter",
+        caisse_d_epargne_adapter_factory: Callable[[], "CaisseDEpargneAdapter"],
+        caisse_d_epargne_config: CaisseDEpargneSettings,
+        config: BankingSettings,
+        balance_store: BalanceStore | None = None,
     ) -> None:
         self.caisse_d_epargne_adapter = caisse_d_epargne_adapter
+        self.caisse_d_epargne_adapter_factory = caisse_d_epargne_adapter_factory
+        self.caisse_d_epargne_config = caisse_d_epargne_config
+        self.config = config
+        self.balance_store = balance_store
+        # adapters kept open between fetches, by profile name
+        self._open_adapters: dict[str, "CaisseDEpargneAdapter"] = {}
+        # shared by every caller, e.g. the daemon and the API
+        self._semaphore = asyncio.Semaphore(config.max_concurrency)
+        # fetches in flight, by profile name, joined instead of logging in twice
+        self._profile_fetches: dict[str, asyncio.Task[ProfileBalanceResult]] = {}
+        self.caisse_d_epargne_rate_limiter = RateLimiter(
+            caisse_d_epargne_config.login_rate_limit_per_minute
+        )
         super().__init__()
 
-    async def get_all_account_balances(self):
+    async def get_all_account_balances(self) -> GetAccountBalanceResult:
+        """Fetch the balances of the default profile's accounts, or of every
+        account on its dashboard if it sets `all_accounts`."""
         logger = self.logger.getChild(self.get_all_account_balances.__name__)
-        checking_balance = (
-            await self.caisse_d_epargne_adapter.get_checking_account_balance()
+        profile = self.caisse_d_epargne_config.get_default_profile()
+        balances = GetAccountBalanceResult(
+            accounts=await self.caisse_d_epargne_adapter.get_account_balances(profile)
         )
-        logger.info(f"fetched checking account balance: {checking_balance}")
+        logger.info(f"fetched account balances: {balances.accounts}")
+
+        await self._store_balances(profile, balances)
+        return balances
+
+    async def stream_profile_balances(
+        self,
+        profiles: list[CaisseDEpargneProfile] | None = None,
+        keep_adapters_open: bool = False,
+    ) -> AsyncIterator[ProfileBalanceResult]:
+        """Fetch the balances of every profile concurrently, each in its own browser
+        session, yielding each profile's result as soon as it completes.
+
+        A failing or timed out profile yields a result holding its error instead
+        of interrupting the other profiles. A profile already being fetched, e.g.
+        by the daemon while the API asks for it, is not fetched again: its
+        fetch in flight is awaited, and completes even if this stream is
+        abandoned.
+
+        Args:
+            profiles: profiles to fetch, defaults to every configured profile
+            keep_adapters_open: keep each profile's browser session open for the
+                next fetch, until `close_adapters` is called. Sessions of failed
+                fetches are closed anyway.
+        """
+        if profiles is None:
+            profiles = self.caisse_d_epargne_config.get_profiles()
+
+        tasks = [
+            asyncio.shield(self._start_profile_fetch(profile, keep_adapters_open))
+            for profile in profiles
+        ]
+        try:
+            for next_completed in asyncio.as_completed(tasks):
+                yield await next_completed
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def close_adapters(self) -> None:
+        """Close the browser sessions kept open by `stream_profile_balances`."""
+        adapters = list(self._open_adapters.values())
+        self._open_adapters.clear()
+        for adapter in adapters:
+            await adapter.aclose()
+
+    def _start_profile_fetch(
+        self, profile: CaisseDEpargneProfile, keep_adapter_open: bool
+    ) -> asyncio.Task[ProfileBalanceResult]:
+        """Return the fetch in flight for the profile, starting one if needed."""
+        task = self._profile_fetches.get(profile.name)
+        if task is None:
+            task = asyncio.create_task(
+                self._fetch_profile_balances(profile, keep_adapter_open)
+            )
+            self._profile_fetches[profile.name] = task
+            task.add_done_callback(
+                functools.partial(self._on_profile_fetch_done, profile.name)
+            )
+        return task
+
+    def _on_profile_fetch_done(self, profile_name: str, task: asyncio.Task) -> None:
+        if self._profile_fetches.get(profile_name) is task:
+            del self._profile_fetches[profile_name]
+
+    async def _fetch_profile_balances(
+        self,
+        profile: CaisseDEpargneProfile,
+        keep_adapter_open: bool = False,
+    ) -> ProfileBalanceResult:
+        logger = self.logger.getChild(self._fetch_profile_balances.__name__)
+
+        async with self._semaphore:
+            await self.caisse_d_epargne_rate_limiter.acquire()
+            logger.info(f"fetching balances of profile '{profile.name}'")
+
+            adapter = self._open_adapters.pop(profile.name, None)
+            is_fetched = False
+            try:
+                if adapter is None:
+                    adapter = self.caisse_d_epargne_adapter_factory()
+                account_balances = await asyncio.wait_for(
+                    adapter.get_account_balances(profile),
+                    timeout=self.config.profile_timeout_in_seconds,
+                )
+                is_fetched = True
+            except Exception as e:
+                logger.error(
+                    f"could not fetch balances of profile '{profile.name}': {e!r}"
+                )
+                return ProfileBalanceResult(
+                    profile_name=profile.name, balances=None, error=e
+                )
+            finally:
+                if adapter is not None:
+                    if keep_adapter_open and is_fetched:
+                        replaced_adapter = self._open_adapters.pop(profile.name, None)
+                        self._open_adapters[profile.name] = adapter
+                        if replaced_adapter is not None:
+                            await replaced_adapter.aclose()
+                    else:
+                        await adapter.aclose()
+
+        logger.info(f"fetched balances of profile '{profile.name}'")
+        balances = GetAccountBalanceResult(accounts=account_balances)
+        await self._store_balances(profile, balances)
+        return ProfileBalanceResult(profile_name=profile.name, balances=balances)
+
+    async def _store_balances(
+        self, profile: CaisseDEpargneProfile, balances: GetAccountBalanceResult
+    ) -> None:
+        """Record the fetched balances, without failing the fetch if the store
+        cannot be written."""
+        if self.balance_store is None:
+            return
 
-        return GetAccountBalanceResult(checking=checking_balance)
+        try:
+            await asyncio.to_thread(
+                self.balance_store.append,
+                [
+                    BalanceSnapshot(
+                        profile_name=profile.name,
+                        account_id=account_balance.account_id,
+                        balance=account_balance.balance,
+                    )
+                    for account_balance in balances.accounts
+                ],
+            )
+        except sqlite3.Error as e:
+            self.logger.getChild(self._store_balances.__name__).error(
+                f"could not store balances of profile '{profile.name}': {e!r}"
+            )
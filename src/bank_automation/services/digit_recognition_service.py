@@ -1,64 +1,162 @@
-import base64
+import binascii
+from typing import Callable
 
-import easyocr
+import numpy as np
 
+from bank_automation.infra.digit_recognition_cache import DigitRecognitionCache
+from bank_automation.infra.digit_recognition_engine import DigitRecognitionEngine
+from bank_automation.infra.png_decoder import decode_png_to_grayscale
 from bank_automation.services.base_service import BaseService
 from bank_automation.settings import DigitRecognitionSettings
 
 
 class DigitRecognitionService(BaseService):
     def __init__(
-        self, reader: easyocr.Reader, config: DigitRecognitionSettings
+        self,
+        engine: DigitRecognitionEngine,
+        config: DigitRecognitionSettings,
+        cache: DigitRecognitionCache | None = None,
     ) -> None:
-        self.reader = reader
+        self.engine = engine
         self.config = config
+        self.cache = cache
         super().__init__()
 
-    def recognize_digit_from_base64(self, base64_string: str) -> int | None:
-        logger = self.logger.getChild("recognize_digits_from_base64")
-
-        image_bytes = base64.b64decode(base64_string)
-        fixed_bytes = self._remove_bytes_after_iend_chunk(image_bytes)
-
-        candidates = self.reader.readtext(
-            fixed_bytes,
-            detail=0,
-            allowlist="0123456789",
-            # max_candidates=1,
-            text_threshold=self.config.text_threshold,
-            low_text=self.config.low_text,
-        )
-
-        logger.debug(f"candidates {candidates}")
-
-        if len(candidates) == 0:
-            return None
-
-        result: int
-        first_candidate = candidates[0]
-        if type(first_candidate) is str:
-            result = int(first_candidate)
-        # elif type(first_candidate) is list:
-        #     raise NotImplementedError(f"not implemented for type {type(first_candidate)}")
-        # elif type(first_candidate) is dict:
-        #     raise NotImplementedError(f"not implemented for type {type(first_candidate)}")
-        else:
-            error_message = f"Unexpected type: {type(first_candidate)}"
-            raise ValueError(error_message)
+    def warm_up(self) -> None:
+        """Load the engine's models and run a first inference, which allocates
+        its buffers."""
+        self.engine.warm_up()
+
+    def decode_base64_pngs(self, base64_strings: list[str]) -> list[memoryview]:
+        """Decode each base64-encoded PNG image, once, for the batch methods
+        below."""
+        return [
+            self._decode_base64_png(base64_string) for base64_string in base64_strings
+        ]
+
+    def get_cache_keys(self, pngs: list[memoryview]) -> list[str | None]:
+        """Return the cache key of each decoded image, or None without a
+        cache."""
+        if self.cache is None:
+            return [None] * len(pngs)
+        return [self.cache.key_for(png) for png in pngs]
+
+    def get_cached_digits(self, cache_keys: list[str | None]) -> list[int | None]:
+        """Return the cached digit of each image, or None when it is not cached,
+        without running the engine."""
+        return [
+            self.cache.get(cache_key)
+            if self.cache is not None and cache_key is not None
+            else None
+            for cache_key in cache_keys
+        ]
+
+    async def score_digits(
+        self,
+        pngs: list[memoryview],
+        preprocess: Callable[[np.ndarray], np.ndarray] | None = None,
+    ) -> np.ndarray:
+        """Score every digit for each image, in a single engine call, bypassing
+        the cache, without blocking the event loop.
+
+        Args:
+            pngs: PNG images, as decoded by `decode_base64_pngs`
+            preprocess: applied to each decoded grayscale image, e.g. to retry
+                ambiguous images with another binarization
+
+        Returns:
+            the engine's scores, of shape (len(pngs), 10)
+        """
+        images = [decode_png_to_grayscale(png) for png in pngs]
+        if preprocess is not None:
+            images = [preprocess(image) for image in images]
+        return await self.engine.score_batch_async(images)
+
+    def cache_digits(self, cache_keys: list[str | None], digits: list[int]) -> None:
+        """Remember the digit of each image, once it is known for sure."""
+        if self.cache is None:
+            return
+        for cache_key, digit in zip(cache_keys, digits):
+            if cache_key is not None:
+                self.cache.set(cache_key, digit)
 
-        return result
-
-    def _remove_bytes_after_iend_chunk(self, input_bytes: bytes) -> bytes:
+    def recognize_digit_from_base64(self, base64_string: str) -> int | None:
+        return self.recognize_digits_from_base64_batch([base64_string])[0]
+
+    def recognize_digits_from_base64_batch(
+        self, base64_strings: list[str]
+    ) -> list[int | None]:
+        """Recognize one digit per image, running a single engine call for all
+        the images that are not already cached.
+
+        Each image is decoded from base64 once, truncated and hashed through a
+        memoryview, and decoded to a grayscale array only on cache misses.
+
+        Args:
+            base64_strings: base64-encoded PNG images
+
+        Returns:
+            the recognized digit of each image, in the same order, or None when
+            no digit could be recognized
+        """
+        logger = self.logger.getChild(self.recognize_digits_from_base64_batch.__name__)
+
+        results: list[int | None] = [None] * len(base64_strings)
+        cache_keys: list[str | None] = [None] * len(base64_strings)
+        uncached_indices: list[int] = []
+        uncached_images: list[np.ndarray] = []
+
+        for index, base64_string in enumerate(base64_strings):
+            png_view = self._decode_base64_png(base64_string)
+
+            if self.cache is not None:
+                cache_key = self.cache.key_for(png_view)
+                cache_keys[index] = cache_key
+                cached_digit = self.cache.get(cache_key)
+                if cached_digit is not None:
+                    # formatted only when debug logging is enabled, this runs
+                    # for every keypad button
+                    logger.debug("cache hit for %s: %s", cache_key, cached_digit)
+                    results[index] = cached_digit
+                    continue
+
+            uncached_indices.append(index)
+            uncached_images.append(decode_png_to_grayscale(png_view))
+
+        if len(uncached_images) == 0:
+            return results
+
+        recognized_digits = self.engine.recognize_batch(uncached_images)
+
+        for index, result in zip(uncached_indices, recognized_digits):
+            results[index] = result
+
+            cache_key = cache_keys[index]
+            if self.cache is not None and cache_key is not None and result is not None:
+                self.cache.set(cache_key, result)
+
+        return results
+
+    def _decode_base64_png(self, base64_string: str) -> memoryview:
+        # unlike b64decode, decodes the ASCII string without encoding it to
+        # bytes first
+        image_bytes = binascii.a2b_base64(base64_string)
+        return self._remove_bytes_after_iend_chunk(image_bytes)
+
+    def _remove_bytes_after_iend_chunk(self, input_bytes: bytes) -> memoryview:
+        """Return a view of the PNG image up to its IEND chunk, without copying
+        it."""
         logger = self.logger.getChild(self._remove_bytes_after_iend_chunk.__name__)
 
-        logger.debug(f"input_bytes: {input_bytes}")
-
         # iend_chunk = b"\x00\x00\x00\x00\x49\x45\x4e\x44\xae\x42\x60\x82"
         iend_chunk = self.config.iend_chunk
         iend_chunk_index = input_bytes.index(iend_chunk)
-        logger.debug(f"found index {iend_chunk_index}")
-
-        output_bytes = input_bytes[: iend_chunk_index + len(iend_chunk)]
-        logger.debug(f"removed {len(input_bytes) - len(output_bytes)} bytes")
+        end_index = iend_chunk_index + len(iend_chunk)
+        # the image bytes themselves are never logged, only their size
+        logger.debug(
+            "found IEND chunk at index %d, removed %d bytes",
+            iend_chunk_index,
+            len(input_bytes) - end_index,
+        )
 
-        return output_bytes
+        return memoryview(input_bytes)[:end_index]
@@ -0,0 +1,86 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Callable
+
+from bank_automation.services.base_service import BaseService
+from bank_automation.services.digit_recognition_service import DigitRecognitionService
+from bank_automation.settings import DigitRecognitionSettings
+
+
+class DigitRecognitionWarmUp(BaseService):
+    """Create the digit recognition service in a background thread, loading the
+    OCR models and running a first inference while the browser navigates to
+    the keypad.
+
+    The service is only ever created by this thread, callers wait for it with
+    `wait_until_ready`. If its creation fails, e.g. a model download, the
+    next `wait_until_ready` tries again.
+    """
+
+    def __init__(
+        self,
+        service_provider: Callable[[], DigitRecognitionService],
+        config: DigitRecognitionSettings,
+    ) -> None:
+        super().__init__()
+        self.service_provider = service_provider
+        self.config = config
+
+        self._service_future: concurrent.futures.Future[DigitRecognitionService] = (
+            concurrent.futures.Future()
+        )
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> concurrent.futures.Future[DigitRecognitionService]:
+        """Start creating the service, unless it is already started.
+
+        Returns:
+            future of the service
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._create_service,
+                    args=(self._service_future,),
+                    name=self.__class__.__name__,
+                    daemon=True,
+                )
+                self._thread.start()
+            return self._service_future
+
+    async def wait_until_ready(self) -> DigitRecognitionService:
+        """Return the service once created, starting its creation if needed.
+
+        Raises:
+            Exception: any error raised while creating the service
+        """
+        return await asyncio.wrap_future(self.start())
+
+    def _create_service(
+        self, service_future: concurrent.futures.Future[DigitRecognitionService]
+    ) -> None:
+        logger = self.logger.getChild(self._create_service.__name__)
+
+        logger.info("creating the digit recognition service")
+        try:
+            service = self.service_provider()
+        except BaseException as e:
+            logger.error(f"could not create the digit recognition service: {e!r}")
+            # the current waiters fail, the next ones start over
+            with self._lock:
+                self._service_future = concurrent.futures.Future()
+                self._thread = None
+            service_future.set_exception(e)
+            return
+
+        if self.config.warm_up:
+            try:
+                service.warm_up()
+            except Exception as e:
+                # the models are loaded again on first use, the inference
+                # itself may still succeed
+                logger.error(f"could not warm up the digit recognition: {e!r}")
+        logger.info("digit recognition service is ready")
+        service_future.set_result(service)
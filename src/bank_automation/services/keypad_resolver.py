@@ -0,0 +1,246 @@
+import asyncio
+
+import numpy as np
+
+from bank_automation.errors.banking_errors import PasswordDigitNotFoundError
+from bank_automation.infra.digit_recognition_engine import DIGIT_COUNT
+from bank_automation.infra.image_preprocessing import binarize, pad_and_upscale
+from bank_automation.infra.tracing import Tracer
+from bank_automation.services.base_service import BaseService
+from bank_automation.services.digit_recognition_warm_up import DigitRecognitionWarmUp
+from bank_automation.settings import DigitRecognitionSettings
+
+# ambiguous buttons are recognized again with each of these, their scores are
+# averaged with the first ones
+ALTERNATE_PREPROCESSINGS = (binarize, pad_and_upscale)
+
+
+class KeypadResolver(BaseService):
+    """Find the buttons of a password's digits on a shuffled keypad, running OCR
+    on as few buttons as possible.
+
+    Cached buttons are resolved first, for free. The others are scored in
+    rounds of `keypad_round_size` buttons, one engine call each, until every
+    digit of the password is found.
+
+    Each round, the digits are assigned one-to-one to the buttons, maximizing
+    the total score, so that two buttons read as the same digit cannot both
+    keep it. A button's digit is only trusted if it scores at least
+    `keypad_min_confidence` and if taking it away costs the assignment at
+    least `keypad_min_margin`. Untrusted buttons are scored again once, with
+    alternate preprocessing. On a full keypad, the last untrusted button holds
+    the only digit left.
+    """
+
+    def __init__(
+        self,
+        digit_recognition_warm_up: DigitRecognitionWarmUp,
+        config: DigitRecognitionSettings,
+        tracer: Tracer | None = None,
+    ) -> None:
+        super().__init__()
+        self.digit_recognition_warm_up = digit_recognition_warm_up
+        self.config = config
+        self.tracer = tracer if tracer is not None else Tracer()
+
+    async def resolve(
+        self, base64_images: list[str], needed_digits: set[int]
+    ) -> dict[int, int]:
+        """
+        Args:
+            base64_images: base64-encoded PNG image of each keypad button, at
+                most 10
+            needed_digits: digits of the password
+
+        Returns:
+            map of each needed digit to the index of its button
+
+        Raises:
+            PasswordDigitNotFoundError: some needed digits were not recognized
+        """
+        logger = self.logger.getChild(self.resolve.__name__)
+
+        button_count = len(base64_images)
+        if button_count > DIGIT_COUNT:
+            raise ValueError(f"expected at most {DIGIT_COUNT} buttons: {button_count}")
+
+        with self.tracer.span("ocr_ready_wait"):
+            service = await self.digit_recognition_warm_up.wait_until_ready()
+
+        scores = np.zeros((button_count, DIGIT_COUNT), dtype=np.float32)
+        is_scored = np.zeros(button_count, dtype=bool)
+        # decoded and hashed once, each round and retry reuses them
+        pngs = service.decode_base64_pngs(base64_images)
+        cache_keys = service.get_cache_keys(pngs)
+        cached_digits = service.get_cached_digits(cache_keys)
+        for index, digit in enumerate(cached_digits):
+            if digit is not None:
+                scores[index, digit] = 1.0
+                is_scored[index] = True
+
+        unscored_indices = [
+            index for index in range(button_count) if not is_scored[index]
+        ]
+        retried_indices: set[int] = set()
+        recognized_count = 0
+        while True:
+            button_indices_by_digit = self._get_trusted_digits(scores, is_scored)
+            if needed_digits <= button_indices_by_digit.keys():
+                break
+
+            if len(unscored_indices) > 0:
+                round_size = self.config.keypad_round_size
+                if button_count == DIGIT_COUNT:
+                    # the last button may be inferred
+                    round_size = min(round_size, max(len(unscored_indices) - 1, 1))
+                round_indices = unscored_indices[:round_size]
+                unscored_indices = unscored_indices[len(round_indices) :]
+                with self.tracer.span("ocr", button_count=len(round_indices)):
+                    scores[round_indices] = await service.score_digits(
+                        [pngs[index] for index in round_indices]
+                    )
+                is_scored[round_indices] = True
+                recognized_count += len(round_indices)
+                continue
+
+            trusted_indices = set(button_indices_by_digit.values())
+            ambiguous_indices = [
+                index
+                for index in range(button_count)
+                if is_scored[index]
+                and index not in trusted_indices
+                and index not in retried_indices
+                and cached_digits[index] is None
+            ]
+            if len(ambiguous_indices) == 0:
+                break
+            logger.info(f"recognizing ambiguous buttons again: {ambiguous_indices}")
+            with self.tracer.span("ocr_retry", button_count=len(ambiguous_indices)):
+                ambiguous_pngs = [pngs[index] for index in ambiguous_indices]
+                alternate_scores = [
+                    await service.score_digits(ambiguous_pngs, preprocess)
+                    for preprocess in ALTERNATE_PREPROCESSINGS
+                ]
+            scores[ambiguous_indices] = np.mean(
+                [scores[ambiguous_indices], *alternate_scores], axis=0
+            )
+            retried_indices.update(ambiguous_indices)
+
+        logger.debug(
+            "resolved %d digits, %d buttons cached, %d recognized, %d retried",
+            len(button_indices_by_digit),
+            sum(digit is not None for digit in cached_digits),
+            recognized_count,
+            len(retried_indices),
+        )
+        # inferred digits are remembered too: the other buttons were trusted
+        recognized_indices = [
+            (digit, index)
+            for digit, index in button_indices_by_digit.items()
+            if cached_digits[index] is None
+        ]
+        await asyncio.to_thread(
+            service.cache_digits,
+            [cache_keys[index] for _, index in recognized_indices],
+            [digit for digit, _ in recognized_indices],
+        )
+
+        missing_digits = needed_digits - button_indices_by_digit.keys()
+        if len(missing_digits) > 0:
+            raise PasswordDigitNotFoundError(sorted(missing_digits))
+        return {digit: button_indices_by_digit[digit] for digit in needed_digits}
+
+    def _get_trusted_digits(
+        self, scores: np.ndarray, is_scored: np.ndarray
+    ) -> dict[int, int]:
+        """Assign the digits to the scored buttons and keep the trusted pairs.
+
+        Unscored buttons are left out: they take the digits left over.
+
+        Returns:
+            map of each trusted digit to the index of its button
+        """
+        button_count = len(scores)
+        scored_indices = np.flatnonzero(is_scored)
+        scored_scores = scores[scored_indices]
+        assignment, total_score = solve_assignment(scored_scores)
+        best_scores = scored_scores.max(axis=1)
+
+        button_indices_by_digit: dict[int, int] = {}
+        for row, digit in enumerate(assignment):
+            if scored_scores[row, digit] < self.config.keypad_min_confidence:
+                continue
+            # every other button taking its best digit bounds the best
+            # assignment which does not give this digit to this button, the
+            # exact one is only solved when the bound is not enough
+            excluding_total_score = (
+                best_scores.sum()
+                - best_scores[row]
+                + np.delete(scored_scores[row], digit).max()
+            )
+            if total_score - excluding_total_score < self.config.keypad_min_margin:
+                excluding_scores = scored_scores.copy()
+                excluding_scores[row, digit] = -np.inf
+                _, excluding_total_score = solve_assignment(excluding_scores)
+            if total_score - excluding_total_score >= self.config.keypad_min_margin:
+                button_indices_by_digit[digit] = int(scored_indices[row])
+
+        untrusted_indices = set(range(button_count)) - set(
+            button_indices_by_digit.values()
+        )
+        if button_count == DIGIT_COUNT and len(untrusted_indices) == 1:
+            [index] = untrusted_indices
+            [digit] = set(range(DIGIT_COUNT)) - button_indices_by_digit.keys()
+            self.logger.getChild(self._get_trusted_digits.__name__).debug(
+                "inferred digit %d of button %d", digit, index
+            )
+            button_indices_by_digit[digit] = index
+        return button_indices_by_digit
+
+
+def solve_assignment(scores: np.ndarray) -> tuple[list[int], float]:
+    """Assign a distinct digit to each button, maximizing the total score.
+
+    Solved by dynamic programming over the sets of digits already assigned to
+    the first buttons, 2^10 states per button.
+
+    Args:
+        scores: score of each digit for each button, of shape (buttons, digits)
+            with at most as many buttons as digits
+
+    Returns:
+        the digit of each button, and the total score
+    """
+    button_count, digit_count = scores.shape
+    top_digits = scores.argmax(axis=1)
+    if len(set(top_digits.tolist())) == button_count:
+        # every button gets its best digit, the usual case
+        return top_digits.tolist(), float(scores.max(axis=1).sum())
+
+    masks = np.arange(1 << digit_count)
+    best_totals = np.full(len(masks), -np.inf)
+    best_totals[0] = 0.0
+    # digit given to each button, for each set of digits given so far
+    choices: list[np.ndarray] = []
+    for index in range(button_count):
+        next_best_totals = np.full(len(masks), -np.inf)
+        choice = np.full(len(masks), -1)
+        for digit in range(digit_count):
+            bit = 1 << digit
+            free_masks = masks[(masks & bit) == 0]
+            totals = best_totals[free_masks] + scores[index, digit]
+            next_masks = free_masks | bit
+            is_better = totals > next_best_totals[next_masks]
+            next_best_totals[next_masks[is_better]] = totals[is_better]
+            choice[next_masks[is_better]] = digit
+        best_totals = next_best_totals
+        choices.append(choice)
+
+    mask = int(np.argmax(best_totals))
+    total = float(best_totals[mask])
+    assignment = [0] * button_count
+    for index in reversed(range(button_count)):
+        digit = int(choices[index][mask])
+        assignment[index] = digit
+        mask ^= 1 << digit
+    return assignment, total
@@ -0,0 +1,125 @@
+import asyncio
+import random
+import time
+
+from bank_automation.infra.balance_store import BalanceStore
+from bank_automation.infra.process_memory import get_process_tree_rss_bytes
+from bank_automation.services.banking_service import BankingService
+from bank_automation.services.base_service import BaseService
+from bank_automation.settings import DaemonSettings
+
+
+class RefreshDaemon(BaseService):
+    """Refresh the balances of every profile on a schedule, keeping the browser
+    sessions and the digit recognition models loaded between refreshes.
+
+    Each delay is spread by a random jitter. After a refresh where a profile
+    failed, the delay backs off exponentially instead.
+    """
+
+    def __init__(
+        self,
+        banking_service: BankingService,
+        config: DaemonSettings,
+        balance_store: BalanceStore | None = None,
+    ) -> None:
+        super().__init__()
+        self.banking_service = banking_service
+        self.config = config
+        self.balance_store = balance_store
+        self._consecutive_failure_count = 0
+        self._last_compaction_time: float | None = None
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        """Refresh until the stop event is set, then close the browser sessions."""
+        logger = self.logger.getChild(self.run.__name__)
+
+        try:
+            while not stop_event.is_set():
+                is_refreshed = await self.refresh()
+                if is_refreshed:
+                    self._consecutive_failure_count = 0
+                else:
+                    self._consecutive_failure_count += 1
+
+                await self._restart_browsers_above_memory_limit()
+                await self._compact_balance_store()
+
+                delay = self.get_next_delay()
+                logger.info(f"next refresh in {delay:.0f}s")
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=delay)
+                except TimeoutError:
+                    pass
+        finally:
+            logger.info("stopping, closing browser sessions")
+            await self.banking_service.close_adapters()
+
+    async def refresh(self) -> bool:
+        """Fetch the balances of every profile.
+
+        Returns:
+            whether every profile was fetched
+        """
+        logger = self.logger.getChild(self.refresh.__name__)
+
+        failed_profile_names: list[str] = []
+        async for result in self.banking_service.stream_profile_balances(
+            keep_adapters_open=True
+        ):
+            if result.error is not None:
+                failed_profile_names.append(result.profile_name)
+            else:
+                logger.info(
+                    f"profile '{result.profile_name}' balances: {result.balances}"
+                )
+
+        if len(failed_profile_names) > 0:
+            logger.warning(f"failed profiles: {failed_profile_names}")
+        return len(failed_profile_names) == 0
+
+    def get_next_delay(self) -> float:
+        if self._consecutive_failure_count == 0:
+            delay = self.config.refresh_interval_in_seconds
+        else:
+            delay = min(
+                self.config.failure_backoff_initial_in_seconds
+                * 2 ** (self._consecutive_failure_count - 1),
+                self.config.failure_backoff_max_in_seconds,
+            )
+        jitter = random.uniform(-self.config.jitter_ratio, self.config.jitter_ratio)
+        return delay * (1 + jitter)
+
+    async def _restart_browsers_above_memory_limit(self) -> None:
+        logger = self.logger.getChild(
+            self._restart_browsers_above_memory_limit.__name__
+        )
+
+        rss_bytes = await asyncio.to_thread(get_process_tree_rss_bytes)
+        if rss_bytes is None:
+            return
+        rss_megabytes = rss_bytes / 1024 / 1024
+        logger.debug(f"memory used: {rss_megabytes:.0f} MB")
+
+        if rss_megabytes > self.config.memory_limit_in_megabytes:
+            logger.warning(
+                f"memory used ({rss_megabytes:.0f} MB) is above the limit"
+                f" ({self.config.memory_limit_in_megabytes:.0f} MB),"
+                " restarting the browsers"
+            )
+            # the next refresh starts new browsers, restoring the saved sessions
+            await self.banking_service.close_adapters()
+
+    async def _compact_balance_store(self) -> None:
+        if self.balance_store is None:
+            return
+
+        now = time.time()
+        if (
+            self._last_compaction_time is not None
+            and now - self._last_compaction_time
+            < self.balance_store.config.compaction_interval_in_seconds
+        ):
+            return
+        await asyncio.to_thread(self.balance_store.compact)
+        self._last_compaction_time = now
@@ -0,0 +1,65 @@
+import asyncio
+from typing import TYPE_CHECKING, Callable
+
+from bank_automation import Transaction
+from bank_automation.infra.transaction_sinks import TransactionSink
+from bank_automation.services.base_service import BaseService
+from bank_automation.settings import CaisseDEpargneProfile, TransactionExportSettings
+
+if TYPE_CHECKING:
+    from bank_automation.adapters.caisse_d_epargne_adapter import CaisseDEpargneAdapter
+
+
+class TransactionExportService(BaseService):
+    """Stream the transaction history of an account to a sink, in batches of at
+    most `batch_size` transactions, never holding the whole history in memory.
+
+    Batches are written in a thread, while the next page keeps downloading.
+    """
+
+    def __init__(
+        self,
+        caisse_d_epargne_adapter_factory: Callable[[], "CaisseDEpargneAdapter"],
+        config: TransactionExportSettings,
+    ) -> None:
+        super().__init__()
+        self.caisse_d_epargne_adapter_factory = caisse_d_epargne_adapter_factory
+        self.config = config
+
+    async def export(
+        self,
+        account_id: str,
+        sink: TransactionSink,
+        profile: CaisseDEpargneProfile | None = None,
+    ) -> int:
+        """Write every transaction of the account to the sink, which is left
+        open.
+
+        Args:
+            profile: defaults to the configured default profile
+
+        Returns:
+            number of transactions written
+        """
+        logger = self.logger.getChild(self.export.__name__)
+
+        adapter = self.caisse_d_epargne_adapter_factory()
+        transaction_count = 0
+        batch: list[Transaction] = []
+        try:
+            async for transaction in adapter.stream_transactions(account_id, profile):
+                batch.append(transaction)
+                if len(batch) >= self.config.batch_size:
+                    await asyncio.to_thread(sink.write_batch, batch)
+                    transaction_count += len(batch)
+                    batch = []
+            if len(batch) > 0:
+                await asyncio.to_thread(sink.write_batch, batch)
+                transaction_count += len(batch)
+        finally:
+            await adapter.aclose()
+
+        logger.info(
+            f"exported {transaction_count} transactions of account {account_id}"
+        )
+        return transaction_count
@@ -1,6 +1,10 @@
-from pydantic import Field
+from typing import Literal
+
+from pydantic import BaseModel, Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from bank_automation import Currency, CurrencyType
+
 
 class DigitRecognitionSettings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -8,6 +12,37 @@ class DigitRecognitionSettings(BaseSettings):
         # env_file=".env",
         # env_file_encoding="utf-8",
     )
+    engine: Literal["template", "easyocr"] = Field(
+        default="template",
+        alias="digit_recognition_engine",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    template_directory: str | None = Field(
+        default=None,
+        alias="digit_recognition_template_directory",
+        description="Directory of digit_<label>.png reference glyphs, bundled ones if None.",
+        frozen=True,
+        validate_default=True,
+        strict=True,
+        init=False,
+    )
+    template_min_confidence: float = Field(
+        default=0.8,
+        alias="digit_recognition_template_min_confidence",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    template_fallback_to_easyocr: bool = Field(
+        default=True,
+        alias="digit_recognition_template_fallback_to_easyocr",
+        description="Recognize low confidence template matches with easyocr.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
     languages: list[str] = Field(
         # default=None,
         default_factory=lambda: ["en"],
@@ -30,6 +65,92 @@ class DigitRecognitionSettings(BaseSettings):
         strict=True,
         init=False,
     )
+    keypad_round_size: int = Field(
+        default=3,
+        alias="digit_recognition_keypad_round_size",
+        description="Keypad buttons recognized per engine call, until the password's digits are found.",
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+    # every engine scores in [0, 1], but template correlations and easyocr
+    # confidences are not calibrated alike: when the template engine falls
+    # back, both are held to the same thresholds
+    keypad_min_confidence: float = Field(
+        default=0.5,
+        alias="digit_recognition_keypad_min_confidence",
+        description="Keypad buttons scoring their best digit below this are recognized again.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    keypad_min_margin: float = Field(
+        default=0.1,
+        alias="digit_recognition_keypad_min_margin",
+        description="Keypad buttons scoring their two best digits closer than this are recognized again.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    warm_up: bool = Field(
+        default=True,
+        alias="digit_recognition_warm_up",
+        description="Load the OCR models and run a first inference in the background on startup.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    warm_up_template_fallback: bool = Field(
+        default=False,
+        alias="digit_recognition_warm_up_template_fallback",
+        description="Also warm up easyocr behind the template engine, otherwise only loaded when a match is not confident enough.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    easyocr_skip_detection: bool = Field(
+        default=False,
+        alias="digit_recognition_easyocr_skip_detection",
+        description="Only run the recognizer, on each whole image, without text detection. Off until checked against the real easyocr reader, see tests/test_easyocr_digit_recognition_engine.py.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    easyocr_backend: Literal["in_process", "process_pool"] = Field(
+        default="in_process",
+        alias="digit_recognition_easyocr_backend",
+        description="'process_pool' runs easyocr in worker processes shared by concurrent logins.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    easyocr_worker_count: int = Field(
+        default=2,
+        alias="digit_recognition_easyocr_worker_count",
+        description="Worker processes of the process pool backend, each loading the models once.",
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+    easyocr_torch_threads_per_worker: int = Field(
+        default=1,
+        alias="digit_recognition_easyocr_torch_threads_per_worker",
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+    easyocr_max_batch_size: int = Field(
+        default=64,
+        alias="digit_recognition_easyocr_max_batch_size",
+        description="Maximum number of images of queued requests merged into one worker call.",
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
     iend_chunk: bytes = Field(
         default=b"\x00\x00\x00\x00\x49\x45\x4e\x44\xae\x42\x60\x82",
         description="In decoded PNG files, truncate every byte after this IEND chunk.",
@@ -38,15 +159,100 @@ class DigitRecognitionSettings(BaseSettings):
         strict=True,
         init=False,
     )
+    cache_directory: str | None = Field(
+        default=".cache/digit_recognition",
+        alias="digit_recognition_cache_directory",
+        description="Directory of the persistent recognition cache, disabled if None.",
+        frozen=True,
+        validate_default=True,
+        strict=True,
+        init=False,
+    )
+    cache_memory_max_entries: int = Field(
+        default=256,
+        alias="digit_recognition_cache_memory_max_entries",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    cache_disk_max_entries: int = Field(
+        default=4096,
+        alias="digit_recognition_cache_disk_max_entries",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
 
 
-# class CaisseDEpargneAccount(BaseModel):
-#     current: CurrencyType = Field(
-#         frozen=True,
-#         validate_default=True,
-#         strict=True,
-#         init=False,
-#     )
+class CaisseDEpargneAccount(BaseModel):
+    id: str = Field(
+        frozen=True,
+        min_length=1,
+        strict=True,
+    )
+    currency: CurrencyType = Field(
+        default=Currency.EURO,
+        frozen=True,
+        validate_default=True,
+    )
+
+
+class CaisseDEpargneProfile(BaseModel):
+    name: str = Field(
+        default="default",
+        frozen=True,
+        validate_default=True,
+        strict=True,
+    )
+    account_id: str = Field(
+        frozen=True,
+        min_length=1,
+        strict=True,
+    )
+    account_password: str = Field(
+        frozen=True,
+        min_length=1,
+        strict=True,
+        repr=False,
+    )
+    checking_account: str | None = Field(
+        default=None,
+        frozen=True,
+        strict=True,
+    )
+    accounts: list[CaisseDEpargneAccount] = Field(
+        default_factory=list,
+        description="Accounts fetched besides the checking account, with their currency.",
+        frozen=True,
+    )
+    all_accounts: bool = Field(
+        default=False,
+        description="Fetch every account found on the dashboard, not only the declared ones.",
+        frozen=True,
+        strict=True,
+    )
+
+    @model_validator(mode="after")
+    def _check_accounts(self) -> "CaisseDEpargneProfile":
+        if (
+            self.checking_account is None
+            and len(self.accounts) == 0
+            and not self.all_accounts
+        ):
+            raise ValueError(
+                f"profile '{self.name}' declares no account: set checking_account, "
+                "accounts or all_accounts"
+            )
+        return self
+
+    def get_accounts(self) -> list[CaisseDEpargneAccount]:
+        """Return the declared accounts, the checking account first."""
+        accounts = list(self.accounts)
+        if self.checking_account is not None and self.checking_account not in {
+            account.id for account in accounts
+        }:
+            accounts.insert(0, CaisseDEpargneAccount(id=self.checking_account))
+        return accounts
 
 
 class CaisseDEpargneSettings(BaseSettings):
@@ -57,7 +263,8 @@ class CaisseDEpargneSettings(BaseSettings):
         extra="ignore",
     )
 
-    account_id: str = Field(
+    account_id: str | None = Field(
+        default=None,
         alias="caisse_d_epargne_account_id",
         # validation_alias='caisse_d_epargne_account_id',
         frozen=True,
@@ -65,7 +272,8 @@ class CaisseDEpargneSettings(BaseSettings):
         strict=True,
         init=False,
     )
-    account_password: str = Field(
+    account_password: str | None = Field(
+        default=None,
         alias="caisse_d_epargne_account_password",
         # validation_alias='caisse_d_epargne_account_password',
         frozen=True,
@@ -73,14 +281,497 @@ class CaisseDEpargneSettings(BaseSettings):
         strict=True,
         init=False,
     )
-    checking_account: str = Field(
+    checking_account: str | None = Field(
+        default=None,
         alias="caisse_d_epargne_checking_account",
         frozen=True,
         validate_default=True,
         strict=True,
         init=False,
     )
-    # accounts: dict[str, Cai]
+    accounts: list[CaisseDEpargneAccount] = Field(
+        default_factory=list,
+        alias="caisse_d_epargne_accounts",
+        description='JSON list of accounts fetched besides the checking account, e.g. [{"id": "04987654321", "currency": "€"}].',
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    all_accounts: bool = Field(
+        default=False,
+        alias="caisse_d_epargne_all_accounts",
+        description="Fetch every account found on the dashboard, not only the declared ones.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    profiles: list[CaisseDEpargneProfile] = Field(
+        default_factory=list,
+        alias="caisse_d_epargne_profiles",
+        description="JSON list of credential profiles, replacing the single account settings.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    login_rate_limit_per_minute: float = Field(
+        default=12.0,
+        alias="caisse_d_epargne_login_rate_limit_per_minute",
+        description="Maximum number of logins started per minute, across all profiles.",
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+    data_mode: Literal["browser", "http"] = Field(
+        default="browser",
+        alias="caisse_d_epargne_data_mode",
+        description="'http' reads balances from the bank's JSON API, the browser only logs in. Unverified: the API's response format is assumed, and only tested against a hand-written response.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    base_url: str = Field(
+        default="https://www.caisse-epargne.fr",
+        alias="caisse_d_epargne_base_url",
+        description="Web site where the browser logs in, e.g. a local fake bank site in tests.",
+        frozen=True,
+        validate_default=True,
+        strict=True,
+        init=False,
+    )
+    api_base_url: str = Field(
+        default="https://www.rs-ex-ath-groupe.caisse-epargne.fr",
+        alias="caisse_d_epargne_api_base_url",
+        frozen=True,
+        validate_default=True,
+        strict=True,
+        init=False,
+    )
+    accounts_api_path: str = Field(
+        default="/bapi/contract/v2/augmentedSynthesisViews",
+        alias="caisse_d_epargne_accounts_api_path",
+        description="JSON endpoint listing the accounts and their balances, as assumed to be called by the web app, in 'http' data mode.",
+        frozen=True,
+        validate_default=True,
+        strict=True,
+        init=False,
+    )
+    transactions_api_path: str = Field(
+        default="/bapi/operation/v2/operations",
+        alias="caisse_d_epargne_transactions_api_path",
+        description="JSON endpoint listing an account's transactions, one page at a time. Unverified: its paging parameters (accountNumber, pageSize, pageKey, nextPageKey) and response format are assumed, and only tested against the fake bank.",
+        frozen=True,
+        validate_default=True,
+        strict=True,
+        init=False,
+    )
+    transactions_page_size: int = Field(
+        default=100,
+        alias="caisse_d_epargne_transactions_page_size",
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+
+    @model_validator(mode="after")
+    def _check_profiles(self) -> "CaisseDEpargneSettings":
+        if len(self.profiles) == 0:
+            # raises if the single account settings are incomplete
+            self.get_default_profile()
+
+        profile_names = [profile.name for profile in self.profiles]
+        if len(set(profile_names)) != len(profile_names):
+            raise ValueError(f"duplicate profile names: {profile_names}")
+        return self
+
+    def get_profiles(self) -> list[CaisseDEpargneProfile]:
+        if len(self.profiles) > 0:
+            return list(self.profiles)
+        return [self.get_default_profile()]
+
+    def get_default_profile(self) -> CaisseDEpargneProfile:
+        if len(self.profiles) > 0:
+            return self.profiles[0]
+        if (
+            self.account_id is None
+            or self.account_password is None
+            or (
+                self.checking_account is None
+                and len(self.accounts) == 0
+                and not self.all_accounts
+            )
+        ):
+            raise ValueError(
+                "either caisse_d_epargne_profiles or caisse_d_epargne_account_id, "
+                "caisse_d_epargne_account_password and caisse_d_epargne_checking_account "
+                "(or caisse_d_epargne_accounts or caisse_d_epargne_all_accounts) "
+                "must be set"
+            )
+        return CaisseDEpargneProfile(
+            account_id=self.account_id,
+            account_password=self.account_password,
+            checking_account=self.checking_account,
+            accounts=self.accounts,
+            all_accounts=self.all_accounts,
+        )
+
+
+class BankingSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="banking_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+    max_concurrency: int = Field(
+        default=4,
+        description="Maximum number of profiles fetched at the same time, each in its own browser.",
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+    profile_timeout_in_seconds: float = Field(
+        default=180.0,
+        description="Give up on a profile after this delay, e.g. when MFA is never approved.",
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+
+
+class DaemonSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="daemon_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+    refresh_interval_in_seconds: float = Field(
+        default=900.0,
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+    jitter_ratio: float = Field(
+        default=0.1,
+        description="Spread each delay randomly by up to this fraction, to avoid a fixed pattern.",
+        frozen=True,
+        validate_default=True,
+        ge=0,
+        lt=1,
+        init=False,
+    )
+    failure_backoff_initial_in_seconds: float = Field(
+        default=60.0,
+        description="Delay after a failed refresh, doubled after each consecutive failure.",
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+    failure_backoff_max_in_seconds: float = Field(
+        default=3600.0,
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+    memory_limit_in_megabytes: float = Field(
+        default=1536.0,
+        description="Restart the browsers when the daemon and its child processes use more memory.",
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+
+
+class BalanceApiSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="balance_api_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+    enabled: bool = Field(
+        default=True,
+        description="Serve the balances over HTTP while the daemon runs.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    host: str = Field(
+        default="127.0.0.1",
+        frozen=True,
+        validate_default=True,
+        strict=True,
+        init=False,
+    )
+    port: int = Field(
+        default=8765,
+        frozen=True,
+        validate_default=True,
+        ge=0,
+        init=False,
+    )
+    ttl_in_seconds: float = Field(
+        default=300.0,
+        description="Serve cached balances younger than this without fetching them.",
+        frozen=True,
+        validate_default=True,
+        ge=0,
+        init=False,
+    )
+    stale_ttl_in_seconds: float = Field(
+        default=3600.0,
+        description="Serve older cached balances right away, while fetching them in the background.",
+        frozen=True,
+        validate_default=True,
+        ge=0,
+        init=False,
+    )
+
+
+class SessionStoreSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="session_store_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+    enabled: bool = Field(
+        default=True,
+        description="Reuse authenticated browser sessions instead of logging in every time.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    directory: str = Field(
+        default=".cache/sessions",
+        frozen=True,
+        validate_default=True,
+        strict=True,
+        init=False,
+    )
+    encryption_key: str | None = Field(
+        default=None,
+        description="Fernet key, generated and stored next to the sessions if None.",
+        frozen=True,
+        validate_default=True,
+        strict=True,
+        init=False,
+        repr=False,
+    )
+    max_age_in_seconds: float = Field(
+        default=1800.0,
+        description="Never reuse sessions older than this, the bank expires them anyway.",
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+
+
+class BalanceStoreSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="balance_store_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+    enabled: bool = Field(
+        default=True,
+        description="Record every fetched balance in a local SQLite database.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    path: str = Field(
+        default=".cache/balances.sqlite3",
+        frozen=True,
+        validate_default=True,
+        strict=True,
+        init=False,
+    )
+    compaction_age_in_seconds: float = Field(
+        default=7 * 24 * 3600.0,
+        description="Snapshots older than this are thinned out by compaction.",
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+    compaction_interval_in_seconds: float = Field(
+        default=3600.0,
+        description="Compaction keeps the latest snapshot of each account per interval.",
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+
+
+class HttpClientSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="http_client_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+    max_connections: int = Field(
+        default=10,
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+    max_keepalive_connections: int = Field(
+        default=5,
+        description="Idle connections kept open for the next requests to the same host.",
+        frozen=True,
+        validate_default=True,
+        ge=0,
+        init=False,
+    )
+    timeout_in_seconds: float = Field(
+        default=10.0,
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+
+
+class BrowserSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="browser_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+    headless: bool = Field(
+        default=True,
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    disable_gpu: bool = Field(
+        default=True,
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    disable_extensions: bool = Field(
+        default=True,
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    window_size: str = Field(
+        default="1280,900",
+        description="Window size as 'width,height', the bank's layout changes on small screens.",
+        frozen=True,
+        validate_default=True,
+        strict=True,
+        init=False,
+    )
+    page_load_strategy: Literal["normal", "eager", "none"] = Field(
+        default="eager",
+        description="'eager' returns from navigations once the DOM is ready, without waiting for images.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    block_images: bool = Field(
+        default=True,
+        description="Do not load images. The keypad digits are read from their CSS and still work.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    blocked_url_patterns: list[str] = Field(
+        default_factory=lambda: [
+            "*.woff",
+            "*.woff2",
+            "*.ttf",
+            "*.otf",
+            "*.mp4",
+            "*.webm",
+            "*google-analytics.com*",
+            "*googletagmanager.com*",
+            "*doubleclick.net*",
+            "*facebook.net*",
+            "*hotjar.com*",
+            "*contentsquare.net*",
+            "*tagcommander.com*",
+            "*commander1.com*",
+        ],
+        description="URL patterns blocked through the DevTools protocol, '*' matches anything.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    collect_page_stats: bool = Field(
+        default=True,
+        description="Log the bytes, timings and JS heap of every page after navigating.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    extra_arguments: list[str] = Field(
+        default_factory=list,
+        description="Additional Chrome command line arguments, e.g. '--no-sandbox' in containers.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+
+
+class MetricsSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="metrics_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+    trace_path: str | None = Field(
+        default=None,
+        description="JSON trace file of the timed phases, written on exit (chrome://tracing, Perfetto).",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    prometheus_path: str | None = Field(
+        default=None,
+        description="File where the metrics are dumped as Prometheus text on exit.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
+    histogram_buckets: list[float] = Field(
+        default_factory=lambda: [
+            0.01,
+            0.05,
+            0.1,
+            0.25,
+            0.5,
+            1.0,
+            2.5,
+            5.0,
+            10.0,
+            30.0,
+            60.0,
+            120.0,
+        ],
+        description="Upper bounds of the duration histograms, in seconds.",
+        frozen=True,
+        validate_default=True,
+        init=False,
+    )
 
 
 class LoggingSettings(BaseSettings):
@@ -106,6 +797,23 @@ class LoggingSettings(BaseSettings):
     )
 
 
+class TransactionExportSettings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_prefix="transaction_export_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+    batch_size: int = Field(
+        default=1000,
+        description="Transactions written to the sink at once, the most held in memory.",
+        frozen=True,
+        validate_default=True,
+        gt=0,
+        init=False,
+    )
+
+
 # class ApplicationSettings(BaseSettings):
 #     model_config = SettingsConfigDict(
 #         # env_file=".env",
@@ -1,24 +1,59 @@
+import pathlib
 import pytest
 import unittest.mock
 import selenium.webdriver
+from dependency_injector import providers
 
 from bank_automation.containers import ApplicationContainer
-from bank_automation.settings import CaisseDEpargneSettings
+from bank_automation.settings import (
+    BalanceStoreSettings,
+    CaisseDEpargneSettings,
+    DigitRecognitionSettings,
+    SessionStoreSettings,
+)
+
+from .fake_bank import FakeBankServer, FakeCustomer
 
 
 @pytest.fixture
-def application() -> ApplicationContainer:
+def application(tmp_path: pathlib.Path) -> ApplicationContainer:
     application = ApplicationContainer()
     application.wire(modules=[__name__])
     application.logging.container.init_resources()
 
-    mocked_ce_settings = unittest.mock.Mock(CaisseDEpargneSettings)
-    mocked_ce_settings.account_id = "mocked id"
-    mocked_ce_settings.account_password = "mocked password"
-    mocked_ce_settings.checking_account = "mocked checking account"
+    application.digit_recognition_settings.override(
+        DigitRecognitionSettings(
+            digit_recognition_cache_directory=str(tmp_path / "digit_recognition")
+        )
+    )
+
+    application.session_store_settings.override(
+        SessionStoreSettings(directory=str(tmp_path / "sessions"))
+    )
+
+    application.balance_store_settings.override(
+        BalanceStoreSettings(path=str(tmp_path / "balances.sqlite3"))
+    )
+
+    mocked_ce_settings = CaisseDEpargneSettings(
+        caisse_d_epargne_account_id="mocked id",
+        caisse_d_epargne_account_password="mocked password",
+        caisse_d_epargne_checking_account="mocked checking account",
+    )
     application.caisse_d_epargne_config.override(mocked_ce_settings)
 
     mocked_web_driver = unittest.mock.Mock(selenium.webdriver.Chrome)
     application.web_driver.override(mocked_web_driver)
+    application.web_driver_factory.override(
+        providers.Factory(unittest.mock.Mock, selenium.webdriver.Chrome)
+    )
 
     return application
+
+
+@pytest.fixture
+def fake_bank_server():
+    server = FakeBankServer(customers={"mocked id": FakeCustomer("123456")})
+    server.start()
+    yield server
+    server.stop()
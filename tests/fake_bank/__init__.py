@@ -0,0 +1,3 @@
+from .server import FakeBankServer, FakeCustomer, FakeLatencies
+
+__all__ = ["FakeBankServer", "FakeCustomer", "FakeLatencies"]
@@ -0,0 +1,325 @@
+import base64
+import dataclasses
+import datetime
+import http
+import http.cookies
+import http.server
+import json
+import pathlib
+import random
+import secrets
+import threading
+import time
+import urllib.parse
+
+PAGES_DIRECTORY = pathlib.Path(__file__).parent / "pages"
+IMAGES_DIRECTORY = pathlib.Path(__file__).parent.parent / "images"
+RESPONSES_DIRECTORY = pathlib.Path(__file__).parent.parent / "responses"
+
+CONSENT_PATH = "/banque-a-distance/acceder-compte/"
+LOGIN_PATH = "/se-connecter/sso"
+ACCOUNTS_PATH = "/espace-client/comptes"
+ACCOUNTS_API_PATH = "/bapi/contract/v2/augmentedSynthesisViews"
+TRANSACTIONS_API_PATH = "/bapi/operation/v2/operations"
+
+SESSION_COOKIE_NAME = "session_id"
+
+
+@dataclasses.dataclass(frozen=True)
+class FakeCustomer:
+    password: str
+    requires_mfa: bool = False
+
+
+@dataclasses.dataclass(frozen=True)
+class FakeLatencies:
+    """Delays of the fake site, to replay a slow network or a slow web app."""
+
+    page_in_seconds: float = 0.0
+    api_in_seconds: float = 0.0
+    render_in_seconds: float = 0.0
+    mfa_approval_in_seconds: float = 0.5
+
+
+@dataclasses.dataclass
+class _Keypad:
+    identifier: str
+    digits: list[int]
+    mfa_approval_time: float | None = None
+
+
+class FakeBankServer(http.server.ThreadingHTTPServer):
+    """Local stand-in for the bank's web site and JSON API.
+
+    Serves hand-written stand-ins for the consent, login (shuffled keypad of
+    base64 PNG buttons, optional MFA) and account pages, rendered client-side
+    like the single-page app, and canned JSON responses of the API. Neither is
+    a capture of the real site: they only follow the adapter's assumptions.
+    Every account has `transaction_count` generated transactions, served by
+    pages. Sessions ids listed in `session_ids` are authenticated, logging in
+    adds one.
+    """
+
+    def __init__(
+        self,
+        customers: dict[str, FakeCustomer] | None = None,
+        latencies: FakeLatencies = FakeLatencies(),
+        transaction_count: int = 250,
+    ) -> None:
+        super().__init__(("127.0.0.1", 0), _FakeBankRequestHandler)
+        self.customers = customers if customers is not None else {}
+        self.latencies = latencies
+        self.transaction_count = transaction_count
+        self.transaction_page_count = 0
+        self.session_ids = {"valid"}
+        self.keypads: dict[str, _Keypad] = {}
+        self.login_count = 0
+        self.request_count = 0
+        self.client_ports: set[int] = set()
+        self.lock = threading.Lock()
+
+        with open(RESPONSES_DIRECTORY / "augmented_synthesis_views.json", "rb") as file:
+            self.accounts_response = file.read()
+        self.digit_images = {
+            digit: (IMAGES_DIRECTORY / f"digit_{digit}.png").read_bytes()
+            for digit in range(10)
+        }
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _FakeBankRequestHandler(http.server.BaseHTTPRequestHandler):
+    # keep connections alive between requests
+    protocol_version = "HTTP/1.1"
+    server: FakeBankServer
+
+    def do_GET(self) -> None:
+        self._count_request()
+        path = urllib.parse.urlsplit(self.path).path
+
+        if path == CONSENT_PATH:
+            self._send_page("consent.html")
+        elif path == LOGIN_PATH:
+            self._send_page("sso.html")
+        elif path == ACCOUNTS_PATH:
+            if self._is_authenticated():
+                self._send_page("accounts.html", accounts_json=self._get_accounts())
+            else:
+                self._send_redirect(CONSENT_PATH)
+        elif path == ACCOUNTS_API_PATH:
+            time.sleep(self.server.latencies.api_in_seconds)
+            if self._is_authenticated():
+                self._send(http.HTTPStatus.OK, self.server.accounts_response)
+            else:
+                self._send_json(http.HTTPStatus.UNAUTHORIZED, {})
+        elif path == TRANSACTIONS_API_PATH:
+            time.sleep(self.server.latencies.api_in_seconds)
+            if self._is_authenticated():
+                self._send_transaction_page()
+            else:
+                self._send_json(http.HTTPStatus.UNAUTHORIZED, {})
+        else:
+            self._send_json(http.HTTPStatus.NOT_FOUND, {})
+
+    def do_POST(self) -> None:
+        self._count_request()
+        time.sleep(self.server.latencies.api_in_seconds)
+        length = int(self.headers.get("Content-Length", "0"))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        path = urllib.parse.urlsplit(self.path).path
+        if path == "/fake-api/keypad":
+            self._create_keypad(body["identifier"])
+        elif path == "/fake-api/login":
+            self._login(body["keypad_id"], body["positions"])
+        elif path == "/fake-api/mfa":
+            self._poll_mfa(body["keypad_id"])
+        else:
+            self._send_json(http.HTTPStatus.NOT_FOUND, {})
+
+    def _create_keypad(self, identifier: str) -> None:
+        digits = list(range(10))
+        random.shuffle(digits)
+        keypad_id = secrets.token_hex(8)
+        with self.server.lock:
+            self.server.keypads[keypad_id] = _Keypad(identifier, digits)
+
+        self._send_json(
+            http.HTTPStatus.OK,
+            {
+                "keypad_id": keypad_id,
+                "images": [
+                    base64.b64encode(self.server.digit_images[digit]).decode()
+                    for digit in digits
+                ],
+            },
+        )
+
+    def _login(self, keypad_id: str, positions: list[int]) -> None:
+        keypad = self.server.keypads.get(keypad_id)
+        customer = (
+            self.server.customers.get(keypad.identifier) if keypad is not None else None
+        )
+        if (
+            keypad is None
+            or customer is None
+            or customer.password
+            != "".join(str(keypad.digits[position]) for position in positions)
+        ):
+            self._send_json(http.HTTPStatus.OK, {"status": "invalid credentials"})
+            return
+
+        with self.server.lock:
+            self.server.login_count += 1
+        if customer.requires_mfa:
+            keypad.mfa_approval_time = (
+                time.time() + self.server.latencies.mfa_approval_in_seconds
+            )
+            self._send_json(
+                http.HTTPStatus.OK, {"status": "mfa", "next_url": ACCOUNTS_PATH}
+            )
+        else:
+            self._send_json(
+                http.HTTPStatus.OK,
+                {"status": "ok", "next_url": ACCOUNTS_PATH},
+                set_session=True,
+            )
+
+    def _poll_mfa(self, keypad_id: str) -> None:
+        keypad = self.server.keypads.get(keypad_id)
+        if keypad is None or keypad.mfa_approval_time is None:
+            self._send_json(http.HTTPStatus.NOT_FOUND, {})
+        elif time.time() < keypad.mfa_approval_time:
+            self._send_json(http.HTTPStatus.OK, {"status": "pending"})
+        else:
+            self._send_json(
+                http.HTTPStatus.OK, {"status": "approved"}, set_session=True
+            )
+
+    def _get_accounts(self) -> str:
+        items = json.loads(self.server.accounts_response)["items"]
+        return json.dumps(
+            [
+                {
+                    "label": item["identification"]["label"],
+                    "number": item["identification"]["accountNumber"],
+                    "balance_parts": _format_balance(item["balance"]["value"]),
+                }
+                for item in items
+            ]
+        )
+
+    def _send_transaction_page(self) -> None:
+        """Serve `pageSize` transactions from the offset given as page key."""
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        account_number = query["accountNumber"][0]
+        page_size = int(query["pageSize"][0])
+        start = int(query.get("pageKey", ["0"])[0])
+        end = min(start + page_size, self.server.transaction_count)
+        with self.server.lock:
+            self.server.transaction_page_count += 1
+
+        self._send_json(
+            http.HTTPStatus.OK,
+            {
+                "items": [
+                    create_transaction_item(account_number, index)
+                    for index in range(start, end)
+                ],
+                "nextPageKey": (
+                    str(end) if end < self.server.transaction_count else None
+                ),
+            },
+        )
+
+    def _is_authenticated(self) -> bool:
+        cookies = http.cookies.SimpleCookie(self.headers.get("Cookie", ""))
+        session = cookies.get(SESSION_COOKIE_NAME)
+        return session is not None and session.value in self.server.session_ids
+
+    def _count_request(self) -> None:
+        with self.server.lock:
+            self.server.request_count += 1
+            self.server.client_ports.add(self.client_address[1])
+
+    def _send_page(self, file_name: str, accounts_json: str = "[]") -> None:
+        time.sleep(self.server.latencies.page_in_seconds)
+        page = (
+            (PAGES_DIRECTORY / file_name)
+            .read_text()
+            .replace(
+                "{{render_latency_in_ms}}",
+                str(int(self.server.latencies.render_in_seconds * 1000)),
+            )
+            .replace("{{accounts_json}}", accounts_json)
+        )
+        self._send(http.HTTPStatus.OK, page.encode(), "text/html; charset=utf-8")
+
+    def _send_redirect(self, location: str) -> None:
+        self.send_response(http.HTTPStatus.FOUND)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send_json(
+        self, status: http.HTTPStatus, body: object, set_session: bool = False
+    ) -> None:
+        headers = {}
+        if set_session:
+            session_id = secrets.token_hex(16)
+            with self.server.lock:
+                self.server.session_ids.add(session_id)
+            headers["Set-Cookie"] = (
+                f"{SESSION_COOKIE_NAME}={session_id}; Path=/; HttpOnly"
+            )
+        self._send(status, json.dumps(body).encode(), headers=headers)
+
+    def _send(
+        self,
+        status: http.HTTPStatus,
+        body: bytes,
+        content_type: str = "application/json",
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def create_transaction_item(account_number: str, index: int) -> dict:
+    """Transaction of the API, newest first, a few per day."""
+    return {
+        "id": f"{account_number}-{index}",
+        "bookingDate": (
+            datetime.date(2026, 1, 1) - datetime.timedelta(days=index // 3)
+        ).isoformat(),
+        "label": f" CB SHOP {index} ",
+        "amount": {"value": ((index * 37) % 2000 - 1000) / 10, "currencyCode": "EUR"},
+    }
+
+
+def _format_balance(value: float) -> list[str]:
+    """Split a balance like the web app does, e.g. ["+ 1 234", ",56 €"]."""
+    sign = "-" if value < 0 else "+"
+    cents = round(abs(value) * 100)
+    whole = f"{cents // 100:,}".replace(",", " ")
+    return [f"{sign} {whole}", f",{cents % 100:02d} €"]
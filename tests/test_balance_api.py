@@ -0,0 +1,222 @@
+import asyncio
+import time
+
+import httpx
+
+from bank_automation import AccountBalance, Currency
+from bank_automation.containers import ApplicationContainer
+from bank_automation.infra.balance_store import BalanceSnapshot
+from bank_automation.services.banking_service import (
+    GetAccountBalanceResult,
+    ProfileBalanceResult,
+)
+from bank_automation.settings import (
+    BalanceApiSettings,
+    CaisseDEpargneProfile,
+    CaisseDEpargneSettings,
+)
+
+
+class FakeBankingService:
+    def __init__(self, delay_in_seconds: float = 0.1) -> None:
+        self.delay_in_seconds = delay_in_seconds
+        self.fetch_count = 0
+        self.error: Exception | None = None
+
+    async def stream_profile_balances(
+        self, profiles: list[CaisseDEpargneProfile], keep_adapters_open: bool = False
+    ):
+        for profile in profiles:
+            self.fetch_count += 1
+            await asyncio.sleep(self.delay_in_seconds)
+            if self.error is not None:
+                yield ProfileBalanceResult(
+                    profile_name=profile.name, balances=None, error=self.error
+                )
+            else:
+                yield ProfileBalanceResult(
+                    profile_name=profile.name,
+                    balances=GetAccountBalanceResult(
+                        accounts=[
+                            AccountBalance(
+                                account_id=f"{profile.name}-checking",
+                                balance=float(self.fetch_count),
+                                currency=Currency.EURO,
+                            )
+                        ]
+                    ),
+                )
+
+    async def close_adapters(self) -> None:
+        pass
+
+
+def _configure(application: ApplicationContainer, **settings) -> FakeBankingService:
+    application.caisse_d_epargne_config.override(
+        CaisseDEpargneSettings(
+            caisse_d_epargne_profiles=[
+                CaisseDEpargneProfile(
+                    name=name,
+                    account_id=name,
+                    account_password="0",
+                    checking_account=f"{name}-checking",
+                )
+                for name in ["alice", "bob"]
+            ],
+        )
+    )
+    application.balance_api_settings.override(BalanceApiSettings(port=0, **settings))
+    banking_service = FakeBankingService()
+    application.banking_service.override(banking_service)
+    return banking_service
+
+
+class TestBalanceApi:
+    @staticmethod
+    def test_burst_of_requests_fetches_once(application: ApplicationContainer):
+        banking_service = _configure(application)
+        server = application.balance_api_server()
+
+        async def run():
+            await server.start()
+            try:
+                async with httpx.AsyncClient(
+                    base_url=f"http://{server.get_address()}"
+                ) as client:
+                    return await asyncio.gather(
+                        *[client.get("/balances/alice") for _ in range(50)]
+                    )
+            finally:
+                await server.close()
+
+        responses = asyncio.run(run())
+
+        assert banking_service.fetch_count == 1
+        assert all(response.status_code == 200 for response in responses)
+        assert {
+            tuple(
+                (account["account_id"], account["balance"], account["currency"])
+                for account in response.json()["accounts"]
+            )
+            for response in responses
+        } == {(("alice-checking", 1.0, "€"),)}
+
+    @staticmethod
+    def test_stale_balances_are_served_while_revalidating(
+        application: ApplicationContainer,
+    ):
+        banking_service = _configure(
+            application, ttl_in_seconds=0.0, stale_ttl_in_seconds=60.0
+        )
+        query_service = application.balance_query_service()
+
+        async def run():
+            first = await query_service.get_balances("alice")
+            start = time.perf_counter()
+            stale = await query_service.get_balances("alice")
+            elapsed = time.perf_counter() - start
+            # let the background fetch complete
+            await asyncio.sleep(0.2)
+            revalidated = await query_service.get_balances("alice")
+            await query_service.close()
+            return first, stale, elapsed, revalidated
+
+        first, stale, elapsed, revalidated = asyncio.run(run())
+
+        assert first.balances.get("alice-checking").balance == 1.0
+        assert stale.balances.get("alice-checking").balance == 1.0
+        assert elapsed < banking_service.delay_in_seconds / 2
+        assert revalidated.balances.get("alice-checking").balance == 2.0
+
+    @staticmethod
+    def test_balances_are_read_from_the_balance_store(
+        application: ApplicationContainer,
+    ):
+        banking_service = _configure(application, ttl_in_seconds=60.0)
+        application.balance_store().append(
+            [
+                BalanceSnapshot(
+                    profile_name="bob", account_id="bob-checking", balance=42.0
+                )
+            ]
+        )
+        query_service = application.balance_query_service()
+
+        cached = asyncio.run(query_service.get_balances("bob"))
+
+        assert cached.balances.accounts == [
+            AccountBalance(account_id="bob-checking", balance=42.0, currency="€")
+        ]
+        assert banking_service.fetch_count == 0
+
+    @staticmethod
+    def test_incomplete_balance_store_is_not_used(
+        application: ApplicationContainer,
+    ):
+        banking_service = _configure(application, ttl_in_seconds=60.0)
+        application.balance_store().append(
+            [
+                BalanceSnapshot(
+                    profile_name="bob", account_id="bob-savings", balance=42.0
+                )
+            ]
+        )
+        query_service = application.balance_query_service()
+
+        cached = asyncio.run(query_service.get_balances("bob"))
+
+        assert [account.account_id for account in cached.balances.accounts] == [
+            "bob-checking"
+        ]
+        assert banking_service.fetch_count == 1
+
+    @staticmethod
+    def test_errors(application: ApplicationContainer):
+        banking_service = _configure(application)
+        banking_service.error = ValueError("login failed")
+        server = application.balance_api_server()
+
+        async def run():
+            await server.start()
+            try:
+                async with httpx.AsyncClient(
+                    base_url=f"http://{server.get_address()}"
+                ) as client:
+                    return [
+                        await client.get(path)
+                        for path in ["/balances/alice", "/balances/carol", "/nothing"]
+                    ] + [await client.get("/profiles")]
+            finally:
+                await server.close()
+
+        responses = asyncio.run(run())
+
+        assert [response.status_code for response in responses] == [
+            502,
+            404,
+            404,
+            200,
+        ]
+        assert responses[3].json() == ["alice", "bob"]
+
+    @staticmethod
+    def test_metrics(application: ApplicationContainer):
+        _configure(application)
+        application.metrics_registry().increment("requests_total")
+        server = application.balance_api_server()
+
+        async def run():
+            await server.start()
+            try:
+                async with httpx.AsyncClient(
+                    base_url=f"http://{server.get_address()}"
+                ) as client:
+                    return await client.get("/metrics")
+            finally:
+                await server.close()
+
+        response = asyncio.run(run())
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "requests_total 1" in response.text
@@ -0,0 +1,112 @@
+import pathlib
+import sqlite3
+import threading
+
+from bank_automation.infra.balance_store import BalanceSnapshot, BalanceStore
+from bank_automation.settings import BalanceStoreSettings
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+
+def _create_store(tmp_path: pathlib.Path) -> BalanceStore:
+    return BalanceStore(
+        BalanceStoreSettings(
+            path=str(tmp_path / "balances.sqlite3"),
+            compaction_age_in_seconds=DAY,
+            compaction_interval_in_seconds=HOUR,
+        )
+    )
+
+
+def _snapshot(account_id: str, timestamp: float, balance: float) -> BalanceSnapshot:
+    return BalanceSnapshot(
+        profile_name="alice",
+        account_id=account_id,
+        balance=balance,
+        timestamp=timestamp,
+    )
+
+
+class TestBalanceStore:
+    @staticmethod
+    def test_latest_and_range_queries(tmp_path: pathlib.Path):
+        store = _create_store(tmp_path)
+        store.append(
+            [
+                _snapshot("checking", 10.0, 1.0),
+                _snapshot("checking", 30.0, 3.0),
+                _snapshot("savings", 20.0, 100.0),
+            ]
+        )
+        store.append([_snapshot("checking", 20.0, 2.0)])
+
+        assert store.get_latest("alice", "checking") == _snapshot("checking", 30.0, 3.0)
+        assert store.get_latest("alice", "unknown") is None
+        assert store.get_latest_of_every_account("alice") == [
+            _snapshot("checking", 30.0, 3.0),
+            _snapshot("savings", 20.0, 100.0),
+        ]
+        assert store.get_range("alice", "checking", 10.0, 30.0) == [
+            _snapshot("checking", 10.0, 1.0),
+            _snapshot("checking", 20.0, 2.0),
+        ]
+        store.close()
+
+    @staticmethod
+    def test_uses_write_ahead_log(tmp_path: pathlib.Path):
+        store = _create_store(tmp_path)
+        store.append([_snapshot("checking", 10.0, 1.0)])
+
+        connection = sqlite3.connect(tmp_path / "balances.sqlite3")
+        assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        connection.close()
+        store.close()
+
+    @staticmethod
+    def test_compact_keeps_latest_snapshot_per_interval(tmp_path: pathlib.Path):
+        store = _create_store(tmp_path)
+        now = 10 * DAY
+        old_snapshots = [
+            _snapshot("checking", 2 * DAY + minutes * 60.0, minutes)
+            for minutes in range(0, 120, 15)
+        ]
+        recent_snapshots = [
+            _snapshot("checking", now - minutes * 60.0, minutes)
+            for minutes in range(0, 60, 15)
+        ]
+        store.append(old_snapshots + recent_snapshots)
+
+        deleted_count = store.compact(now=now)
+
+        assert deleted_count == len(old_snapshots) - 2
+        assert store.get_range("alice", "checking", 0.0, now - DAY) == [
+            old_snapshots[3],
+            old_snapshots[7],
+        ]
+        assert len(store.get_range("alice", "checking", now - DAY, now + 1)) == 4
+        store.close()
+
+    @staticmethod
+    def test_concurrent_appends(tmp_path: pathlib.Path):
+        store = _create_store(tmp_path)
+
+        def append(account_id: str):
+            for timestamp in range(50):
+                store.append([_snapshot(account_id, float(timestamp), 0.0)])
+
+        threads = [
+            threading.Thread(target=append, args=(f"account-{index}",))
+            for index in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(store.get_latest_of_every_account()) == 4
+        assert all(
+            len(store.get_range("alice", f"account-{index}", 0.0, 50.0)) == 50
+            for index in range(4)
+        )
+        store.close()
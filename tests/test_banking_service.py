@@ -0,0 +1,227 @@
+import asyncio
+
+from dependency_injector import providers
+
+from bank_automation import AccountBalance
+from bank_automation.containers import ApplicationContainer
+from bank_automation.services.banking_service import ProfileBalanceResult
+from bank_automation.settings import (
+    BankingSettings,
+    CaisseDEpargneAccount,
+    CaisseDEpargneProfile,
+    CaisseDEpargneSettings,
+)
+
+
+class FakeCaisseDEpargneAdapter:
+    active_count = 0
+    max_active_count = 0
+    closed_count = 0
+
+    def __init__(self, delays_in_seconds: dict[str, float]) -> None:
+        self.delays_in_seconds = delays_in_seconds
+
+    async def get_account_balances(self, profile: CaisseDEpargneProfile):
+        cls = FakeCaisseDEpargneAdapter
+        cls.active_count += 1
+        cls.max_active_count = max(cls.max_active_count, cls.active_count)
+        try:
+            await asyncio.sleep(self.delays_in_seconds[profile.name])
+            if profile.name.startswith("failing"):
+                raise ValueError("login failed")
+            return [
+                AccountBalance(
+                    account_id=account.id,
+                    balance=float(len(profile.name) + index),
+                    currency=account.currency,
+                )
+                for index, account in enumerate(profile.get_accounts())
+            ]
+        finally:
+            cls.active_count -= 1
+
+    async def aclose(self) -> None:
+        FakeCaisseDEpargneAdapter.closed_count += 1
+
+
+def _create_profiles(
+    names: list[str], savings_account_count: int = 0
+) -> list[CaisseDEpargneProfile]:
+    return [
+        CaisseDEpargneProfile(
+            name=name,
+            account_id=name,
+            account_password="0",
+            checking_account=name,
+            accounts=[
+                CaisseDEpargneAccount(id=f"{name}-savings-{index}")
+                for index in range(savings_account_count)
+            ],
+        )
+        for name in names
+    ]
+
+
+def _configure(
+    application: ApplicationContainer,
+    delays_in_seconds: dict[str, float],
+    max_concurrency: int = 2,
+    profile_timeout_in_seconds: float = 10.0,
+    savings_account_count: int = 0,
+) -> None:
+    FakeCaisseDEpargneAdapter.active_count = 0
+    FakeCaisseDEpargneAdapter.max_active_count = 0
+    FakeCaisseDEpargneAdapter.closed_count = 0
+
+    application.caisse_d_epargne_config.override(
+        CaisseDEpargneSettings(
+            caisse_d_epargne_profiles=_create_profiles(
+                list(delays_in_seconds), savings_account_count
+            ),
+            caisse_d_epargne_login_rate_limit_per_minute=60_000.0,
+        )
+    )
+    application.banking_settings.override(
+        BankingSettings(
+            max_concurrency=max_concurrency,
+            profile_timeout_in_seconds=profile_timeout_in_seconds,
+        )
+    )
+    application.caisse_d_epargne_adapter_factory.override(
+        providers.Factory(FakeCaisseDEpargneAdapter, delays_in_seconds)
+    )
+
+
+async def _collect(application: ApplicationContainer) -> list[ProfileBalanceResult]:
+    banking_service = application.banking_service()
+    return [result async for result in banking_service.stream_profile_balances()]
+
+
+async def _collect_profiles(
+    banking_service, profiles: list[CaisseDEpargneProfile]
+) -> list[ProfileBalanceResult]:
+    return [
+        result async for result in banking_service.stream_profile_balances(profiles)
+    ]
+
+
+class TestBankingService:
+    @staticmethod
+    def test_stream_profile_balances(application: ApplicationContainer):
+        _configure(
+            application,
+            {"slow": 0.2, "failing": 0.0, "fast": 0.05, "medium": 0.1},
+            max_concurrency=2,
+        )
+
+        results = asyncio.run(_collect(application))
+
+        assert [result.profile_name for result in results] == [
+            "failing",
+            "fast",
+            "medium",
+            "slow",
+        ]
+        assert isinstance(results[0].error, ValueError)
+        assert results[1].balances is not None
+        assert results[1].balances.get("fast").balance == 4.0
+        assert FakeCaisseDEpargneAdapter.max_active_count == 2
+        assert FakeCaisseDEpargneAdapter.closed_count == 4
+        stored_snapshots = application.balance_store().get_latest_of_every_account()
+        assert [
+            (snapshot.profile_name, snapshot.balance) for snapshot in stored_snapshots
+        ] == [("fast", 4.0), ("medium", 6.0), ("slow", 4.0)]
+
+    @staticmethod
+    def test_stalled_profile_does_not_block_others(application: ApplicationContainer):
+        _configure(
+            application,
+            {"stalled": 60.0, "fast": 0.0},
+            max_concurrency=2,
+            profile_timeout_in_seconds=0.2,
+        )
+
+        results = asyncio.run(_collect(application))
+
+        assert [result.profile_name for result in results] == ["fast", "stalled"]
+        assert isinstance(results[1].error, TimeoutError)
+
+    @staticmethod
+    def test_keep_adapters_open_between_fetches(application: ApplicationContainer):
+        _configure(application, {"fast": 0.0, "failing": 0.0})
+
+        async def run():
+            banking_service = application.banking_service()
+            for _ in range(3):
+                async for _ in banking_service.stream_profile_balances(
+                    keep_adapters_open=True
+                ):
+                    pass
+            # only the failing profile's adapters were closed
+            assert FakeCaisseDEpargneAdapter.closed_count == 3
+            await banking_service.close_adapters()
+
+        asyncio.run(run())
+
+        assert FakeCaisseDEpargneAdapter.closed_count == 4
+
+    @staticmethod
+    def test_every_account_of_a_profile_is_fetched_and_stored(
+        application: ApplicationContainer,
+    ):
+        _configure(application, {"alice": 0.0}, savings_account_count=2)
+
+        [result] = asyncio.run(_collect(application))
+
+        assert result.balances is not None
+        assert [
+            (account.account_id, account.balance)
+            for account in result.balances.accounts
+        ] == [("alice", 5.0), ("alice-savings-0", 6.0), ("alice-savings-1", 7.0)]
+        stored_snapshots = application.balance_store().get_latest_of_every_account()
+        assert [
+            (snapshot.account_id, snapshot.balance) for snapshot in stored_snapshots
+        ] == [("alice", 5.0), ("alice-savings-0", 6.0), ("alice-savings-1", 7.0)]
+
+    @staticmethod
+    def test_daemon_and_api_fetch_a_profile_once(application: ApplicationContainer):
+        _configure(application, {"alice": 0.1, "bob": 0.1}, max_concurrency=2)
+
+        async def run():
+            banking_service = application.banking_service()
+            daemon_refresh = asyncio.create_task(application.refresh_daemon().refresh())
+            await asyncio.sleep(0.01)
+            cached = await application.balance_query_service().get_balances("alice")
+            assert await daemon_refresh
+            # one adapter per profile, kept open for the next refresh
+            assert FakeCaisseDEpargneAdapter.closed_count == 0
+            assert len(banking_service._open_adapters) == 2
+            await banking_service.close_adapters()
+            return cached
+
+        cached = asyncio.run(run())
+
+        assert cached.balances.get("alice").balance == 5.0
+        assert FakeCaisseDEpargneAdapter.max_active_count == 2
+        assert FakeCaisseDEpargneAdapter.closed_count == 2
+
+    @staticmethod
+    def test_concurrent_streams_share_the_concurrency_limit(
+        application: ApplicationContainer,
+    ):
+        _configure(
+            application, {"alice": 0.1, "bob": 0.1, "carol": 0.1}, max_concurrency=1
+        )
+
+        async def run():
+            banking_service = application.banking_service()
+            await asyncio.gather(
+                *[
+                    _collect_profiles(banking_service, [profile])
+                    for profile in application.caisse_d_epargne_config().get_profiles()
+                ]
+            )
+
+        asyncio.run(run())
+
+        assert FakeCaisseDEpargneAdapter.max_active_count == 1
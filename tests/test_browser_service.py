@@ -0,0 +1,235 @@
+import asyncio
+import threading
+import time
+import unittest.mock
+
+import pytest
+import selenium.webdriver
+from selenium.common.exceptions import JavascriptException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+
+from bank_automation.errors.browser_errors import WaitTimeoutError
+from bank_automation.infra.browser_service import (
+    PAGE_STATS_HISTORY_SIZE,
+    WAIT_ATTEMPTS_METRIC,
+    WEBDRIVER_CALLS_METRIC,
+    BrowserService,
+    ExtractionField,
+    PageStats,
+)
+from bank_automation.settings import BrowserSettings
+
+
+def _create_browser_service(
+    config: BrowserSettings | None = None,
+) -> BrowserService:
+    web_driver = unittest.mock.Mock(selenium.webdriver.Chrome)
+    web_driver.get.side_effect = lambda url: time.sleep(0.2)
+    if config is None:
+        config = BrowserSettings(collect_page_stats=False)
+    return BrowserService(web_driver=web_driver, config=config)
+
+
+class TestBrowserService:
+    @staticmethod
+    def test_driver_calls_do_not_block_the_event_loop():
+        browser_service = _create_browser_service()
+        released = threading.Event()
+        calls: list[tuple[str, str]] = []
+
+        def get(url: str) -> None:
+            calls.append((threading.current_thread().name, url))
+            # only released if the event loop keeps running meanwhile
+            assert released.wait(timeout=5)
+
+        browser_service.web_driver.get.side_effect = get
+
+        async def release():
+            released.set()
+
+        async def run():
+            await asyncio.gather(
+                browser_service.get("https://example.com/1"),
+                browser_service.get("https://example.com/2"),
+                release(),
+            )
+
+        asyncio.run(run())
+        browser_service.close()
+
+        # in order, on the session's own thread
+        assert [url for _, url in calls] == [
+            "https://example.com/1",
+            "https://example.com/2",
+        ]
+        [thread_name] = {thread_name for thread_name, _ in calls}
+        assert thread_name.startswith(BrowserService.__name__)
+
+    @staticmethod
+    def test_sessions_make_progress_concurrently():
+        browser_services = [_create_browser_service() for _ in range(3)]
+        # every session's call must be running for any of them to return
+        barrier = threading.Barrier(len(browser_services), timeout=5)
+        for browser_service in browser_services:
+            browser_service.web_driver.get.side_effect = lambda url: barrier.wait()
+
+        async def run():
+            await asyncio.gather(
+                *[service.get("https://example.com") for service in browser_services]
+            )
+
+        asyncio.run(run())
+        for browser_service in browser_services:
+            browser_service.close()
+
+    @staticmethod
+    def test_wait_for_elements_resolves_from_the_page():
+        browser_service = _create_browser_service()
+        element = unittest.mock.Mock(WebElement)
+        browser_service.web_driver.execute_async_script.return_value = [0, [element]]
+
+        elements = asyncio.run(
+            browser_service.wait_for_elements(by=By.CSS_SELECTOR, value="div")
+        )
+        browser_service.close()
+
+        assert elements == [element]
+        assert browser_service.web_driver.execute_async_script.call_count == 1
+
+    @staticmethod
+    def test_wait_survives_navigation_and_times_out():
+        browser_service = _create_browser_service()
+        browser_service.web_driver.execute_async_script.side_effect = [
+            JavascriptException("document unloaded while waiting for result"),
+            None,
+        ]
+
+        with pytest.raises(WaitTimeoutError):
+            asyncio.run(
+                browser_service.wait_for_element_to_disappear(
+                    by=By.ID, value="dialog", timeout_in_seconds=1.0
+                )
+            )
+        browser_service.close()
+
+        assert browser_service.web_driver.execute_async_script.call_count == 2
+        registry = browser_service.tracer.registry
+        assert (
+            registry.get_counter_value(WAIT_ATTEMPTS_METRIC, {"outcome": "interrupted"})
+            == 1
+        )
+        assert (
+            registry.get_counter_value(WAIT_ATTEMPTS_METRIC, {"outcome": "timeout"})
+            == 1
+        )
+        assert (
+            registry.get_counter_value(
+                WEBDRIVER_CALLS_METRIC, {"method": "_execute_wait_script"}
+            )
+            == 2
+        )
+
+    @staticmethod
+    def test_wait_raises_script_errors():
+        browser_service = _create_browser_service()
+        browser_service.web_driver.execute_async_script.side_effect = (
+            JavascriptException("javascript error: locators is not iterable")
+        )
+
+        with pytest.raises(JavascriptException):
+            asyncio.run(
+                browser_service.wait_for_element_to_disappear(
+                    by=By.ID, value="dialog", timeout_in_seconds=1.0
+                )
+            )
+        browser_service.close()
+
+        assert browser_service.web_driver.execute_async_script.call_count == 1
+
+    @staticmethod
+    def test_extract_all_reads_every_root_in_one_script():
+        browser_service = _create_browser_service()
+        rows = [
+            {"label": "first", "values": ["1", "2"]},
+            {"label": None, "values": []},
+        ]
+        browser_service.web_driver.execute_script.return_value = rows
+
+        result = asyncio.run(
+            browser_service.extract_all(
+                root_selector="tr",
+                fields={
+                    "label": ExtractionField(selector="th"),
+                    "values": ExtractionField(selector="td", multiple=True),
+                },
+            )
+        )
+        browser_service.close()
+
+        assert result == rows
+        assert browser_service.web_driver.execute_script.call_count == 1
+        _, root_selector, fields = (
+            browser_service.web_driver.execute_script.call_args.args
+        )
+        assert root_selector == "tr"
+        assert fields == {
+            "label": {"selector": "th", "multiple": False},
+            "values": {"selector": "td", "multiple": True},
+        }
+
+    @staticmethod
+    def test_get_collects_page_stats():
+        browser_service = _create_browser_service(
+            BrowserSettings(collect_page_stats=True)
+        )
+        browser_service.web_driver.execute_script.return_value = {
+            "url": "https://example.com/",
+            "request_count": 3,
+            "transferred_bytes": 4096,
+            "decoded_bytes": 8192,
+            "dom_content_loaded_in_ms": 120.5,
+            "load_in_ms": None,
+            "js_heap_used_bytes": 1_000_000,
+        }
+
+        asyncio.run(browser_service.get("https://example.com"))
+        browser_service.close()
+
+        assert list(browser_service.page_stats) == [
+            PageStats(
+                url="https://example.com/",
+                request_count=3,
+                transferred_bytes=4096,
+                decoded_bytes=8192,
+                dom_content_loaded_in_ms=120.5,
+                load_in_ms=None,
+                js_heap_used_bytes=1_000_000,
+            )
+        ]
+
+    @staticmethod
+    def test_page_stats_keep_the_last_pages():
+        browser_service = _create_browser_service(
+            BrowserSettings(collect_page_stats=True)
+        )
+        browser_service.web_driver.get.side_effect = None
+        browser_service.web_driver.execute_script.side_effect = lambda script: {
+            "url": f"https://example.com/{browser_service.web_driver.get.call_count}",
+            "request_count": 1,
+            "transferred_bytes": 0,
+            "decoded_bytes": 0,
+            "dom_content_loaded_in_ms": None,
+            "load_in_ms": None,
+            "js_heap_used_bytes": None,
+        }
+
+        async def load_pages():
+            for _ in range(PAGE_STATS_HISTORY_SIZE + 1):
+                await browser_service.get("https://example.com")
+
+        asyncio.run(load_pages())
+        browser_service.close()
+
+        assert len(browser_service.page_stats) == PAGE_STATS_HISTORY_SIZE
+        assert browser_service.page_stats[0].url == "https://example.com/2"
@@ -1,4 +1,37 @@
+import asyncio
+import datetime
+import unittest.mock
+
+from selenium.common.exceptions import WebDriverException
+
+from bank_automation import AccountBalance, Currency, Transaction
+from bank_automation.adapters.caisse_d_epargne_adapter import (
+    CaisseDEpargneGetAccountBalanceAccountOptions,
+)
 from bank_automation.containers import ApplicationContainer
+from bank_automation.infra.session_store import BrowserSession
+from bank_automation.settings import CaisseDEpargneProfile, CaisseDEpargneSettings
+
+from .fake_bank import FakeBankServer
+
+VALID_COOKIES = [
+    {"name": "session_id", "value": "valid", "domain": "127.0.0.1", "path": "/"}
+]
+
+
+def _use_http_data_mode(
+    application: ApplicationContainer, server: FakeBankServer, **settings
+) -> None:
+    application.caisse_d_epargne_config.override(
+        CaisseDEpargneSettings(
+            caisse_d_epargne_account_id="mocked id",
+            caisse_d_epargne_account_password="mocked password",
+            caisse_d_epargne_checking_account="04123456789",
+            caisse_d_epargne_data_mode="http",
+            caisse_d_epargne_api_base_url=server.base_url,
+            **settings,
+        )
+    )
 
 
 class TestCaisseDEpargneAdapter:
@@ -18,3 +51,216 @@ class TestCaisseDEpargneAdapter:
             == -123.45
         )
         assert adapter._get_balance_from_raw_parts(["+123", ",45 €"]) == 123.45
+
+    @staticmethod
+    def test_get_account_balances_from_tiles(application: ApplicationContainer):
+        adapter = application.caisse_d_epargne_adapter()
+        accounts = {
+            "123": CaisseDEpargneGetAccountBalanceAccountOptions(
+                currency=Currency.EURO
+            ),
+            "456": CaisseDEpargneGetAccountBalanceAccountOptions(
+                currency=Currency.EURO
+            ),
+        }
+        account_tiles = [
+            {"id": " 123 ", "balance_parts": ["+ 1 234", ",56 €"]},
+            {"id": "789", "balance_parts": ["+ 1", ",00 €"]},
+            {"id": None, "balance_parts": []},
+            {"id": "456", "balance_parts": ["- 7", ",89 €"]},
+        ]
+
+        assert adapter._get_account_balances_from_tiles(accounts, account_tiles) == {
+            "123": AccountBalance(account_id="123", balance=1234.56, currency="€"),
+            "456": AccountBalance(account_id="456", balance=-7.89, currency="€"),
+        }
+
+    @staticmethod
+    def test_get_every_account_balance_from_tiles(application: ApplicationContainer):
+        adapter = application.caisse_d_epargne_adapter()
+        account_tiles = [
+            {"id": " 123 ", "balance_parts": ["+ 1 234", ",56 €"]},
+            {"id": "789", "balance_parts": ["+ 1", ",00 $"]},
+            {"id": None, "balance_parts": []},
+            {"id": "456", "balance_parts": ["- 7", ",89 €"]},
+        ]
+
+        assert adapter._get_account_balances_from_tiles(None, account_tiles) == {
+            "123": AccountBalance(account_id="123", balance=1234.56, currency="€"),
+            "456": AccountBalance(account_id="456", balance=-7.89, currency="€"),
+        }
+
+    @staticmethod
+    def test_http_mode_reuses_saved_session_without_browser(
+        application: ApplicationContainer, fake_bank_server: FakeBankServer
+    ):
+        _use_http_data_mode(application, fake_bank_server)
+        application.session_store().save(
+            "default",
+            BrowserSession(url="", cookies=VALID_COOKIES, local_storage={}),
+        )
+        create_browser_service = unittest.mock.Mock()
+        application.browser_service_factory.override(create_browser_service)
+        adapter = application.caisse_d_epargne_adapter_factory()
+
+        async def run():
+            try:
+                return await adapter.get_checking_account_balance()
+            finally:
+                await adapter.aclose()
+
+        assert asyncio.run(run()) == 1234.56
+        create_browser_service.assert_not_called()
+
+    @staticmethod
+    def test_http_mode_logs_in_when_saved_session_is_rejected(
+        application: ApplicationContainer, fake_bank_server: FakeBankServer
+    ):
+        _use_http_data_mode(application, fake_bank_server)
+        session_store = application.session_store()
+        session_store.save(
+            "default",
+            BrowserSession(
+                url="",
+                cookies=[{**VALID_COOKIES[0], "value": "expired"}],
+                local_storage={},
+            ),
+        )
+        browser_service = unittest.mock.Mock()
+        browser_service.get_all_cookies = unittest.mock.AsyncMock(
+            return_value=VALID_COOKIES
+        )
+        application.browser_service_factory.override(browser_service)
+        adapter = application.caisse_d_epargne_adapter_factory()
+        adapter._login_and_save_session = unittest.mock.AsyncMock()
+
+        async def run():
+            try:
+                return await adapter.get_account_balance(
+                    {
+                        "04123456789": CaisseDEpargneGetAccountBalanceAccountOptions(
+                            currency=Currency.EURO
+                        ),
+                        "04987654321": CaisseDEpargneGetAccountBalanceAccountOptions(
+                            currency=Currency.EURO
+                        ),
+                    }
+                )
+            finally:
+                await adapter.aclose()
+
+        assert asyncio.run(run()) == {"04123456789": 1234.56, "04987654321": -42.1}
+        adapter._login_and_save_session.assert_awaited_once()
+        assert session_store.load("default") is None
+
+    @staticmethod
+    def test_restore_session_drops_a_session_the_browser_fails_on(
+        application: ApplicationContainer,
+    ):
+        session_store = application.session_store()
+        session_store.save(
+            "default",
+            BrowserSession(
+                url="https://127.0.0.1/", cookies=VALID_COOKIES, local_storage={}
+            ),
+        )
+        browser_service = unittest.mock.AsyncMock()
+        browser_service.get.side_effect = WebDriverException("net::ERR_ABORTED")
+        adapter = application.caisse_d_epargne_adapter_factory()
+        adapter._browser_service = browser_service
+
+        profile = application.caisse_d_epargne_config().get_default_profile()
+        assert not asyncio.run(adapter._restore_session(profile))
+        assert session_store.load("default") is None
+        browser_service.remove_injected_script.assert_awaited_once()
+
+    @staticmethod
+    def test_get_account_balances_of_every_account(
+        application: ApplicationContainer, fake_bank_server: FakeBankServer
+    ):
+        _use_http_data_mode(application, fake_bank_server)
+        application.session_store().save(
+            "default",
+            BrowserSession(url="", cookies=VALID_COOKIES, local_storage={}),
+        )
+        adapter = application.caisse_d_epargne_adapter_factory()
+        profile = CaisseDEpargneProfile(
+            account_id="mocked id",
+            account_password="mocked password",
+            checking_account="04987654321",
+            all_accounts=True,
+        )
+
+        async def run():
+            try:
+                return await adapter.get_account_balances(profile)
+            finally:
+                await adapter.aclose()
+
+        assert asyncio.run(run()) == [
+            AccountBalance(account_id="04987654321", balance=-42.1, currency="€"),
+            AccountBalance(account_id="04123456789", balance=1234.56, currency="€"),
+        ]
+
+    @staticmethod
+    def test_stream_transactions_reads_every_page(
+        application: ApplicationContainer, fake_bank_server: FakeBankServer
+    ):
+        _use_http_data_mode(
+            application, fake_bank_server, caisse_d_epargne_transactions_page_size=100
+        )
+        application.session_store().save(
+            "default",
+            BrowserSession(url="", cookies=VALID_COOKIES, local_storage={}),
+        )
+        adapter = application.caisse_d_epargne_adapter_factory()
+
+        async def run():
+            try:
+                return [
+                    transaction
+                    async for transaction in adapter.stream_transactions("04123456789")
+                ]
+            finally:
+                await adapter.aclose()
+
+        transactions = asyncio.run(run())
+
+        assert len(transactions) == fake_bank_server.transaction_count == 250
+        assert fake_bank_server.transaction_page_count == 3
+        assert transactions[0] == Transaction(
+            account_id="04123456789",
+            transaction_id="04123456789-0",
+            date=datetime.date(2026, 1, 1),
+            label="CB SHOP 0",
+            amount=-100.0,
+            currency="€",
+        )
+        assert len({transaction.transaction_id for transaction in transactions}) == 250
+
+    @staticmethod
+    def test_stream_transactions_stops_prefetching_when_closed(
+        application: ApplicationContainer, fake_bank_server: FakeBankServer
+    ):
+        _use_http_data_mode(
+            application, fake_bank_server, caisse_d_epargne_transactions_page_size=10
+        )
+        application.session_store().save(
+            "default",
+            BrowserSession(url="", cookies=VALID_COOKIES, local_storage={}),
+        )
+        adapter = application.caisse_d_epargne_adapter_factory()
+
+        async def run():
+            transactions = adapter.stream_transactions("04123456789")
+            try:
+                return await anext(transactions)
+            finally:
+                await transactions.aclose()
+                await adapter.aclose()
+
+        first_transaction = asyncio.run(run())
+
+        assert first_transaction.transaction_id == "04123456789-0"
+        # the first page, and at most the prefetched second one
+        assert fake_bank_server.transaction_page_count <= 2
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import subprocess
+import sys
+import unittest.mock
+
+from dependency_injector import providers
+
+from bank_automation.containers import ApplicationContainer, create_chrome_options
+from bank_automation.settings import BrowserSettings
+
+HEAVY_MODULES = [
+    "easyocr",
+    "torch",
+    "numpy",
+    "selenium.webdriver",
+    "bank_automation.adapters.caisse_d_epargne_adapter",
+    "bank_automation.infra.browser_service",
+]
+
+# run in a fresh interpreter, modules imported by previous tests would
+# otherwise be cached, its import time is benchmarked in benchmarks/
+_LIST_IMPORTED_MODULES_SCRIPT = """
+import json, sys
+import bank_automation.containers
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+class TestApplicationContainer:
+    @staticmethod
+    def test_import_is_lazy():
+        completed = subprocess.run(
+            [sys.executable, "-c", _LIST_IMPORTED_MODULES_SCRIPT],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        imported_modules = json.loads(completed.stdout)
+
+        for module in HEAVY_MODULES:
+            assert module not in imported_modules
+
+    @staticmethod
+    def test_resolving_template_engine_does_not_import_easyocr(
+        application: ApplicationContainer,
+    ):
+        create_reader = unittest.mock.Mock()
+        application.digit_recognition_reader.override(providers.Callable(create_reader))
+
+        application.digit_recognition_service()
+
+        create_reader.assert_not_called()
+
+    @staticmethod
+    def test_warm_up_of_template_engine_does_not_load_easyocr(
+        application: ApplicationContainer,
+    ):
+        create_reader = unittest.mock.Mock()
+        application.digit_recognition_reader.override(providers.Callable(create_reader))
+
+        asyncio.run(application.digit_recognition_warm_up().wait_until_ready())
+
+        create_reader.assert_not_called()
+
+    @staticmethod
+    def test_chrome_options_are_lean():
+        options = create_chrome_options(BrowserSettings())
+
+        assert "--headless=new" in options.arguments
+        assert "--disable-gpu" in options.arguments
+        assert "--disable-extensions" in options.arguments
+        assert options.page_load_strategy == "eager"
+        assert options.experimental_options["prefs"] == {
+            "profile.managed_default_content_settings.images": 2
+        }
@@ -0,0 +1,53 @@
+import pathlib
+
+from bank_automation.infra.digit_recognition_cache import DigitRecognitionCache
+from bank_automation.settings import DigitRecognitionSettings
+
+
+def _create_cache(
+    tmp_path: pathlib.Path, memory_max_entries: int = 256, disk_max_entries: int = 4096
+) -> DigitRecognitionCache:
+    return DigitRecognitionCache(
+        DigitRecognitionSettings(
+            digit_recognition_cache_directory=str(tmp_path / "cache"),
+            digit_recognition_cache_memory_max_entries=memory_max_entries,
+            digit_recognition_cache_disk_max_entries=disk_max_entries,
+        )
+    )
+
+
+class TestDigitRecognitionCache:
+    @staticmethod
+    def test_counts_hits_and_misses(tmp_path: pathlib.Path):
+        cache = _create_cache(tmp_path)
+        key = cache.key_for(b"image")
+
+        assert cache.get(key) is None
+        cache.set(key, 7)
+        assert cache.get(key) == 7
+
+        stats = cache.stats()
+        assert stats.hit_count == 1
+        assert stats.miss_count == 1
+
+    @staticmethod
+    def test_survives_restart(tmp_path: pathlib.Path):
+        key = DigitRecognitionCache.key_for(b"image")
+        _create_cache(tmp_path).set(key, 3)
+
+        restarted_cache = _create_cache(tmp_path)
+        assert restarted_cache.stats().disk_entry_count == 1
+        assert restarted_cache.get(key) == 3
+
+    @staticmethod
+    def test_evicts_least_recently_used_entries(tmp_path: pathlib.Path):
+        cache = _create_cache(tmp_path, memory_max_entries=2, disk_max_entries=2)
+        keys = [cache.key_for(bytes([index])) for index in range(3)]
+        for index, key in enumerate(keys):
+            cache.set(key, index)
+
+        stats = cache.stats()
+        assert stats.memory_entry_count == 2
+        assert stats.disk_entry_count == 2
+        assert _create_cache(tmp_path).get(keys[0]) is None
+        assert _create_cache(tmp_path).get(keys[2]) == 2
@@ -1,34 +1,144 @@
 import base64
 import logging
 import os
+import unittest.mock
+
+import pytest
+from dependency_injector import providers
 
 from bank_automation.containers import ApplicationContainer
+from bank_automation.settings import DigitRecognitionSettings
 
 module_logger = logging.getLogger("TestDigitRecognitionService")
 
 
+class FakeEasyOcrReader:
+    """Answer `easyocr.Reader.recognize` with the given text for each region."""
+
+    def __init__(self, texts: list[str]) -> None:
+        self.texts = texts
+        self.call_count = 0
+
+    def recognize(self, image, horizontal_list, free_list, **kwargs):
+        self.call_count += 1
+        return [
+            (
+                [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]],
+                text,
+                0.9,
+            )
+            for (x_min, x_max, y_min, y_max), text in zip(horizontal_list, self.texts)
+        ]
+
+
 class TestDigitRecognitionService:
     def test_recognize_image_from_base64(
         self,
         application: ApplicationContainer,
+        tmp_path,
     ):
+        pytest.importorskip("easyocr")
+        application.digit_recognition_settings.override(
+            DigitRecognitionSettings(
+                digit_recognition_engine="easyocr",
+                digit_recognition_cache_directory=str(tmp_path / "cache"),
+            )
+        )
         recognizer = application.digit_recognition_service()
 
+        base64_images = self._get_base64_images()
+
+        for index, base64_image in enumerate(base64_images):
+            expected_digit = index
+            digit = recognizer.recognize_digit_from_base64(base64_image)
+
+            assert digit == expected_digit
+
+    def test_recognize_image_from_base64_with_template_engine(
+        self,
+        application: ApplicationContainer,
+    ):
+        recognizer = application.digit_recognition_service()
+
+        for digit, base64_image in enumerate(self._get_base64_images()):
+            assert recognizer.recognize_digit_from_base64(base64_image) == digit
+
+    def test_recognize_variant_from_base64_with_template_engine(
+        self,
+        application: ApplicationContainer,
+    ):
+        recognizer = application.digit_recognition_service()
+
+        # unlike the keypad captures, these differ from the bundled glyphs
         base64_images = [
             self._convert_file_to_base64(
                 os.path.join(
-                    os.path.join(os.path.dirname(__file__), "images"),
-                    f"digit_{digit}.png",
+                    os.path.dirname(__file__),
+                    "images",
+                    "variants",
+                    f"digit_{digit}_scaled_blurred.png",
                 )
             )
             for digit in range(10)
         ]
 
-        for index, base64_image in enumerate(base64_images):
-            expected_digit = index
-            digit = recognizer.recognize_digit_from_base64(base64_image)
+        for digit, base64_image in enumerate(base64_images):
+            assert recognizer.recognize_digit_from_base64(base64_image) == digit
 
-            assert digit == expected_digit
+    def test_recognize_digits_from_base64_batch(
+        self,
+        application: ApplicationContainer,
+    ):
+        recognizer = application.digit_recognition_service()
+        base64_images = self._get_base64_images()
+
+        engine = unittest.mock.Mock(wraps=recognizer.engine)
+        recognizer.engine = engine
+
+        assert recognizer.recognize_digits_from_base64_batch(base64_images) == list(
+            range(10)
+        )
+        assert engine.recognize_batch.call_count == 1
+
+        # every image is cached once recognized
+        assert recognizer.recognize_digits_from_base64_batch(base64_images) == list(
+            range(10)
+        )
+        assert engine.recognize_batch.call_count == 1
+
+    def test_recognize_with_easyocr_engine(
+        self,
+        application: ApplicationContainer,
+        tmp_path,
+    ):
+        application.digit_recognition_settings.override(
+            DigitRecognitionSettings(
+                digit_recognition_engine="easyocr",
+                digit_recognition_cache_directory=str(tmp_path / "cache"),
+                # the fake reader only answers `recognize`
+                digit_recognition_easyocr_skip_detection=True,
+            )
+        )
+        reader = FakeEasyOcrReader(texts=["7", "3", "0"])
+        application.digit_recognition_reader.override(providers.Object(reader))
+        recognizer = application.digit_recognition_service()
+        base64_images = [self._get_base64_images()[digit] for digit in (7, 3, 0)]
+
+        assert recognizer.recognize_digits_from_base64_batch(base64_images) == [7, 3, 0]
+        assert recognizer.recognize_digits_from_base64_batch(base64_images) == [7, 3, 0]
+        # one recognizer call for the whole batch, then the cache answers
+        assert reader.call_count == 1
+
+    def _get_base64_images(self) -> list[str]:
+        return [
+            self._convert_file_to_base64(
+                os.path.join(
+                    os.path.join(os.path.dirname(__file__), "images"),
+                    f"digit_{digit}.png",
+                )
+            )
+            for digit in range(10)
+        ]
 
     def _convert_file_to_base64(self, file_path: str) -> str:
         logger = module_logger.getChild(self._convert_file_to_base64.__name__)
@@ -40,3 +150,22 @@ class TestDigitRecognitionService:
 
             base64_bytes = base64.b64encode(file_content)
             return base64_bytes.decode(encoding="ascii")
+
+    def test_truncation_neither_copies_nor_logs_the_image(
+        self,
+        application: ApplicationContainer,
+        caplog,
+    ):
+        recognizer = application.digit_recognition_service()
+        image_bytes = base64.b64decode(self._get_base64_images()[3]) + b"\x00" * 64
+
+        with caplog.at_level(logging.DEBUG):
+            png_view = recognizer._remove_bytes_after_iend_chunk(image_bytes)
+
+        assert png_view.obj is image_bytes
+        # the test images already carry bytes after their IEND chunk
+        assert png_view[-len(recognizer.config.iend_chunk) :] == (
+            recognizer.config.iend_chunk
+        )
+        assert len(png_view) < len(image_bytes) - 64
+        assert all("PNG" not in record.getMessage() for record in caplog.records)
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import unittest.mock
+
+import pytest
+
+from bank_automation.services.digit_recognition_service import DigitRecognitionService
+from bank_automation.services.digit_recognition_warm_up import DigitRecognitionWarmUp
+from bank_automation.settings import DigitRecognitionSettings
+
+
+class TestDigitRecognitionWarmUp:
+    @staticmethod
+    def test_creates_and_warms_up_service_in_background():
+        service = unittest.mock.Mock(DigitRecognitionService)
+        creation_threads: list[threading.Thread] = []
+
+        def create_service():
+            creation_threads.append(threading.current_thread())
+            return service
+
+        warm_up = DigitRecognitionWarmUp(create_service, DigitRecognitionSettings())
+        warm_up.start()
+        warm_up.start()
+
+        assert asyncio.run(warm_up.wait_until_ready()) is service
+        assert asyncio.run(warm_up.wait_until_ready()) is service
+        assert len(creation_threads) == 1
+        assert creation_threads[0] is not threading.main_thread()
+        service.warm_up.assert_called_once_with()
+
+    @staticmethod
+    def test_waiting_starts_creation_without_warm_up():
+        service = unittest.mock.Mock(DigitRecognitionService)
+        warm_up = DigitRecognitionWarmUp(
+            lambda: service, DigitRecognitionSettings(digit_recognition_warm_up=False)
+        )
+
+        assert asyncio.run(warm_up.wait_until_ready()) is service
+        service.warm_up.assert_not_called()
+
+    @staticmethod
+    def test_creation_errors_are_raised_to_waiters():
+        def create_service():
+            raise ImportError("no module named easyocr")
+
+        warm_up = DigitRecognitionWarmUp(create_service, DigitRecognitionSettings())
+
+        with pytest.raises(ImportError):
+            asyncio.run(warm_up.wait_until_ready())
+
+    @staticmethod
+    def test_creation_is_retried_after_an_error():
+        service = unittest.mock.Mock(DigitRecognitionService)
+        service_provider = unittest.mock.Mock(
+            side_effect=[OSError("model download failed"), service]
+        )
+        warm_up = DigitRecognitionWarmUp(service_provider, DigitRecognitionSettings())
+
+        with pytest.raises(OSError):
+            asyncio.run(warm_up.wait_until_ready())
+        assert asyncio.run(warm_up.wait_until_ready()) is service
+        assert asyncio.run(warm_up.wait_until_ready()) is service
+        assert service_provider.call_count == 2
+
+    @staticmethod
+    def test_warm_up_errors_are_not_raised():
+        service = unittest.mock.Mock(DigitRecognitionService)
+        service.warm_up.side_effect = RuntimeError("out of memory")
+        warm_up = DigitRecognitionWarmUp(lambda: service, DigitRecognitionSettings())
+
+        assert asyncio.run(warm_up.wait_until_ready()) is service
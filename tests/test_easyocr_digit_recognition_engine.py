@@ -0,0 +1,134 @@
+import os
+import unittest.mock
+
+import numpy as np
+import pytest
+
+from bank_automation.infra.easyocr_digit_recognition_engine import (
+    EasyOcrDigitRecognitionEngine,
+)
+from bank_automation.infra.png_decoder import decode_png_to_grayscale
+from bank_automation.settings import DigitRecognitionSettings
+
+
+def _create_images(widths: list[int]) -> list[np.ndarray]:
+    return [np.zeros((20, width), dtype=np.uint8) for width in widths]
+
+
+def _box(x_min: int, x_max: int) -> list[list[int]]:
+    return [[x_min, 0], [x_max, 0], [x_max, 20], [x_min, 20]]
+
+
+def _create_engine(recognized: list) -> EasyOcrDigitRecognitionEngine:
+    reader = unittest.mock.Mock()
+    reader.recognize.return_value = recognized
+    return EasyOcrDigitRecognitionEngine(
+        reader,
+        DigitRecognitionSettings(digit_recognition_easyocr_skip_detection=True),
+    )
+
+
+def _read_keypad_captures() -> list[np.ndarray]:
+    images = []
+    for digit in range(10):
+        path = os.path.join(os.path.dirname(__file__), "images", f"digit_{digit}.png")
+        with open(path, "rb") as file:
+            images.append(decode_png_to_grayscale(file.read()))
+    return images
+
+
+@pytest.fixture(scope="module")
+def easyocr_reader():
+    easyocr = pytest.importorskip("easyocr")
+    return easyocr.Reader(DigitRecognitionSettings().languages)
+
+
+class TestEasyOcrDigitRecognitionEngine:
+    @staticmethod
+    def test_images_are_recognized_as_regions_of_one_strip():
+        engine = _create_engine([])
+
+        engine.recognize_batch_with_confidence(
+            [np.full((20, 10), 7, np.uint8), np.full((30, 15), 9, np.uint8)]
+        )
+
+        [[strip], kwargs] = engine.reader.recognize.call_args
+        assert strip.shape == (30, 25)
+        assert (strip[:20, :10] == 7).all()
+        # padded with white
+        assert (strip[20:, :10] == 255).all()
+        assert (strip[:, 10:] == 9).all()
+        assert kwargs["horizontal_list"] == [[0, 10, 0, 20], [10, 25, 0, 30]]
+        assert kwargs["free_list"] == []
+        assert kwargs["batch_size"] == 2
+        engine.reader.readtext_batched.assert_not_called()
+
+    @staticmethod
+    def test_results_are_matched_to_images_by_offset():
+        engine = _create_engine(
+            [
+                (_box(20, 30), "2", 0.7),
+                (_box(0, 10), "5", 0.9),
+                (_box(10, 20), "8", 0.8),
+            ]
+        )
+
+        results = engine.recognize_batch_with_confidence(_create_images([10, 10, 10]))
+
+        assert results == [(5, 0.9), (8, 0.8), (2, 0.7)]
+
+    @staticmethod
+    def test_images_without_result_are_not_recognized():
+        engine = _create_engine(
+            [
+                (_box(0, 10), "5", 0.9),
+                # not the left edge of any image
+                (_box(13, 20), "6", 0.9),
+            ]
+        )
+
+        results = engine.recognize_batch_with_confidence(_create_images([10, 10]))
+
+        assert results == [(5, 0.9), (None, 0.0)]
+
+    @staticmethod
+    def test_texts_other_than_one_digit_are_not_recognized():
+        engine = _create_engine(
+            [
+                (_box(0, 10), "12", 0.9),
+                (_box(10, 20), "", 0.9),
+                (_box(20, 30), "4", 0.6),
+            ]
+        )
+
+        results = engine.recognize_batch_with_confidence(_create_images([10, 10, 10]))
+
+        assert results == [(None, 0.0), (None, 0.0), (4, 0.6)]
+
+    @staticmethod
+    def test_detection_is_run_if_not_skipped():
+        reader = unittest.mock.Mock()
+        reader.readtext_batched.return_value = [[(_box(0, 10), "3", 0.8)], []]
+        engine = EasyOcrDigitRecognitionEngine(
+            reader,
+            DigitRecognitionSettings(digit_recognition_easyocr_skip_detection=False),
+        )
+
+        results = engine.recognize_batch_with_confidence(_create_images([10, 12]))
+
+        assert results == [(3, 0.8), (None, 0.0)]
+        reader.recognize.assert_not_called()
+
+    @staticmethod
+    @pytest.mark.parametrize("skip_detection", [True, False])
+    def test_real_reader_recognizes_the_keypad_captures(
+        easyocr_reader, skip_detection: bool
+    ):
+        engine = EasyOcrDigitRecognitionEngine(
+            easyocr_reader,
+            DigitRecognitionSettings(
+                digit_recognition_easyocr_skip_detection=skip_detection
+            ),
+        )
+
+        assert engine.recognize_batch(_read_keypad_captures()) == list(range(10))
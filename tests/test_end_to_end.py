@@ -0,0 +1,138 @@
+"""Drive a real headless Chrome through the adapter against the fake bank site.
+
+Skipped when Chrome is not available, unless END_TO_END_REQUIRE_CHROME is set,
+as in CI.
+"""
+
+import asyncio
+import os
+import pathlib
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from bank_automation.containers import ApplicationContainer, create_web_driver
+from bank_automation.settings import (
+    BrowserSettings,
+    CaisseDEpargneSettings,
+    DigitRecognitionSettings,
+)
+
+from .fake_bank import FakeBankServer, FakeCustomer, FakeLatencies
+
+ACCOUNT_ID = "e2e customer"
+PASSWORD = "052819"
+CHECKING_ACCOUNT = "04123456789"
+
+BROWSER_SETTINGS = BrowserSettings(extra_arguments=["--no-sandbox"])
+
+
+@pytest.fixture(scope="module")
+def chrome() -> None:
+    try:
+        create_web_driver(BROWSER_SETTINGS).quit()
+    except WebDriverException as e:
+        if os.environ.get("END_TO_END_REQUIRE_CHROME"):
+            raise
+        pytest.skip(f"Chrome is not available: {e.msg}")
+
+
+@pytest.fixture
+def end_to_end_application(
+    chrome: None, application: ApplicationContainer, tmp_path: pathlib.Path
+) -> ApplicationContainer:
+    # the session store of the application fixture is kept, in a temporary directory
+    application.digit_recognition_settings.override(
+        DigitRecognitionSettings(
+            digit_recognition_cache_directory=str(tmp_path / "digit_recognition"),
+            # the fake site serves the bundled glyphs, matched without easyocr
+            digit_recognition_template_fallback_to_easyocr=False,
+        )
+    )
+    application.web_driver.reset_override()
+    application.web_driver_factory.reset_override()
+    application.browser_settings.override(BROWSER_SETTINGS)
+    return application
+
+
+def _use_fake_bank(
+    application: ApplicationContainer, server: FakeBankServer, data_mode: str
+) -> None:
+    application.caisse_d_epargne_config.override(
+        CaisseDEpargneSettings(
+            caisse_d_epargne_account_id=ACCOUNT_ID,
+            caisse_d_epargne_account_password=PASSWORD,
+            caisse_d_epargne_checking_account=CHECKING_ACCOUNT,
+            caisse_d_epargne_data_mode=data_mode,
+            caisse_d_epargne_base_url=server.base_url,
+            caisse_d_epargne_api_base_url=server.base_url,
+        )
+    )
+
+
+async def _get_checking_account_balance(application: ApplicationContainer) -> float:
+    adapter = application.caisse_d_epargne_adapter_factory()
+    try:
+        return await adapter.get_checking_account_balance()
+    finally:
+        await adapter.aclose()
+
+
+@pytest.fixture
+def fake_bank(request: pytest.FixtureRequest):
+    customer: FakeCustomer = getattr(request, "param", FakeCustomer(PASSWORD))
+    server = FakeBankServer(
+        customers={ACCOUNT_ID: customer},
+        latencies=FakeLatencies(
+            page_in_seconds=0.05, api_in_seconds=0.02, render_in_seconds=0.1
+        ),
+    )
+    server.start()
+    yield server
+    server.stop()
+
+
+class TestEndToEnd:
+    @staticmethod
+    @pytest.mark.parametrize("data_mode", ["browser", "http"])
+    def test_login_and_read_balance(
+        end_to_end_application: ApplicationContainer,
+        fake_bank: FakeBankServer,
+        data_mode: str,
+    ):
+        _use_fake_bank(end_to_end_application, fake_bank, data_mode)
+
+        balance = asyncio.run(_get_checking_account_balance(end_to_end_application))
+
+        assert balance == 1234.56
+        assert fake_bank.login_count == 1
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "fake_bank", [FakeCustomer(PASSWORD, requires_mfa=True)], indirect=True
+    )
+    def test_login_waits_for_mfa_approval(
+        end_to_end_application: ApplicationContainer, fake_bank: FakeBankServer
+    ):
+        _use_fake_bank(end_to_end_application, fake_bank, "browser")
+
+        balance = asyncio.run(_get_checking_account_balance(end_to_end_application))
+
+        assert balance == 1234.56
+        assert fake_bank.login_count == 1
+
+    @staticmethod
+    def test_saved_session_skips_login(
+        end_to_end_application: ApplicationContainer, fake_bank: FakeBankServer
+    ):
+        _use_fake_bank(end_to_end_application, fake_bank, "browser")
+
+        first_balance = asyncio.run(
+            _get_checking_account_balance(end_to_end_application)
+        )
+        second_balance = asyncio.run(
+            _get_checking_account_balance(end_to_end_application)
+        )
+
+        assert first_balance == second_balance == 1234.56
+        assert fake_bank.login_count == 1
@@ -0,0 +1,57 @@
+import time
+
+import httpx
+
+from .fake_bank import FakeBankServer, FakeCustomer, FakeLatencies
+from .fake_bank.server import ACCOUNTS_API_PATH, ACCOUNTS_PATH, LOGIN_PATH
+
+
+def _create_keypad(client: httpx.Client, identifier: str) -> str:
+    keypad = client.post("/fake-api/keypad", json={"identifier": identifier}).json()
+    assert len(keypad["images"]) == 10
+    return keypad["keypad_id"]
+
+
+class TestFakeBankServer:
+    @staticmethod
+    def test_serves_login_page_and_protects_accounts(fake_bank_server: FakeBankServer):
+        with httpx.Client(base_url=fake_bank_server.base_url) as client:
+            login_page = client.get(LOGIN_PATH + "?service=dei")
+            accounts_page = client.get(ACCOUNTS_PATH)
+            accounts_response = client.get(ACCOUNTS_API_PATH)
+
+        assert login_page.status_code == 200
+        assert "input-identifier" in login_page.text
+        assert accounts_page.status_code == 302
+        assert accounts_response.status_code == 401
+
+    @staticmethod
+    def test_login_opens_a_session():
+        server = FakeBankServer(
+            customers={"customer": FakeCustomer("0123", requires_mfa=True)},
+            latencies=FakeLatencies(mfa_approval_in_seconds=0.1),
+        )
+        server.start()
+        try:
+            with httpx.Client(base_url=server.base_url) as client:
+                keypad_id = _create_keypad(client, "customer")
+                digits = server.keypads[keypad_id].digits
+                positions = [digits.index(int(char)) for char in "0123"]
+
+                login = client.post(
+                    "/fake-api/login",
+                    json={"keypad_id": keypad_id, "positions": positions},
+                ).json()
+                pending = client.post("/fake-api/mfa", json={"keypad_id": keypad_id})
+                time.sleep(0.1)
+                approved = client.post("/fake-api/mfa", json={"keypad_id": keypad_id})
+                accounts_page = client.get(ACCOUNTS_PATH)
+        finally:
+            server.stop()
+
+        assert login["status"] == "mfa"
+        assert pending.json()["status"] == "pending"
+        assert approved.json()["status"] == "approved"
+        assert accounts_page.status_code == 200
+        assert "04123456789" in accounts_page.text
+        assert server.login_count == 1
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from bank_automation.errors.http_errors import HttpUnauthorizedError
+from bank_automation.infra.http_client import HttpClient
+from bank_automation.settings import HttpClientSettings
+
+from .fake_bank import FakeBankServer
+
+ACCOUNTS_PATH = "/bapi/contract/v2/augmentedSynthesisViews"
+
+
+def _cookie(value: str) -> dict:
+    return {"name": "session_id", "value": value, "domain": "127.0.0.1", "path": "/"}
+
+
+class TestHttpClient:
+    @staticmethod
+    def test_get_json_reuses_connections(fake_bank_server: FakeBankServer):
+        async def run():
+            client = HttpClient(HttpClientSettings())
+            client.set_cookies([_cookie("valid")])
+            try:
+                return [
+                    await client.get_json(fake_bank_server.base_url + ACCOUNTS_PATH)
+                    for _ in range(5)
+                ]
+            finally:
+                await client.aclose()
+
+        payloads = asyncio.run(run())
+
+        assert len(payloads) == 5
+        assert payloads[0]["items"][0]["identification"]["accountNumber"] == (
+            "04123456789"
+        )
+        assert fake_bank_server.request_count == 5
+        assert len(fake_bank_server.client_ports) == 1
+
+    @staticmethod
+    def test_get_json_rejects_expired_cookies(
+        fake_bank_server: FakeBankServer,
+    ):
+        async def run():
+            client = HttpClient(HttpClientSettings())
+            client.set_cookies([_cookie("expired")])
+            try:
+                await client.get_json(fake_bank_server.base_url + ACCOUNTS_PATH)
+            finally:
+                await client.aclose()
+
+        with pytest.raises(HttpUnauthorizedError):
+            asyncio.run(run())
@@ -0,0 +1,34 @@
+import numpy as np
+
+from bank_automation.infra.image_preprocessing import binarize, pad_and_upscale
+
+
+class TestImagePreprocessing:
+    @staticmethod
+    def test_binarize_writes_dark_ink_on_white():
+        # light gray digit on a dark gray background
+        image = np.full((4, 4), 40, dtype=np.uint8)
+        image[1:3, 1:3] = 200
+
+        binarized = binarize(image)
+
+        assert binarized.dtype == np.uint8
+        assert (binarized[1:3, 1:3] == 0).all()
+        assert binarized[0, 0] == 255
+
+    @staticmethod
+    def test_binarize_keeps_blank_images():
+        image = np.full((4, 4), 250, dtype=np.uint8)
+
+        assert binarize(image) is image
+
+    @staticmethod
+    def test_pad_and_upscale_uses_background_color():
+        image = np.full((2, 3), 255, dtype=np.uint8)
+        image[0, 1] = 0
+
+        upscaled = pad_and_upscale(image, margin=1, factor=2)
+
+        assert upscaled.shape == (8, 10)
+        assert upscaled[0, 0] == 255
+        assert (upscaled[2:4, 4:6] == 0).all()
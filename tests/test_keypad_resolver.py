@@ -0,0 +1,190 @@
+import asyncio
+import base64
+import os
+import random
+import unittest.mock
+
+import numpy as np
+import pytest
+
+from bank_automation.containers import ApplicationContainer
+from bank_automation.errors.banking_errors import PasswordDigitNotFoundError
+from bank_automation.services.digit_recognition_service import DigitRecognitionService
+from bank_automation.services.digit_recognition_warm_up import DigitRecognitionWarmUp
+from bank_automation.services.keypad_resolver import KeypadResolver, solve_assignment
+from bank_automation.settings import DigitRecognitionSettings
+
+# 1x1 white RGB pixel
+BLANK_BASE64_PNG = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGP4//8/AAX+Av4N70a4AAAAAElFTkSuQmCC"
+
+
+def _read_base64_images() -> list[str]:
+    images: list[str] = []
+    for digit in range(10):
+        path = os.path.join(os.path.dirname(__file__), "images", f"digit_{digit}.png")
+        with open(path, "rb") as file:
+            images.append(base64.b64encode(file.read()).decode("ascii"))
+    return images
+
+
+@pytest.fixture
+def keypad_resolver(application: ApplicationContainer, tmp_path) -> KeypadResolver:
+    application.digit_recognition_settings.override(
+        DigitRecognitionSettings(
+            digit_recognition_cache_directory=str(tmp_path / "digit_recognition"),
+            digit_recognition_template_fallback_to_easyocr=False,
+        )
+    )
+    return application.keypad_resolver()
+
+
+def _count_recognized_images(keypad_resolver: KeypadResolver) -> unittest.mock.Mock:
+    service = asyncio.run(keypad_resolver.digit_recognition_warm_up.wait_until_ready())
+    engine = unittest.mock.Mock(wraps=service.engine)
+    service.engine = engine
+    return engine
+
+
+def _get_recognized_image_count(engine: unittest.mock.Mock) -> int:
+    return sum(len(images) for [images], _ in engine.score_batch_async.call_args_list)
+
+
+def _create_scripted_resolver(
+    scores: dict[str, list[float]],
+    retried_scores: dict[str, list[float]] | None = None,
+) -> tuple[KeypadResolver, unittest.mock.Mock]:
+    """Return a resolver whose service scores each image name as given, or as
+    given in `retried_scores` with alternate preprocessing."""
+    service = unittest.mock.Mock(DigitRecognitionService)
+    # each image stands for its own decoded PNG and cache key
+    service.decode_base64_pngs.side_effect = lambda images: images
+    service.get_cache_keys.side_effect = lambda images: images
+    service.get_cached_digits.side_effect = lambda images: [None] * len(images)
+    service.score_digits.side_effect = lambda images, preprocess=None: np.array(
+        [
+            (scores if preprocess is None else retried_scores or scores)[image]
+            for image in images
+        ],
+        dtype=np.float32,
+    )
+    config = DigitRecognitionSettings(digit_recognition_keypad_round_size=10)
+    return KeypadResolver(DigitRecognitionWarmUp(lambda: service, config), config), (
+        service
+    )
+
+
+def _one_hot(digit: int, confidence: float = 0.95) -> list[float]:
+    scores = [0.0] * 10
+    scores[digit] = confidence
+    return scores
+
+
+class TestKeypadResolver:
+    @staticmethod
+    def test_stops_once_password_digits_are_found(keypad_resolver: KeypadResolver):
+        engine = _count_recognized_images(keypad_resolver)
+
+        button_indices = asyncio.run(
+            keypad_resolver.resolve(_read_base64_images(), {1, 2})
+        )
+
+        assert button_indices == {1: 1, 2: 2}
+        # a single round of 3 buttons
+        assert _get_recognized_image_count(engine) == 3
+
+    @staticmethod
+    def test_infers_the_last_digit(keypad_resolver: KeypadResolver):
+        engine = _count_recognized_images(keypad_resolver)
+        images = _read_base64_images()
+        digits = list(range(10))
+        random.Random(0).shuffle(digits)
+
+        button_indices = asyncio.run(
+            keypad_resolver.resolve([images[digit] for digit in digits], set(range(10)))
+        )
+
+        assert button_indices == {digit: index for index, digit in enumerate(digits)}
+        assert _get_recognized_image_count(engine) == 9
+
+    @staticmethod
+    def test_cached_buttons_are_not_recognized(keypad_resolver: KeypadResolver):
+        engine = _count_recognized_images(keypad_resolver)
+        images = _read_base64_images()
+        asyncio.run(keypad_resolver.resolve(images, {7, 8}))
+        engine.reset_mock()
+
+        button_indices = asyncio.run(keypad_resolver.resolve(images, {7, 8}))
+
+        assert button_indices == {7: 7, 8: 8}
+        engine.score_batch_async.assert_not_called()
+
+    @staticmethod
+    def test_unrecognized_button_is_inferred(keypad_resolver: KeypadResolver):
+        images = _read_base64_images()
+        images[5] = BLANK_BASE64_PNG
+
+        button_indices = asyncio.run(keypad_resolver.resolve(images, {5, 9}))
+
+        assert button_indices == {5: 5, 9: 9}
+
+    @staticmethod
+    def test_raises_on_unrecognized_password_digit(keypad_resolver: KeypadResolver):
+        images = _read_base64_images()
+        images[4] = images[5] = BLANK_BASE64_PNG
+
+        with pytest.raises(PasswordDigitNotFoundError):
+            asyncio.run(keypad_resolver.resolve(images, {5}))
+
+    @staticmethod
+    def test_assignment_gives_duplicate_reads_distinct_digits():
+        scores = {f"button {digit}": _one_hot(digit) for digit in range(10)}
+        # both read as a 3, the second one also looks like an 8
+        scores["button 3"] = _one_hot(3, 0.9)
+        scores["button 8"] = _one_hot(3, 0.85)
+        scores["button 8"][8] = 0.8
+        keypad_resolver, service = _create_scripted_resolver(scores)
+
+        button_indices = asyncio.run(
+            keypad_resolver.resolve([f"button {digit}" for digit in range(10)], {3, 8})
+        )
+
+        assert button_indices == {3: 3, 8: 8}
+        for _, kwargs in service.score_digits.call_args_list:
+            assert "preprocess" not in kwargs
+
+    @staticmethod
+    def test_ambiguous_buttons_are_recognized_again():
+        scores = {f"button {digit}": _one_hot(digit) for digit in range(10)}
+        scores["button 3"] = _one_hot(3, 0.4)
+        scores["button 4"] = [0.0] * 10
+        retried_scores = {**scores, "button 3": _one_hot(3, 0.9)}
+        keypad_resolver, service = _create_scripted_resolver(scores, retried_scores)
+
+        button_indices = asyncio.run(
+            keypad_resolver.resolve([f"button {digit}" for digit in range(10)], {3})
+        )
+
+        assert button_indices == {3: 3}
+        retried_images = [
+            images
+            for [images, *preprocess], _ in (service.score_digits.call_args_list)
+            if len(preprocess) > 0
+        ]
+        assert retried_images == [["button 3", "button 4"]] * 2
+        service.decode_base64_pngs.assert_called_once()
+        [cached_images, cached_digits], _ = service.cache_digits.call_args
+        assert dict(zip(cached_images, cached_digits)) == {
+            f"button {digit}": digit for digit in range(10)
+        }
+
+
+def test_solve_assignment():
+    scores = np.array(
+        [
+            [0.9, 0.1, 0.0],
+            [0.8, 0.7, 0.0],
+            [0.0, 0.6, 0.5],
+        ]
+    )
+
+    assert solve_assignment(scores) == ([0, 1, 2], pytest.approx(2.1))
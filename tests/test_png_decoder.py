@@ -0,0 +1,64 @@
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+from bank_automation.infra.png_decoder import (
+    PNG_SIGNATURE,
+    UnsupportedPngError,
+    decode_png_to_grayscale,
+)
+
+
+def _encode_png(
+    pixels: np.ndarray, color_type: int, idat_chunk_count: int = 1
+) -> bytes:
+    """Encode the pixels, of shape (height, width, channels), without filters."""
+    height, width = pixels.shape[:2]
+
+    def chunk(chunk_type: bytes, data: bytes) -> bytes:
+        crc = zlib.crc32(chunk_type + data)
+        return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", crc)
+
+    scanlines = b"".join(b"\x00" + row.tobytes() for row in pixels.astype(np.uint8))
+    compressed = zlib.compress(scanlines)
+    chunk_size = -(-len(compressed) // idat_chunk_count)
+    return (
+        PNG_SIGNATURE
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))
+        + b"".join(
+            chunk(b"IDAT", compressed[offset : offset + chunk_size])
+            for offset in range(0, len(compressed), chunk_size)
+        )
+        + chunk(b"IEND", b"")
+    )
+
+
+class TestDecodePngToGrayscale:
+    @staticmethod
+    @pytest.mark.parametrize("idat_chunk_count", [1, 3])
+    def test_composites_transparent_pixels_over_white(idat_chunk_count: int):
+        rng = np.random.default_rng(0)
+        pixels = rng.integers(0, 256, size=(5, 7, 4))
+        png = _encode_png(pixels, color_type=6, idat_chunk_count=idat_chunk_count)
+
+        grayscale = decode_png_to_grayscale(memoryview(png))
+
+        alpha = pixels[:, :, 3] / 255
+        expected = pixels[:, :, :3] @ [0.299, 0.587, 0.114] * alpha + 255 * (1 - alpha)
+        assert grayscale.dtype == np.uint8
+        assert np.abs(grayscale.astype(int) - np.rint(expected)).max() <= 1
+
+    @staticmethod
+    def test_grayscale_is_returned_as_is():
+        pixels = np.arange(12).reshape(3, 4, 1)
+
+        grayscale = decode_png_to_grayscale(_encode_png(pixels, color_type=0))
+
+        assert np.array_equal(grayscale, pixels[:, :, 0])
+
+    @staticmethod
+    def test_rejects_other_formats():
+        with pytest.raises(UnsupportedPngError):
+            decode_png_to_grayscale(b"GIF89a")
@@ -0,0 +1,97 @@
+import asyncio
+import functools
+import os
+
+import pytest
+
+from bank_automation.infra.png_decoder import decode_png_to_grayscale
+from bank_automation.infra.process_pool_digit_recognition_engine import (
+    ProcessPoolDigitRecognitionEngine,
+)
+from bank_automation.infra.template_matching_digit_recognition_engine import (
+    TemplateMatchingDigitRecognitionEngine,
+)
+from bank_automation.settings import DigitRecognitionSettings
+
+
+def _read_images():
+    images = []
+    for digit in range(10):
+        path = os.path.join(os.path.dirname(__file__), "images", f"digit_{digit}.png")
+        with open(path, "rb") as file:
+            images.append(decode_png_to_grayscale(file.read()))
+    return images
+
+
+@pytest.fixture
+def create_engine():
+    engines: list[ProcessPoolDigitRecognitionEngine] = []
+
+    def create(**settings) -> ProcessPoolDigitRecognitionEngine:
+        config = DigitRecognitionSettings(**settings)
+        # the template engine stands in for easyocr, which loads for seconds
+        engine = ProcessPoolDigitRecognitionEngine(
+            functools.partial(TemplateMatchingDigitRecognitionEngine, config), config
+        )
+        engines.append(engine)
+        return engine
+
+    yield create
+    for engine in engines:
+        engine.close()
+
+
+class TestProcessPoolDigitRecognitionEngine:
+    @staticmethod
+    def test_queued_requests_are_merged_into_batches(create_engine):
+        engine = create_engine(digit_recognition_easyocr_worker_count=1)
+        images = _read_images()
+        # starts the worker
+        assert engine.recognize_batch(images[:1]) == [0]
+
+        futures = [engine.submit([image]) for image in images]
+
+        assert [
+            [digit for digit, _ in future.result(timeout=30)] for future in futures
+        ] == [[digit] for digit in range(10)]
+        # the first request runs alone, the others queued up meanwhile
+        assert engine.batch_count < 1 + len(images)
+
+    @staticmethod
+    def test_batches_are_capped(create_engine):
+        engine = create_engine(
+            digit_recognition_easyocr_worker_count=1,
+            digit_recognition_easyocr_max_batch_size=4,
+        )
+        images = _read_images()
+
+        futures = [engine.submit(images[:3]), engine.submit(images[3:])]
+
+        results = [future.result(timeout=30) for future in futures]
+        assert [digit for digit, _ in results[0]] == [0, 1, 2]
+        assert [digit for digit, _ in results[1]] == [3, 4, 5, 6, 7, 8, 9]
+
+    @staticmethod
+    def test_score_batch_async(create_engine):
+        engine = create_engine(digit_recognition_easyocr_worker_count=2)
+        images = _read_images()
+
+        async def run():
+            return await asyncio.gather(
+                engine.score_batch_async(images[:5]),
+                engine.score_batch_async(images[5:]),
+            )
+
+        scores = asyncio.run(run())
+        assert [batch_scores.argmax(axis=1).tolist() for batch_scores in scores] == [
+            [0, 1, 2, 3, 4],
+            [5, 6, 7, 8, 9],
+        ]
+
+    @staticmethod
+    def test_closed_engine_fails_requests(create_engine):
+        engine = create_engine(digit_recognition_easyocr_worker_count=1)
+        engine.close()
+
+        with pytest.raises(RuntimeError):
+            engine.recognize_batch(_read_images()[:1])
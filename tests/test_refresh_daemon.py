@@ -0,0 +1,112 @@
+import asyncio
+import unittest.mock
+
+from bank_automation import AccountBalance, Currency
+from bank_automation.containers import ApplicationContainer
+from bank_automation.services.banking_service import (
+    GetAccountBalanceResult,
+    ProfileBalanceResult,
+)
+from bank_automation.settings import DaemonSettings
+
+
+def _create_daemon(application: ApplicationContainer, **settings):
+    application.daemon_settings.override(DaemonSettings(**settings))
+    banking_service = unittest.mock.Mock()
+    banking_service.close_adapters = unittest.mock.AsyncMock()
+    application.banking_service.override(banking_service)
+    return application.refresh_daemon(), banking_service
+
+
+def _stream(*results: ProfileBalanceResult):
+    async def stream_profile_balances(keep_adapters_open: bool = False):
+        for result in results:
+            yield result
+
+    return stream_profile_balances
+
+
+SUCCESS = ProfileBalanceResult(
+    profile_name="alice",
+    balances=GetAccountBalanceResult(
+        accounts=[
+            AccountBalance(account_id="checking", balance=1.0, currency=Currency.EURO)
+        ]
+    ),
+)
+FAILURE = ProfileBalanceResult(
+    profile_name="bob", balances=None, error=ValueError("login failed")
+)
+
+
+class TestRefreshDaemon:
+    @staticmethod
+    def test_delay_backs_off_after_failures(application: ApplicationContainer):
+        daemon, banking_service = _create_daemon(
+            application,
+            refresh_interval_in_seconds=600.0,
+            jitter_ratio=0.0,
+            failure_backoff_initial_in_seconds=10.0,
+            failure_backoff_max_in_seconds=30.0,
+        )
+
+        delays = []
+        for is_failing in [False, True, True, True, True, False]:
+            daemon._consecutive_failure_count = (
+                daemon._consecutive_failure_count + 1 if is_failing else 0
+            )
+            delays.append(daemon.get_next_delay())
+
+        assert delays == [600.0, 10.0, 20.0, 30.0, 30.0, 600.0]
+
+    @staticmethod
+    def test_delay_has_jitter(application: ApplicationContainer):
+        daemon, _ = _create_daemon(
+            application, refresh_interval_in_seconds=100.0, jitter_ratio=0.2
+        )
+
+        delays = [daemon.get_next_delay() for _ in range(100)]
+
+        assert all(80.0 <= delay <= 120.0 for delay in delays)
+        assert len(set(delays)) > 1
+
+    @staticmethod
+    def test_refresh_fails_if_a_profile_fails(application: ApplicationContainer):
+        daemon, banking_service = _create_daemon(application)
+
+        banking_service.stream_profile_balances = _stream(SUCCESS)
+        assert asyncio.run(daemon.refresh()) is True
+        banking_service.stream_profile_balances = _stream(SUCCESS, FAILURE)
+        assert asyncio.run(daemon.refresh()) is False
+
+    @staticmethod
+    def test_run_restarts_browsers_above_memory_limit_and_stops(
+        application: ApplicationContainer,
+    ):
+        daemon, banking_service = _create_daemon(
+            application,
+            refresh_interval_in_seconds=0.01,
+            memory_limit_in_megabytes=1.0,
+        )
+        refresh_count = 0
+
+        async def stream_profile_balances(keep_adapters_open: bool = False):
+            nonlocal refresh_count
+            assert keep_adapters_open
+            refresh_count += 1
+            if refresh_count == 3:
+                stop_event.set()
+            yield SUCCESS
+
+        banking_service.stream_profile_balances = stream_profile_balances
+        stop_event = asyncio.Event()
+
+        with unittest.mock.patch(
+            "bank_automation.services.refresh_daemon.get_process_tree_rss_bytes",
+            return_value=2 * 1024 * 1024,
+        ):
+            asyncio.run(asyncio.wait_for(daemon.run(stop_event), timeout=5.0))
+
+        assert refresh_count == 3
+        # once per refresh above the limit, and once when stopping
+        assert banking_service.close_adapters.await_count == 4
@@ -0,0 +1,48 @@
+import pathlib
+import time
+import unittest.mock
+
+from bank_automation.infra.session_store import BrowserSession, EncryptedSessionStore
+from bank_automation.settings import SessionStoreSettings
+
+SESSION = BrowserSession(
+    url="https://bank.example/accounts",
+    cookies=[
+        {"name": "session_id", "value": "secret-cookie", "domain": "bank.example"}
+    ],
+    local_storage={"token": "secret-token"},
+)
+
+
+def _create_store(tmp_path: pathlib.Path, **kwargs) -> EncryptedSessionStore:
+    return EncryptedSessionStore(
+        SessionStoreSettings(directory=str(tmp_path / "sessions"), **kwargs)
+    )
+
+
+class TestEncryptedSessionStore:
+    @staticmethod
+    def test_save_and_load(tmp_path: pathlib.Path):
+        _create_store(tmp_path).save("alice", SESSION)
+
+        assert _create_store(tmp_path).load("alice") == SESSION
+        assert _create_store(tmp_path).load("bob") is None
+
+    @staticmethod
+    def test_sessions_are_encrypted(tmp_path: pathlib.Path):
+        _create_store(tmp_path).save("alice", SESSION)
+
+        for path in (tmp_path / "sessions").iterdir():
+            assert b"secret" not in path.read_bytes()
+            assert path.stat().st_mode & 0o077 == 0
+
+    @staticmethod
+    def test_expired_sessions_are_discarded(tmp_path: pathlib.Path):
+        store = _create_store(tmp_path, max_age_in_seconds=60.0)
+        store.save("alice", SESSION)
+
+        with unittest.mock.patch(
+            "cryptography.fernet.time.time", return_value=time.time() + 120
+        ):
+            assert store.load("alice") is None
+        assert store.load("alice") is None
@@ -0,0 +1,122 @@
+import base64
+import os
+import unittest.mock
+
+import numpy as np
+
+from bank_automation.infra.digit_recognition_engine import DigitRecognitionEngine
+from bank_automation.infra.png_decoder import decode_png_to_grayscale
+from bank_automation.infra.template_matching_digit_recognition_engine import (
+    TemplateMatchingDigitRecognitionEngine,
+)
+from bank_automation.settings import DigitRecognitionSettings
+
+# 1x1 white RGB pixel
+BLANK_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGP4//8/AAX+Av4N70a4AAAAAElFTkSuQmCC"
+)
+
+
+def _read_image(digit: int) -> np.ndarray:
+    path = os.path.join(os.path.dirname(__file__), "images", f"digit_{digit}.png")
+    with open(path, "rb") as file:
+        return decode_png_to_grayscale(file.read())
+
+
+def _read_variant(digit: int, variant: str) -> np.ndarray:
+    """Read a glyph which differs from the bundled reference glyphs."""
+    path = os.path.join(
+        os.path.dirname(__file__), "images", "variants", f"digit_{digit}_{variant}.png"
+    )
+    with open(path, "rb") as file:
+        return decode_png_to_grayscale(file.read())
+
+
+class TestTemplateMatchingDigitRecognitionEngine:
+    @staticmethod
+    def test_recognize_batch():
+        engine = TemplateMatchingDigitRecognitionEngine(DigitRecognitionSettings())
+
+        images = [_read_image(digit) for digit in range(10)]
+
+        assert engine.recognize_batch(images) == list(range(10))
+        for digit, image in enumerate(images):
+            matched_digit, confidence = engine.match(image)
+            assert matched_digit == digit
+            assert confidence > engine.config.template_min_confidence
+
+    @staticmethod
+    def test_recognize_rescaled_blurred_and_inverted_glyphs():
+        engine = TemplateMatchingDigitRecognitionEngine(DigitRecognitionSettings())
+
+        # upscaled, shifted on a grey background and anti-aliased
+        scaled_images = [_read_variant(digit, "scaled_blurred") for digit in range(10)]
+        # downscaled, light on dark, with noise
+        inverted_images = [
+            _read_variant(digit, "inverted_noisy") for digit in range(10)
+        ]
+
+        assert [engine.match(image)[0] for image in scaled_images] == list(range(10))
+        assert [engine.match(image)[0] for image in inverted_images] == list(range(10))
+        assert all(
+            engine.match(image)[1] > engine.config.template_min_confidence
+            for image in scaled_images
+        )
+
+    @staticmethod
+    def test_other_font_is_never_confidently_misread():
+        engine = TemplateMatchingDigitRecognitionEngine(DigitRecognitionSettings())
+
+        for digit in range(10):
+            matched_digit, confidence = engine.match(_read_variant(digit, "rerendered"))
+            # misreads are left to the fallback engine
+            assert (
+                matched_digit == digit
+                or confidence < engine.config.template_min_confidence
+            )
+
+    @staticmethod
+    def test_falls_back_on_low_confidence():
+        fallback_engine = unittest.mock.Mock(DigitRecognitionEngine)
+        fallback_engine.recognize_batch_with_confidence.return_value = [(None, 0.0)]
+        engine = TemplateMatchingDigitRecognitionEngine(
+            DigitRecognitionSettings(),
+            fallback_engine_provider=lambda: fallback_engine,
+        )
+
+        blank_image = decode_png_to_grayscale(BLANK_PNG)
+
+        assert engine.recognize_batch([_read_image(4), blank_image]) == [4, None]
+        [[fallback_images], _] = (
+            fallback_engine.recognize_batch_with_confidence.call_args
+        )
+        assert len(fallback_images) == 1
+        assert fallback_images[0] is blank_image
+
+    @staticmethod
+    def test_warm_up_only_loads_fallback_engine_if_enabled():
+        fallback_engine = unittest.mock.Mock(DigitRecognitionEngine)
+        fallback_engine_provider = unittest.mock.Mock(return_value=fallback_engine)
+
+        TemplateMatchingDigitRecognitionEngine(
+            DigitRecognitionSettings(),
+            fallback_engine_provider=fallback_engine_provider,
+        ).warm_up()
+        fallback_engine_provider.assert_not_called()
+
+        TemplateMatchingDigitRecognitionEngine(
+            DigitRecognitionSettings(digit_recognition_warm_up_template_fallback=True),
+            fallback_engine_provider=fallback_engine_provider,
+        ).warm_up()
+        fallback_engine.warm_up.assert_called_once_with()
+
+    @staticmethod
+    def test_score_batch_scores_every_digit():
+        engine = TemplateMatchingDigitRecognitionEngine(DigitRecognitionSettings())
+
+        scores = engine.score_batch([_read_image(digit) for digit in range(10)])
+
+        assert scores.shape == (10, 10)
+        assert scores.argmax(axis=1).tolist() == list(range(10))
+        assert (scores.max(axis=1) > engine.config.template_min_confidence).all()
+        assert ((scores >= 0) & (scores <= 1)).all()
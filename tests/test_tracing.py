@@ -0,0 +1,117 @@
+import asyncio
+import json
+import pathlib
+
+import pytest
+
+from bank_automation.containers import ApplicationContainer
+from bank_automation.infra.tracing import (
+    SPAN_DURATION_METRIC,
+    JsonTraceSpanExporter,
+    MetricsRegistry,
+    MetricsSpanExporter,
+    Span,
+    SpanExporter,
+    Tracer,
+)
+from bank_automation.settings import MetricsSettings
+
+
+class ListSpanExporter(SpanExporter):
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+class TestTracer:
+    @staticmethod
+    def test_spans_nest_per_task():
+        exporter = ListSpanExporter()
+        tracer = Tracer(exporters=[exporter])
+
+        async def fetch(profile_name: str):
+            with tracer.span("fetch", profile=profile_name):
+                with tracer.span("login") as attributes:
+                    await asyncio.sleep(0.01)
+                    attributes["mfa_required"] = False
+
+        async def run():
+            await asyncio.gather(fetch("alice"), fetch("bob"))
+
+        asyncio.run(run())
+
+        spans = {(span.name, span.root_id): span for span in exporter.spans}
+        fetch_spans = [span for span in exporter.spans if span.name == "fetch"]
+        assert len(fetch_spans) == 2
+        for fetch_span in fetch_spans:
+            login_span = spans[("login", fetch_span.span_id)]
+            assert fetch_span.parent_id is None
+            assert login_span.parent_id == fetch_span.span_id
+            assert login_span.attributes == {"mfa_required": False}
+            assert login_span.duration_in_seconds >= 0.01
+
+    @staticmethod
+    def test_failed_span_records_the_error():
+        exporter = ListSpanExporter()
+        tracer = Tracer(exporters=[exporter])
+
+        with pytest.raises(ValueError):
+            with tracer.span("ocr"):
+                raise ValueError()
+
+        [span] = exporter.spans
+        assert span.attributes == {"error": "ValueError"}
+
+
+class TestMetricsRegistry:
+    @staticmethod
+    def test_to_prometheus_text():
+        registry = MetricsRegistry(histogram_buckets=(0.1, 1.0))
+        registry.increment("calls_total", {"method": "get"})
+        registry.increment("calls_total", {"method": "get"})
+        for value in [0.05, 0.5, 5.0]:
+            registry.observe("duration_seconds", value, {"span": "login"})
+
+        assert registry.to_prometheus_text().splitlines() == [
+            "# TYPE calls_total counter",
+            'calls_total{method="get"} 2',
+            "# TYPE duration_seconds histogram",
+            'duration_seconds_bucket{span="login",le="0.1"} 1',
+            'duration_seconds_bucket{span="login",le="1"} 2',
+            'duration_seconds_bucket{span="login",le="+Inf"} 3',
+            'duration_seconds_sum{span="login"} 5.55',
+            'duration_seconds_count{span="login"} 3',
+        ]
+
+
+class TestExporters:
+    @staticmethod
+    def test_container_tracer_writes_files_on_shutdown(
+        application: ApplicationContainer, tmp_path: pathlib.Path
+    ):
+        trace_path = tmp_path / "trace.json"
+        prometheus_path = tmp_path / "metrics.prom"
+        application.metrics_settings.override(
+            MetricsSettings(
+                trace_path=str(trace_path), prometheus_path=str(prometheus_path)
+            )
+        )
+
+        tracer = application.tracer()
+        assert any(isinstance(e, JsonTraceSpanExporter) for e in tracer.exporters)
+        assert any(isinstance(e, MetricsSpanExporter) for e in tracer.exporters)
+        with tracer.span("fetch", profile="alice"):
+            with tracer.span("consent"):
+                pass
+        application.shutdown_resources()
+
+        trace_events = json.loads(trace_path.read_text())["traceEvents"]
+        assert [event["name"] for event in trace_events] == ["consent", "fetch"]
+        assert trace_events[1]["args"]["profile"] == "alice"
+        assert len({event["tid"] for event in trace_events}) == 1
+        assert (
+            f'{SPAN_DURATION_METRIC}_count{{span="consent"}} 1'
+            in prometheus_path.read_text()
+        )
@@ -0,0 +1,134 @@
+import asyncio
+import csv
+import pathlib
+import sys
+
+import pytest
+
+from bank_automation import Transaction
+from bank_automation.containers import ApplicationContainer
+from bank_automation.infra.session_store import BrowserSession
+from bank_automation.infra.transaction_sinks import (
+    TRANSACTION_FIELDS,
+    CsvTransactionSink,
+    TransactionSink,
+    create_transaction_sink,
+)
+from bank_automation.settings import CaisseDEpargneSettings, TransactionExportSettings
+
+from .fake_bank import FakeBankServer
+
+ACCOUNT_ID = "04123456789"
+
+
+class RecordingSink(TransactionSink):
+    def __init__(self, sink: TransactionSink) -> None:
+        self.sink = sink
+        self.batch_sizes: list[int] = []
+
+    def write_batch(self, transactions: list[Transaction]) -> None:
+        self.batch_sizes.append(len(transactions))
+        self.sink.write_batch(transactions)
+
+    def close(self) -> None:
+        self.sink.close()
+
+
+def _configure(
+    application: ApplicationContainer, server: FakeBankServer, batch_size: int
+) -> None:
+    application.caisse_d_epargne_config.override(
+        CaisseDEpargneSettings(
+            caisse_d_epargne_account_id="mocked id",
+            caisse_d_epargne_account_password="mocked password",
+            caisse_d_epargne_checking_account=ACCOUNT_ID,
+            caisse_d_epargne_api_base_url=server.base_url,
+            caisse_d_epargne_transactions_page_size=30,
+        )
+    )
+    application.transaction_export_settings.override(
+        TransactionExportSettings(batch_size=batch_size)
+    )
+    application.session_store().save(
+        "default",
+        BrowserSession(
+            url="",
+            cookies=[
+                {
+                    "name": "session_id",
+                    "value": "valid",
+                    "domain": "127.0.0.1",
+                    "path": "/",
+                }
+            ],
+            local_storage={},
+        ),
+    )
+
+
+class TestTransactionExport:
+    @staticmethod
+    def test_export_to_csv_in_bounded_batches(
+        application: ApplicationContainer,
+        fake_bank_server: FakeBankServer,
+        tmp_path: pathlib.Path,
+    ):
+        _configure(application, fake_bank_server, batch_size=40)
+        path = tmp_path / "transactions.csv"
+
+        async def run():
+            with RecordingSink(CsvTransactionSink(str(path))) as sink:
+                count = await application.transaction_export_service().export(
+                    ACCOUNT_ID, sink
+                )
+            return count, sink.batch_sizes
+
+        count, batch_sizes = asyncio.run(run())
+
+        assert count == 250
+        assert batch_sizes == [40] * 6 + [10]
+        with open(path, encoding="utf-8", newline="") as file:
+            rows = list(csv.reader(file))
+        assert rows[0] == TRANSACTION_FIELDS
+        assert rows[1] == [
+            ACCOUNT_ID,
+            f"{ACCOUNT_ID}-0",
+            "2026-01-01",
+            "CB SHOP 0",
+            "-100.0",
+            "€",
+        ]
+        assert len(rows) == 251
+
+    @staticmethod
+    def test_export_to_parquet(
+        application: ApplicationContainer,
+        fake_bank_server: FakeBankServer,
+        tmp_path: pathlib.Path,
+    ):
+        parquet = pytest.importorskip("pyarrow.parquet")
+        _configure(application, fake_bank_server, batch_size=100)
+        path = tmp_path / "transactions.parquet"
+
+        async def run():
+            with create_transaction_sink(str(path)) as sink:
+                return await application.transaction_export_service().export(
+                    ACCOUNT_ID, sink
+                )
+
+        count = asyncio.run(run())
+
+        parquet_file = parquet.ParquetFile(path)
+        assert count == parquet_file.metadata.num_rows == 250
+        assert parquet_file.metadata.num_row_groups == 3
+        assert parquet_file.schema_arrow.names == TRANSACTION_FIELDS
+
+    @staticmethod
+    def test_parquet_without_pyarrow_names_the_extra(
+        monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+    ):
+        # a None entry makes the import fail
+        monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+        with pytest.raises(ImportError, match="'parquet' extra"):
+            create_transaction_sink(str(tmp_path / "transactions.parquet"))